@@ -0,0 +1,45 @@
+"""
+Benchmark du planificateur de `administration balance-support` (crm.models.balancing.plan_balance),
+sur des événements générés en mémoire : durée du calcul et équilibre obtenu.
+
+Usage : python -m benchmarks.bench_balance [--events 5000] [--supports 12] [--assigned 500]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from crm.models.balancing import plan_balance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--supports", type=int, default=12)
+    parser.add_argument("--assigned", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args()
+
+    rng = random.Random(options.seed)
+    base = datetime(2030, 1, 1)
+
+    def period():
+        start = base + timedelta(days=rng.randrange(365))
+        return start, start + timedelta(days=rng.choice((0, 0, 1, 2)))
+
+    supports = {support_id: f"support{support_id}" for support_id in range(1, options.supports + 1)}
+    assigned = [(rng.choice(list(supports)), *period(), rng.randint(10, 500)) for _ in range(options.assigned)]
+    pending = [(event_id, *period(), rng.randint(10, 500)) for event_id in range(1, options.events + 1)]
+
+    plan = plan_balance(supports, pending, assigned)
+
+    attendees = [workload.attendees for workload in plan.after.values()]
+    events = [workload.events for workload in plan.after.values()]
+    print(f"{options.events} événements, {options.supports} membres du support, {options.assigned} déjà assignés")
+    print(f"planifiés : {plan.planned}, sans membre disponible : {len(plan.unplaced)}")
+    print(f"calcul : {plan.seconds * 1000:.1f} ms")
+    print(f"participants par membre : min {min(attendees)}, max {max(attendees)}")
+    print(f"événements par membre : min {min(events)}, max {max(events)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark du mode lot (`crm batch`) contre un processus par opération.
+
+Génère un fichier d'opérations (ajouts de clients, puis mises à jour et assignations
+d'événements) sur une base SQLite de benchmark, puis mesure :
+- le mode lot, pour plusieurs tailles de transaction ;
+- la référence : un interpréteur neuf par opération, qui importe la CLI, ouvre la connexion,
+  lit la session et répond aux questions de la commande interactive.
+La validation des emails est limitée à la syntaxe (sans requête DNS).
+
+Usage : python -m benchmarks.bench_batch [--operations 5000] [--spawns 20]
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_user_import import syntax_only
+from benchmarks.datagen import open_sqlite, seed
+from crm.cli_commands import cli_batch
+from crm.cli_commands.cli_permissions import Session
+from crm.cli_commands.cli_session import save_session
+from crm.models.models import Event, db
+
+SPAWN_SCRIPT = """
+from email_validator import validate_email
+import crm.cli_commands.cli_input_validators as validators
+validators.is_valid_email = lambda email: bool(validate_email(email, check_deliverability=False))
+from benchmarks.datagen import open_sqlite
+open_sqlite({database!r})
+from typer.testing import CliRunner
+from crm.__main__ import app
+result = CliRunner().invoke(app, ["commercial", "add-client"], input={answers!r})
+assert "ajouté avec succès" in result.output, result.output
+"""
+
+
+def operations(count: int, support_id: int, event_ids: list):
+    """Opérations de commercial (ajouts de clients) et de support (assignations, mises à jour)."""
+    for i in range(count // 2):
+        yield {"op": "add_client", "name": f"Lot {i}", "email": f"lot{i}@epicevents.fr", "phone": f"07{i:08d}"}
+    for event_id in event_ids[:count - count // 2]:
+        yield {"op": "update_event", "id": event_id, "attendees": 42, "notes": "Lot"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--spawns", type=int, default=20)
+    options = parser.parse_args()
+
+    cli_batch.is_valid_email = syntax_only
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        os.environ.setdefault("SESSION_SECRET", "bench-secret")
+        database_path = os.path.join(directory, "batch.db")
+        database = open_sqlite(database_path)
+        seed(database, max(10_000, options.operations))
+
+        # Un utilisateur qui a les deux rôles n'existe pas : les opérations sont exécutées
+        # avec une session commerciale puis une session support (ids alternés par rôle dans datagen).
+        commercial, support = Session({"user_id": 1, "role": "COMMERCIAL"}), Session({"user_id": 3, "role": "SUPPORT"})
+        event_ids = [e for (e,) in Event.select(Event.id).where(Event.support_contact == 3).tuples()]
+        all_operations = list(operations(options.operations, 3, event_ids))
+
+        print(f"{'mode':<28}{'opérations':>12}{'durée (s)':>12}{'op/s':>10}")
+        for transaction_size in (1, 100, 1000):
+            db.execute_sql("DELETE FROM client WHERE name LIKE 'Lot %'")
+            elapsed = 0.0
+            total = 0
+            for session, role_ops in ((commercial, [o for o in all_operations if o["op"] == "add_client"]),
+                                      (support, [o for o in all_operations if o["op"] == "update_event"])):
+                path = os.path.join(directory, f"{session.role}.jsonl")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(o) + "\n" for o in role_ops)
+                start = time.perf_counter()
+                succeeded, failed = cli_batch.run_batch(path, session, io.StringIO(), transaction_size)
+                elapsed += time.perf_counter() - start
+                total += succeeded + failed
+                assert failed == 0, failed
+            print(f"{'batch, transaction=' + str(transaction_size):<28}{total:>12}{elapsed:>12.2f}{total / elapsed:>10.0f}")
+
+        database.close()
+        save_session(1, "user1", "user1@example.com", "COMMERCIAL")
+        start = time.perf_counter()
+        for i in range(options.spawns):
+            answers = f"Processus {i}\nprocessus{i}@epicevents.fr\n06{i:08d}\nEntreprise\n"
+            subprocess.run([sys.executable, "-c", SPAWN_SCRIPT.format(database=database_path, answers=answers)],
+                           check=True, capture_output=True)
+        elapsed = time.perf_counter() - start
+        print(f"{'un processus par opération':<28}{options.spawns:>12}{elapsed:>12.2f}{options.spawns / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
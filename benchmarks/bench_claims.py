@@ -0,0 +1,92 @@
+"""
+Benchmark de `support claim-next` (crm.models.claims) avec N membres du support simulés en parallèle.
+
+Une file de --queue événements non assignés est vidée par 1, 2, 4... --agents fils d'exécution
+(une connexion chacun) qui appellent `claim_next_event` jusqu'à épuisement. Pour chaque nombre
+d'agents : débit, et vérification qu'aucun événement n'a été attribué deux fois.
+SQLite (WAL, mise à jour conditionnelle) par défaut ; --backend postgres pour FOR UPDATE SKIP LOCKED.
+
+Usage : python -m benchmarks.bench_claims [--events 10000] [--queue 2000] [--agents 8]
+                                          [--backend sqlite|postgres]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.datagen import open_postgres, open_url, seed
+from crm.models.claims import claim_next_event
+from crm.models.models import Event, User
+
+
+def reset_queue(queue: int, owner: int):
+    """Les `queue` premiers événements deviennent non assignés, les autres sont attribués à `owner`."""
+    Event.update(support_contact=owner).where(Event.id > queue).execute()
+    Event.update(support_contact=None).where(Event.id <= queue).execute()
+
+
+def run_agents(supports: list, database) -> tuple:
+    claimed, errors = [], []
+    lock = threading.Lock()
+
+    def agent(support_id):
+        mine = []
+        try:
+            while True:
+                claim = claim_next_event(support_id)
+                if claim is None:
+                    break
+                mine.append(claim.event_id)
+        except Exception as e:  # noqa: BLE001 (rapporté à la fin)
+            errors.append(e)
+        finally:
+            database.close()
+        with lock:
+            claimed.extend(mine)
+
+    threads = [threading.Thread(target=agent, args=(support_id,)) for support_id in supports]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return claimed, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--queue", type=int, default=2000)
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--pg-database", default="epic_events_bench")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        if options.backend == "postgres":
+            database = open_postgres(options.pg_database)
+        else:
+            database = open_url(f"sqlite:///{directory}/claims.db")
+        seed(database, options.events)
+        supports = [user_id for (user_id,) in User.select(User.id).where(User.role == "SUPPORT").tuples()]
+
+        print(f"{options.queue} événements à prendre ({options.backend})")
+        print(f"{'agents':>8}{'durée (s)':>12}{'prises/s':>12}{'doublons':>10}{'erreurs':>10}")
+        agents = 1
+        while agents <= options.agents:
+            reset_queue(options.queue, supports[0])
+            database.close()
+            claimed, errors, seconds = run_agents([supports[i % len(supports)] for i in range(agents)], database)
+            duplicates = sum(count - 1 for count in Counter(claimed).values() if count > 1)
+            assigned = Event.select().where(Event.id <= options.queue, Event.support_contact.is_null(False)).count()
+            if assigned != options.queue or len(claimed) != options.queue:
+                print(f"  attention : {len(claimed)} prises pour {assigned} événements assignés")
+            print(f"{agents:>8}{seconds:>12.3f}{len(claimed) / seconds:>12.0f}{duplicates:>10}{len(errors):>10}")
+            agents *= 2
+
+
+if __name__ == "__main__":
+    main()
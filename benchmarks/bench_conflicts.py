@@ -0,0 +1,109 @@
+"""
+Benchmark de la détection des conflits de planning du support (crm.models.conflicts),
+sur des événements générés en mémoire (1 million par défaut) :
+
+- rapport `support conflicts` : balayage (sweep_conflicts) contre comparaison des paires,
+  mesurée sur les --pairwise premiers événements d'un membre puis extrapolée ;
+- recherches répétées dans le planning d'un membre gardé en mémoire : arbre d'intervalles
+  (IntervalTree) contre parcours de tous ses événements, pour --queries recherches
+  (les contrôles de l'assignation et de la mise à jour sont, eux, une requête indexée).
+
+Usage : python -m benchmarks.bench_conflicts [--events 1000000] [--supports 50] [--queries 1000]
+                                            [--pairwise 2000]
+"""
+import argparse
+import gc
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from crm.models.conflicts import IntervalTree, sweep_conflicts
+
+
+def pairwise(rows) -> int:
+    """Comparaison de chaque paire d'événements d'un même membre."""
+    count = 0
+    for i, (_, start, end, _) in enumerate(rows):
+        for _, other_start, other_end, _ in rows[i + 1:]:
+            if other_start <= end and other_end >= start:
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--supports", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--pairwise", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    options = parser.parse_args()
+
+    rng = random.Random(options.seed)
+    base = datetime(2030, 1, 1)
+    # Période couverte telle qu'un membre a en moyenne peu d'événements simultanés.
+    days = max(options.events // options.supports, 1)
+    rows = []
+    for event_id in range(1, options.events + 1):
+        start = base + timedelta(days=rng.randrange(days))
+        rows.append((rng.randrange(1, options.supports + 1), start,
+                     start + timedelta(days=rng.choice((0, 0, 0, 1, 2))), event_id))
+    rows.sort()
+    # Les millions d'objets générés ne sont plus parcourus par le ramasse-miettes pendant les mesures.
+    gc.freeze()
+    print(f"{options.events} événements, {options.supports} membres du support, {days} jours")
+
+    start = time.perf_counter()
+    conflicts = sum(1 for _ in sweep_conflicts(rows))
+    sweep = time.perf_counter() - start
+
+    by_support = defaultdict(list)
+    for row in rows:
+        by_support[row[0]].append(row)
+    # Comparaison des paires : quadratique par membre, extrapolée à partir des premiers
+    # événements d'un membre.
+    sample = next(iter(by_support.values()))[:options.pairwise]
+    start = time.perf_counter()
+    pairwise(sample)
+    pairwise_seconds = (time.perf_counter() - start) * sum(
+        (len(support_rows) / len(sample)) ** 2 for support_rows in by_support.values())
+
+    print(f"\nRapport : {conflicts} conflit(s)")
+    print(f"{'méthode':<28}{'durée (s)':>12}")
+    print(f"{'balayage':<28}{sweep:>12.3f}")
+    print(f"{'paires (extrapolé)':<28}{pairwise_seconds:>12.1f}")
+
+    support_ids = list(by_support)
+    trees = {}
+    start = time.perf_counter()
+    for support_id in support_ids:
+        trees[support_id] = IntervalTree((start_date, end_date, event_id)
+                                         for _, start_date, end_date, event_id in by_support[support_id])
+    build = time.perf_counter() - start
+
+    queries = []
+    for _ in range(options.queries):
+        day = base + timedelta(days=rng.randrange(days))
+        queries.append((rng.choice(support_ids), day, day + timedelta(days=rng.randrange(3))))
+
+    start = time.perf_counter()
+    found_tree = sum(len(trees[support_id].overlapping(low, high)) for support_id, low, high in queries)
+    tree_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found_scan = sum(sum(1 for _, start_date, end_date, _ in by_support[support_id]
+                         if start_date <= high and end_date >= low)
+                     for support_id, low, high in queries)
+    scan_seconds = time.perf_counter() - start
+    assert found_tree == found_scan
+
+    print(f"\nContrôles : {options.queries} recherches ({found_tree} chevauchements)")
+    print(f"{'méthode':<28}{'durée (s)':>12}{'par recherche (µs)':>22}")
+    print(f"{'arbre (construction)':<28}{build:>12.3f}{'':>22}")
+    print("arbre d'intervalles".ljust(28) + f"{tree_seconds:>12.3f}{tree_seconds / options.queries * 1e6:>22.1f}")
+    print(f"{'parcours du membre':<28}{scan_seconds:>12.3f}{scan_seconds / options.queries * 1e6:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark de la latence d'une commande servie par le démon (`crm daemon start`) contre un lancement à froid.
+
+Sur une base SQLite de benchmark, exécute quelques commandes de lecture :
+- via le démon : `python -m crm ...` ne charge que le client léger et transmet la commande ;
+- à froid : un interpréteur neuf par commande (imports, connexion, lecture de la session).
+
+Usage : python -m benchmarks.bench_daemon [--events 10000] [--runs 20] [--workers 4]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import open_sqlite, seed
+from crm.cli_commands.cli_daemon_client import request
+from crm.cli_commands.cli_session import save_session
+
+COMMANDS = [
+    "list events --limit 20",
+    "list events --all --limit 20",
+    "list clients --all --limit 20",
+]
+
+DAEMON_SCRIPT = """
+from pathlib import Path
+from benchmarks.datagen import open_sqlite
+open_sqlite({database!r})
+from crm.cli_commands.cli_daemon import Daemon
+Daemon(Path({socket!r}), {workers}).serve()
+"""
+
+COLD_SCRIPT = """
+from benchmarks.datagen import open_sqlite
+open_sqlite({database!r})
+from crm.__main__ import app
+app({args!r}, prog_name="crm", standalone_mode=False)
+"""
+
+
+def percentiles(durations: list) -> str:
+    durations = sorted(durations)
+    p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+    return f"{statistics.median(durations):>10.2f}{p99:>10.2f}"
+
+
+def timed(command: list, runs: int) -> list:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        os.environ.setdefault("SESSION_SECRET", "bench-secret")
+        socket_file = os.path.join(directory, "crm.sock")
+        os.environ["CRM_DAEMON_SOCKET"] = socket_file
+        database_path = os.path.join(directory, "daemon.db")
+        seed(open_sqlite(database_path), options.events)
+        # Utilisateur 3 : membre du support (rôles alternés dans datagen).
+        save_session(3, "user3", "user3@example.com", "SUPPORT")
+
+        script = DAEMON_SCRIPT.format(database=database_path, socket=socket_file, workers=options.workers)
+        daemon = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.DEVNULL)
+        try:
+            while request({"type": "ping"}) is None:
+                time.sleep(0.05)
+
+            print(f"{'commande':<34}{'mode':<8}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+            for command in COMMANDS:
+                args = command.split()
+                warm = timed([sys.executable, "-m", "crm", *args], options.runs)
+                cold = timed([sys.executable, "-c", COLD_SCRIPT.format(database=database_path, args=args)],
+                             options.runs)
+                print(f"{command:<34}{'démon':<8}{percentiles(warm)}")
+                print(f"{command:<34}{'froid':<8}{percentiles(cold)}")
+        finally:
+            request({"type": "stop"})
+            daemon.wait(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark des modes de validation des emails (EMAIL_VALIDATION) sur un lot d'adresses.
+
+Les requêtes DNS sont simulées (--latency millisecondes par domaine, sans réseau) pour comparer :
+- full, adresse par adresse : une requête par adresse (comportement d'origine) ;
+- full, par lot : une requête par domaine distinct, en parallèle ;
+- cached, à froid puis à chaud : le second passage est servi par le cache des domaines ;
+- syntax : aucune requête.
+
+Usage : python -m benchmarks.bench_email [--emails 2000] [--domains 50] [--latency 30]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import crm.cli_commands.cli_email as cli_email
+from crm.cli_commands.cli_email import validate_emails
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--domains", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=30.0)
+    options = parser.parse_args()
+
+    lookups = []
+
+    def simulated(domain, domain_i18n, resolver=None):
+        lookups.append(domain)
+        time.sleep(options.latency / 1000)
+        return True
+
+    cli_email.domain_deliverable = simulated
+    emails = [f"contact{i}@domaine{i % options.domains}.fr" for i in range(options.emails)]
+
+    def timed(label, run):
+        lookups.clear()
+        start = time.perf_counter()
+        run()
+        print(f"{label:<28}{time.perf_counter() - start:>12.3f}{len(lookups):>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        print(f"{len(emails)} adresses, {options.domains} domaines, {options.latency:.0f} ms par requête DNS")
+        print(f"{'mode':<28}{'durée (s)':>12}{'requêtes':>10}")
+        timed("full, adresse par adresse", lambda: [validate_emails([email], "full") for email in emails])
+        timed("full, par lot", lambda: validate_emails(emails, "full"))
+        timed("cached, à froid", lambda: validate_emails(emails, "cached"))
+        timed("cached, à chaud", lambda: [validate_emails([email], "cached") for email in emails])
+        timed("syntax", lambda: validate_emails(emails, "syntax"))
+
+
+if __name__ == "__main__":
+    main()
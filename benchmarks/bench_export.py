@@ -0,0 +1,57 @@
+"""
+Benchmark de l'export en flux des événements.
+
+Génère des bases SQLite de tailles croissantes puis exporte les événements en NDJSON
+vers /dev/null dans un processus neuf, en relevant la durée et le pic de mémoire (RSS).
+Le pic de mémoire doit rester stable quelle que soit la taille du résultat.
+
+Usage : python -m benchmarks.bench_export [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.datagen import open_sqlite, seed
+
+EXPORT_SCRIPT = """
+import os, resource, sys, time
+from benchmarks.datagen import open_sqlite
+from crm.models.models import Event
+from crm.cli_commands.cli_export import ExportFormat, write_rows
+from crm.models.database import iter_rows
+
+open_sqlite(sys.argv[1])
+
+columns = ["id", "contrat_id", "support_contact_id", "start_date", "end_date", "attendees", "notes"]
+query = Event.select(Event.id, Event.contrat, Event.support_contact, Event.start_date,
+                     Event.end_date, Event.attendees, Event.notes).order_by(Event.id)
+start = time.perf_counter()
+with open(os.devnull, "w") as out:
+    count = write_rows(iter_rows(query), columns, ExportFormat.ndjson, out)
+elapsed = time.perf_counter() - start
+print(count, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    options = parser.parse_args()
+
+    print(f"{'événements':>12}{'durée (s)':>12}{'lignes/s':>12}{'RSS max (Mo)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in options.sizes:
+            path = os.path.join(directory, f"events_{size}.db")
+            database = open_sqlite(path)
+            seed(database, size)
+            database.close()
+            output = subprocess.run([sys.executable, "-c", EXPORT_SCRIPT, path],
+                                    check=True, capture_output=True, text=True).stdout.split()
+            count, elapsed, max_rss_kb = int(output[0]), float(output[1]), int(output[2])
+            print(f"{count:>12}{elapsed:>12.2f}{count / elapsed:>12.0f}{max_rss_kb / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
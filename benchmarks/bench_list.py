@@ -0,0 +1,64 @@
+"""
+Benchmark de la pagination des listes : pagination par clé (keyset) contre OFFSET.
+
+Génère un jeu de données SQLite (1M d'événements par défaut) puis mesure le temps
+d'obtention de la première page, d'une page au milieu et de la dernière page des
+événements non assignés triés par date de début, avec les deux méthodes.
+
+Usage : python -m benchmarks.bench_list [--events 1000000] [--limit 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.datagen import open_sqlite, seed
+from crm.models.models import Event
+from crm.models.queries import keyset_page, unassigned_events
+
+KEYS = [Event.start_date, Event.id]
+
+
+def timed(function, runs: int = 5) -> float:
+    """Retourne la durée médiane d'un appel, en millisecondes."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = open_sqlite(os.path.join(directory, "list.db"))
+        # Schéma et index de l'application (migrations), comme en production.
+        seed(database, options.events)
+        database.execute_sql("ANALYZE")
+
+        query = unassigned_events().select(Event.start_date, Event.id, Event.attendees)
+        total = query.count()
+        # Clés de début de page pour les positions mesurées.
+        positions = {"première": 0, "milieu": total // 2, "dernière": max(0, total - options.limit)}
+        cursors = {}
+        for name, position in positions.items():
+            row = query.order_by(*KEYS).offset(position - 1).limit(1).tuples().first() if position else None
+            cursors[name] = row[:2] if row else None
+
+        print(f"{total} événements non assignés, pages de {options.limit} lignes.")
+        print(f"{'page':<12}{'keyset (ms)':>14}{'OFFSET (ms)':>14}")
+        for name, position in positions.items():
+            keyset_ms = timed(lambda: keyset_page(query, KEYS, cursors[name], options.limit))
+            offset_ms = timed(lambda: list(query.order_by(*KEYS).offset(position).limit(options.limit).tuples()))
+            print(f"{name:<12}{keyset_ms:>14.2f}{offset_ms:>14.2f}")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
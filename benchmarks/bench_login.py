@@ -0,0 +1,86 @@
+"""
+Benchmark de la latence de connexion selon l'algorithme et le coût de hachage.
+
+Pour chaque configuration (bcrypt à plusieurs coûts, argon2id à plusieurs couples
+temps / mémoire), crée un utilisateur dans une base SQLite en mémoire puis mesure
+`verify_user` (lecture de l'utilisateur + vérification du mot de passe).
+Pour bcrypt, la première connexion recalcule le hachage en argon2id (politique par défaut) :
+elle est mesurée séparément de la vérification seule.
+Le débit indiqué est le nombre de connexions par seconde et par cœur ; il sert à dimensionner
+le coût par rapport au débit de connexions attendu.
+
+Usage : python -m benchmarks.bench_login [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import time
+
+import bcrypt
+from peewee import SqliteDatabase
+
+from crm.cli_commands.cli_auth import verify_user
+from crm.cli_commands.cli_passwords import password_hasher, verify_password
+from crm.models.models import User, db
+
+PASSWORD = "Mot-de-passe-2024"
+
+# (libellé, fonction de hachage, variables ARGON2_* de la politique pendant la mesure)
+CONFIGURATIONS = [
+    ("bcrypt r=10", lambda: bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=10)).decode(), None),
+    ("bcrypt r=12", lambda: bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=12)).decode(), None),
+]
+for time_cost, memory_cost in ((1, 19456), (2, 19456), (3, 65536), (4, 131072)):
+    CONFIGURATIONS.append((
+        f"argon2id t={time_cost} m={memory_cost // 1024}Mio",
+        lambda t=time_cost, m=memory_cost: password_hasher(t, m).hash(PASSWORD),
+        {"ARGON2_TIME_COST": str(time_cost), "ARGON2_MEMORY_COST": str(memory_cost)},
+    ))
+
+
+def timed(function, runs: int) -> list:
+    """Durées d'appel, en millisecondes."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        assert function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def report(label: str, durations: list):
+    p50 = statistics.median(durations)
+    print(f"{label:<34}{p50:>10.1f}{max(durations):>10.1f}{1000 / p50:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    options = parser.parse_args()
+
+    database = SqliteDatabase(":memory:")
+    database.bind([User])
+    db.initialize(database)
+    database.create_tables([User])
+
+    print(f"{'configuration':<34}{'p50 (ms)':>10}{'max (ms)':>10}{'connexions/s':>14}")
+    for index, (label, make_hash, policy) in enumerate(CONFIGURATIONS):
+        email = f"user{index}@example.com"
+        hashed = make_hash()
+        User.create(username=f"user{index}", email=email, role="SUPPORT", password=hashed)
+
+        if policy is None:
+            report(label, timed(lambda: verify_password(PASSWORD, hashed).valid, options.runs))
+
+            def first_login():
+                User.update(password=hashed).where(User.email == email).execute()
+                return verify_user(email, PASSWORD)
+            report(f"{label} -> argon2id (1re conn.)", timed(first_login, options.runs))
+        else:
+            # La politique correspond au hachage : aucun recalcul pendant la mesure.
+            os.environ.update(policy)
+            report(label, timed(lambda: verify_user(email, PASSWORD), options.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark du coût de l'instrumentation SQL de `crm --profile`.
+
+Sur une base SQLite de benchmark, mesure la durée médiane d'une page d'événements (une requête
+et ses lignes lues) dans trois situations : base non instrumentée, base instrumentée sans
+profilage en cours (cas du démon ou du shell après un premier --profile), et profilage actif.
+
+Usage : python -m benchmarks.bench_profile [--events 10000] [--limit 1000] [--runs 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.datagen import open_sqlite, seed
+from crm.models.models import Event
+from crm.models.profiling import Profiler, install
+
+
+def timed(function, runs: int) -> float:
+    """Retourne la durée médiane d'un appel, en millisecondes."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=50)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = open_sqlite(os.path.join(directory, "profile.db"))
+        seed(database, options.events)
+
+        def page():
+            list(Event.select(Event.id, Event.start_date, Event.attendees).limit(options.limit).tuples())
+
+        results = {"non instrumentée": timed(page, options.runs)}
+        install(database)
+        results["instrumentée"] = timed(page, options.runs)
+
+        profiler = Profiler("bench")
+        profiler.start()
+        try:
+            results["profilage actif"] = timed(page, options.runs)
+        finally:
+            profiler.stop()
+
+        print(f"Page de {options.limit} événements, médiane sur {options.runs} exécutions.")
+        print(f"{'base':<20}{'durée (ms)':>12}{'surcoût':>10}")
+        reference = results["non instrumentée"]
+        for name, duration in results.items():
+            print(f"{name:<20}{duration:>12.3f}{(duration / reference - 1) * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
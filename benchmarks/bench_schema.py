@@ -0,0 +1,55 @@
+"""
+Benchmark de la validation d'un lot d'événements : schéma compilé (crm.cli_commands.cli_schema)
+contre les contrôles d'origine, qui analysaient les trois dates à chaque vérification.
+
+Usage : python -m benchmarks.bench_schema [--records 100000] [--contrats 100]
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from crm.cli_commands.cli_schema import EVENT_SCHEMA, contrat_window
+
+
+def original_checks(record: dict, start_str: str, end_str: str) -> bool:
+    """Contrôles d'origine (valid_event_date_for_start / _for_end, is_end_date_valid)."""
+    def parse(text):
+        return datetime.strptime(text, "%Y-%m-%d").date()
+
+    start_ok = parse(start_str) <= parse(record["start_date"]) <= parse(end_str)
+    end_ok = parse(record["start_date"]) <= parse(record["end_date"]) <= parse(end_str)
+    return start_ok and end_ok and parse(record["end_date"]) >= parse(record["start_date"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--contrats", type=int, default=100)
+    options = parser.parse_args()
+
+    base = date.today() + timedelta(days=30)
+    contrats = [(str(base + timedelta(days=i)), str(base + timedelta(days=i + 365))) for i in range(options.contrats)]
+    records = []
+    for i in range(options.records):
+        day = base + timedelta(days=i % options.contrats + i % 200)
+        records.append({"contrat": i % options.contrats, "start_date": str(day),
+                        "end_date": str(day + timedelta(days=1)), "attendees": str(i % 500)})
+
+    start = time.perf_counter()
+    valid = sum(original_checks(record, *contrats[record["contrat"]]) for record in records)
+    original = time.perf_counter() - start
+
+    windows = [contrat_window(*bounds) for bounds in contrats]
+    start = time.perf_counter()
+    results = EVENT_SCHEMA.validate_many(records, windows=lambda record: windows[record["contrat"]])
+    compiled = time.perf_counter() - start
+    assert sum(result.ok for result in results) == valid
+
+    print(f"{options.records} événements, {options.contrats} contrats ({valid} valides)")
+    print(f"{'validation':<26}{'durée (s)':>12}{'enreg./s':>12}")
+    for label, seconds in (("contrôles d'origine", original), ("schéma compilé", compiled)):
+        print(f"{label:<26}{seconds:>12.3f}{options.records / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark de la vérification de session au démarrage d'une commande.
+
+Compare trois façons de connaître l'utilisateur connecté :
+- json : lecture d'un fichier JSON non signé (ancien config.json, aucune garantie) ;
+- db : lecture du fichier JSON puis revalidation de l'utilisateur en base (une requête par commande) ;
+- jwt : vérification locale du jeton signé (crm.cli_commands.cli_session).
+
+Mesure le coût d'une vérification dans un processus déjà démarré, puis le temps de démarrage
+d'un interpréteur neuf qui effectue la vérification (imports compris).
+La base de revalidation est une base SQLite locale : avec PostgreSQL, il faut ajouter
+la connexion et l'aller-retour réseau.
+
+Usage : python -m benchmarks.bench_session [--runs 20] [--checks 2000]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import open_sqlite, seed
+from crm.cli_commands.cli_session import load_session, save_session
+from crm.models.models import User
+
+USER = {"user_id": 3, "username": "user3", "email": "user3@example.com", "role": "SUPPORT"}
+
+JSON_SCRIPT = """
+import json
+with open({path!r}) as f:
+    assert json.load(f)["user_id"]
+"""
+
+DB_SCRIPT = """
+import json
+from benchmarks.datagen import open_sqlite
+from crm.models.models import User
+with open({path!r}) as f:
+    info = json.load(f)
+open_sqlite({database!r})
+assert User.get_by_id(info["user_id"]).role
+"""
+
+JWT_SCRIPT = """
+from crm.cli_commands.cli_session import load_session
+assert load_session()["user_id"]
+"""
+
+
+def per_check_us(function, checks: int) -> float:
+    """Durée moyenne d'une vérification, en microsecondes."""
+    start = time.perf_counter()
+    for _ in range(checks):
+        function()
+    return (time.perf_counter() - start) / checks * 1_000_000
+
+
+def time_script(script: str, runs: int) -> list:
+    """Exécute le script dans un interpréteur neuf et retourne les durées en millisecondes."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--checks", type=int, default=2000)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        os.environ.setdefault("SESSION_SECRET", "bench-secret")
+
+        json_path = os.path.join(directory, "config.json")
+        with open(json_path, "w") as f:
+            json.dump(USER, f)
+        save_session(**USER)
+
+        database_path = os.path.join(directory, "session.db")
+        database = open_sqlite(database_path)
+        seed(database, 10_000)
+
+        def check_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        def check_db():
+            info = check_json()
+            return User.get_by_id(info["user_id"]).role
+
+        checks = {
+            "json": (check_json, JSON_SCRIPT),
+            "db": (check_db, DB_SCRIPT),
+            "jwt": (lambda: load_session(refresh=False), JWT_SCRIPT),
+        }
+
+        print(f"{'session':<8}{'vérif. (µs)':>12}{'démarrage p50 (ms)':>20}{'min (ms)':>10}")
+        for name, (check, script) in checks.items():
+            durations = time_script(script.format(path=json_path, database=database_path), options.runs)
+            print(f"{name:<8}{per_check_us(check, options.checks):>12.1f}"
+                  f"{statistics.median(durations):>20.1f}{min(durations):>10.1f}")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark de la latence par commande dans le shell (`crm shell`) contre un lancement à froid.
+
+Sur une base SQLite de benchmark, exécute quelques commandes de lecture :
+- dans le shell (même processus : modules, connexion et session déjà en mémoire) ;
+- à froid : un interpréteur neuf par commande (imports, connexion, lecture de la session).
+
+Usage : python -m benchmarks.bench_shell [--events 10000] [--runs 20]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import typer
+
+from benchmarks.datagen import open_sqlite, seed
+from crm.__main__ import app
+from crm.cli_commands.cli_session import save_session
+from crm.cli_commands.cli_shell import Shell
+
+COMMANDS = [
+    "list events --limit 20",
+    "list events --all --limit 20",
+    "list clients --all --limit 20",
+]
+
+COLD_SCRIPT = """
+from benchmarks.datagen import open_sqlite
+open_sqlite({database!r})
+from crm.__main__ import app
+app({args!r}, prog_name="crm", standalone_mode=False)
+"""
+
+
+def percentiles(durations: list) -> str:
+    durations = sorted(durations)
+    p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+    return f"{statistics.median(durations):>10.2f}{p99:>10.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        os.environ.setdefault("SESSION_SECRET", "bench-secret")
+        database_path = os.path.join(directory, "shell.db")
+        seed(open_sqlite(database_path), options.events)
+        # Utilisateur 3 : membre du support (rôles alternés dans datagen).
+        save_session(3, "user3", "user3@example.com", "SUPPORT")
+
+        shell = Shell(typer.main.get_command(app))
+        print(f"{'commande':<34}{'mode':<8}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+        for command in COMMANDS:
+            warm = []
+            for _ in range(options.runs):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    shell.run_line(command)
+                    warm.append((time.perf_counter() - start) * 1000)
+
+            cold = []
+            script = COLD_SCRIPT.format(database=database_path, args=command.split())
+            for _ in range(options.runs):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+                cold.append((time.perf_counter() - start) * 1000)
+
+            print(f"{command:<34}{'shell':<8}{percentiles(warm)}")
+            print(f"{command:<34}{'froid':<8}{percentiles(cold)}")
+
+
+if __name__ == "__main__":
+    main()
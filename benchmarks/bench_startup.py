@@ -0,0 +1,65 @@
+"""
+Benchmark du temps de démarrage de la CLI.
+
+Compare le chargement paresseux des sous-commandes (registre de crm.cli_commands.cli_registry)
+avec l'import de toutes les sous-applications, et vérifie que `--help` et `auth logout`
+ne chargent jamais la couche base de données.
+
+Usage : python -m benchmarks.bench_startup [--runs 20]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ["crm.models.models", "peewee", "psycopg2", "bcrypt", "argon2", "email_validator"]
+
+LAZY_SCRIPT = """
+import sys
+from typer.testing import CliRunner
+from crm.__main__ import app
+CliRunner().invoke(app, {args!r})
+loaded = [m for m in {modules!r} if m in sys.modules]
+assert not loaded, loaded
+"""
+
+# Référence : import de toutes les sous-applications, comme avant le registre paresseux.
+EAGER_SCRIPT = """
+import crm.cli_commands.cli_user, crm.cli_commands.cli_auth, crm.cli_commands.cli_commercial
+import crm.cli_commands.cli_administration, crm.cli_commands.cli_support
+from typer.testing import CliRunner
+from crm.__main__ import app
+CliRunner().invoke(app, {args!r})
+"""
+
+
+def time_script(script: str, runs: int) -> list:
+    """Exécute le script dans un interpréteur neuf et retourne les durées en millisecondes."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    options = parser.parse_args()
+
+    print(f"{'commande':<16}{'mode':<8}{'p50 (ms)':>10}{'min (ms)':>10}")
+    for args in (["--help"], ["auth", "logout"]):
+        for mode, template in (("lazy", LAZY_SCRIPT), ("eager", EAGER_SCRIPT)):
+            # L'import eager nécessite la configuration de la base de données (.env).
+            try:
+                durations = time_script(template.format(args=args, modules=HEAVY_MODULES), options.runs)
+            except subprocess.CalledProcessError as e:
+                print(f"{' '.join(args):<16}{mode:<8} échec : {e.stderr.decode().strip().splitlines()[-1]}")
+                continue
+            print(f"{' '.join(args):<16}{mode:<8}{statistics.median(durations):>10.1f}{min(durations):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
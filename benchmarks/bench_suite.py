@@ -0,0 +1,257 @@
+"""
+Suite de benchmarks des commandes de la CLI sur un jeu de données synthétique.
+
+Génère une base (SQLite avec insert_many, ou PostgreSQL locale avec COPY) à l'échelle demandée,
+avec le schéma et les index des migrations de l'application, puis chronomètre chaque chemin de commande dans le processus (sans le démarrage de l'interpréteur,
+mesuré par bench_startup) : connexion, refus de permission, ajout / mise à jour / suppression
+des clients, contrats, événements et utilisateurs, listes et exports.
+Chaque scénario est joué --runs fois ; les durées (p50, p99, moyenne) et le nombre de requêtes SQL
+par commande sont écrits dans un fichier JSON, avec la liste des index de la base, comparable à
+celui d'un autre commit avec --compare (un index disparu compte comme une régression).
+La validation des emails est limitée à la syntaxe (EMAIL_VALIDATION=syntax, sans requête DNS).
+
+Usage : python -m benchmarks.bench_suite [--scale 10k] [--backend sqlite|postgres] [--runs 20]
+                                         [--output bench-results.json] [--compare ancien.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Callable, List, NamedTuple
+
+# Validation des emails limitée à la syntaxe (sans requête DNS), pour tous les chemins de validation.
+os.environ.setdefault("EMAIL_VALIDATION", "syntax")
+
+from typer.testing import CliRunner  # noqa: E402
+
+from benchmarks.datagen import open_postgres, open_sqlite, parse_scale, seed  # noqa: E402
+from crm.__main__ import app  # noqa: E402
+from crm.cli_commands.cli_passwords import hash_password  # noqa: E402
+from crm.cli_commands.cli_permissions import reset_session  # noqa: E402
+from crm.cli_commands.cli_session import clear_session, save_session  # noqa: E402
+from crm.models.models import Client, Contrat, Event, User  # noqa: E402
+from crm.models.profiling import Profiler  # noqa: E402
+
+# Utilisateurs du jeu de données (rôles alternés dans datagen) et mot de passe de connexion.
+COMMERCIAL, ADMINISTRATION, SUPPORT = 1, 2, 3
+PASSWORD = "motdepasse-bench"
+
+START = date.today() + timedelta(days=30)
+END = START + timedelta(days=365)
+
+
+class Scenario(NamedTuple):
+    name: str
+    user: int  # utilisateur connecté (0 : aucun)
+    args: List[str]
+    answers: Callable[[int], str] = lambda i: ""
+    expect: str = ""
+
+
+def bench_ids(model, field, prefix: str) -> List[int]:
+    """Identifiants des lignes créées par la suite (nom ou notes commençant par `prefix`)."""
+    return [row_id for (row_id,) in model.select(model.id).where(field.startswith(prefix)).order_by(model.id).tuples()]
+
+
+def bench_clients(i: int) -> int:
+    return bench_ids(Client, Client.name, "Bench ")[i]
+
+
+def bench_contrats(i: int) -> int:
+    clients = bench_ids(Client, Client.name, "Bench ")
+    return [c for (c,) in Contrat.select(Contrat.id).where(Contrat.client.in_(clients)).order_by(Contrat.id).tuples()][i]
+
+
+def bench_events(i: int) -> int:
+    return bench_ids(Event, Event.notes, "Bench")[i]
+
+
+def bench_day(i: int) -> date:
+    """
+    Date de l'événement du i-ème passage : un jour sur deux, pour que les événements assignés
+    au même membre du support ne se chevauchent pas (conflits de planning refusés).
+    """
+    return START + timedelta(days=2 * i)
+
+
+def scenarios(output: str) -> List[Scenario]:
+    """Chemins de commande, dans un ordre où chacun dispose des lignes créées par les précédents."""
+    return [
+        Scenario("auth authenticate", 0, ["auth", "authenticate", "--email", "user1@example.com", "--password", PASSWORD],
+                 expect="Authentification réussie."),
+        Scenario("permission refusée", SUPPORT, ["commercial", "add-client"], expect="Accès refusé."),
+        Scenario("commercial add-client", COMMERCIAL, ["commercial", "add-client"],
+                 lambda i: f"Bench {i}\nbench{i}@example.com\n0601020304\nBench\n", "ajouté avec succès"),
+        Scenario("commercial update-client", COMMERCIAL, ["commercial", "update-client"],
+                 lambda i: f"{bench_clients(i)}\nBench {i}\nbench{i}@example.com\n0102030405\nBench SA\n",
+                 "mis à jour avec succès"),
+        Scenario("administration add-contrat", ADMINISTRATION, ["administration", "add-contrat"],
+                 lambda i: f"{bench_clients(i)}\nOui\nOui\n{START}\n{END}\n1000\n", "ajouté avec succès"),
+        Scenario("administration update-contrat", ADMINISTRATION, ["administration", "update-contrat"],
+                 lambda i: f"{bench_contrats(i)}\nEN_COURS\n{START}\n{END}\n2000\nOui\nOui\n", "mis à jour avec succès"),
+        Scenario("commercial add-event", COMMERCIAL, ["commercial", "add-event"],
+                 lambda i: f"{bench_contrats(i)}\n{bench_day(i)}\n{bench_day(i)}\n100\nBench\n", "ajouté avec succès"),
+        Scenario("support assign-support-to-event", SUPPORT, ["support", "assign-support-to-event"],
+                 lambda i: f"{bench_events(i)}\n", "assigné à l'événement"),
+        Scenario("support update-event", SUPPORT, ["support", "update-event"],
+                 lambda i: f"{bench_events(i)}\n{bench_day(i)}\n{bench_day(i)}\n50\nBench\n", "mis à jour avec succès"),
+        Scenario("support delete-event", SUPPORT, ["support", "delete-event"],
+                 lambda i: f"{bench_events(0)}\n", "supprimé avec succès"),
+        Scenario("administration delete-contrat", ADMINISTRATION, ["administration", "delete-contrat"],
+                 lambda i: f"{bench_contrats(0)}\n", "supprimé avec succès"),
+        Scenario("commercial delete-client", COMMERCIAL, ["commercial", "delete-client"],
+                 lambda i: f"{bench_clients(0)}\n", "supprimé avec succès"),
+        Scenario("user add-user", 0, ["user", "add-user"],
+                 lambda i: f"bench{i}\nbench-user{i}@example.com\n{PASSWORD}\nSUPPORT\n", "ajouté avec succès"),
+        Scenario("list clients", COMMERCIAL, ["list", "clients"]),
+        Scenario("list contrats", ADMINISTRATION, ["list", "contrats", "--all"]),
+        Scenario("list events", SUPPORT, ["list", "events", "--all"]),
+        Scenario("export clients", COMMERCIAL, ["export", "clients", "-o", output]),
+        Scenario("export contrats", ADMINISTRATION, ["export", "contrats", "-o", output]),
+        Scenario("export events", SUPPORT, ["export", "events", "-o", output]),
+        Scenario("auth logout", COMMERCIAL, ["auth", "logout"]),
+    ]
+
+
+def prepare(database, events: int):
+    """
+    Génère le jeu de données (schéma créé par les migrations, voir datagen.seed) et donne un vrai
+    mot de passe au commercial ; retourne (lignes, durée).
+    """
+    start = time.perf_counter()
+    counts = seed(database, events)
+    seconds = time.perf_counter() - start
+    User.update(password=hash_password(PASSWORD)).where(User.id == COMMERCIAL).execute()
+    return counts, seconds
+
+
+def login_as(user_id: int):
+    if user_id:
+        user = User.get_by_id(user_id)
+        save_session(user.id, user.username, user.email, user.role)
+    else:
+        clear_session()
+    reset_session()
+
+
+def run_scenario(runner: CliRunner, scenario: Scenario, runs: int) -> dict:
+    durations, queries = [], []
+    for i in range(runs):
+        login_as(scenario.user)
+        answers = scenario.answers(i)
+        profiler = Profiler(scenario.name)
+        profiler.start()
+        start = time.perf_counter()
+        result = runner.invoke(app, scenario.args, input=answers)
+        durations.append((time.perf_counter() - start) * 1000)
+        profiler.stop()
+        queries.append(profiler.queries)
+        if result.exit_code != 0 or scenario.expect not in result.output:
+            raise RuntimeError(f"{scenario.name} : résultat inattendu (code {result.exit_code})\n{result.output}")
+
+    durations.sort()
+    return {
+        "p50_ms": round(statistics.median(durations), 3),
+        "p99_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(durations), 3),
+        "queries": round(statistics.median(queries), 1),
+        "runs": runs,
+    }
+
+
+def schema_indexes(database) -> List[str]:
+    """Index de la base (table.index), pour repérer un index supprimé ou renommé entre deux commits."""
+    return sorted(f"{table}.{index.name}" for table in database.get_tables() for index in database.get_indexes(table))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> List[str]:
+    """
+    Scénarios dont la médiane dépasse celle de la référence de plus de `threshold` (20 % par défaut),
+    et index de la référence absents de la base mesurée.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nComparaison avec {baseline_path} (commit {baseline.get('commit') or '?'}) :")
+    regressions = []
+    for index in sorted(set(baseline.get("indexes", [])) - set(results["indexes"])):
+        regressions.append(index)
+        print(f"index absent : {index}  << régression")
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1 if previous["p50_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  << régression"
+        print(f"{name:<34}{previous['p50_ms']:>10.2f}{current['p50_ms']:>10.2f}{change * 100:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="10k", help="10k, 100k, 1m, 10m ou un nombre d'événements.")
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--pg-database", default="epic_events_bench",
+                        help="Base PostgreSQL dédiée (ses tables sont recréées).")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="Fichier de résultats de référence (autre commit).")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    options = parser.parse_args()
+    events = parse_scale(options.scale)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CRM_SESSION_DIR"] = directory
+        os.environ.setdefault("SESSION_SECRET", "bench-secret")
+
+        if options.backend == "postgres":
+            database = open_postgres(options.pg_database)
+        else:
+            database = open_sqlite(os.path.join(directory, "suite.db"))
+        counts, seed_seconds = prepare(database, events)
+        print(f"Jeu de données ({options.backend}) : {counts}, généré en {seed_seconds:.1f}s.")
+
+        runner = CliRunner()
+        results = {
+            "commit": git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "backend": options.backend,
+            "events": events,
+            "counts": counts,
+            "seed_seconds": round(seed_seconds, 3),
+            "indexes": schema_indexes(database),
+            "results": {},
+        }
+        print(f"{'commande':<34}{'p50 (ms)':>10}{'p99 (ms)':>10}{'requêtes':>10}")
+        for scenario in scenarios(os.path.join(directory, "export.out")):
+            measures = run_scenario(runner, scenario, options.runs)
+            results["results"][scenario.name] = measures
+            print(f"{scenario.name:<34}{measures['p50_ms']:>10.2f}{measures['p99_ms']:>10.2f}{measures['queries']:>10}")
+
+    with open(options.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {options.output}.")
+
+    if options.compare and compare(results, options.compare, options.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
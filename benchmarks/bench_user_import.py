@@ -0,0 +1,79 @@
+"""
+Benchmark de l'import d'utilisateurs en masse selon le nombre de processus de hachage.
+
+Génère un fichier JSONL d'utilisateurs puis l'importe dans une base SQLite neuve avec
+1, 2, 4... processus (jusqu'au nombre de cœurs), et affiche le débit et l'accélération.
+Le coût argon2 est celui de la politique courante (variables ARGON2_*).
+La validation des emails est limitée à la syntaxe (sans requête DNS) pour ne mesurer que l'import.
+
+Usage : python -m benchmarks.bench_user_import [--users 200]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from email_validator import EmailNotValidError, validate_email
+
+from benchmarks.datagen import MODELS, open_sqlite
+from crm.cli_commands import cli_user
+from crm.cli_commands.cli_bulk import RejectWriter
+
+
+def syntax_only(email: str) -> bool:
+    try:
+        validate_email(email, check_deliverability=False)
+        return True
+    except EmailNotValidError:
+        return False
+
+
+def worker_counts() -> list:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    options = parser.parse_args()
+
+    cli_user.is_valid_email = syntax_only
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "users.jsonl")
+        with open(source, "w", encoding="utf-8") as f:
+            for i in range(options.users):
+                f.write(json.dumps({"username": f"user{i}", "email": f"user{i}@epicevents.fr",
+                                    "password": f"motdepasse{i}", "role": "SUPPORT"}) + "\n")
+
+        print(f"{'processus':>10}{'durée (s)':>12}{'utilisateurs/s':>16}{'accélération':>14}")
+        baseline = None
+        for workers in worker_counts():
+            database = open_sqlite(os.path.join(directory, f"users{workers}.db"))
+            database.create_tables(MODELS)
+
+            start = time.perf_counter()
+            with RejectWriter(os.path.join(directory, "rejects.jsonl")) as rejects:
+                if workers == 1:
+                    imported = cli_user.import_users_from_file(source, rejects)
+                else:
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        imported = cli_user.import_users_from_file(source, rejects, executor=executor)
+            elapsed = time.perf_counter() - start
+            database.close()
+
+            assert imported == options.users
+            baseline = baseline or elapsed
+            print(f"{workers:>10}{elapsed:>12.2f}{imported / elapsed:>16.1f}{baseline / elapsed:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Génération de données synthétiques pour les benchmarks.
+
+Les lignes sont insérées par lots avec `insert_many` dans une base SQLite
+(journal et synchronisation désactivés pendant le chargement), ou chargées avec
+`COPY ... FROM STDIN` dans une base PostgreSQL locale dédiée aux benchmarks.
+"""
+import csv
+import io
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from peewee import Database, PostgresqlDatabase, SqliteDatabase
+
+from crm.models.database import build_database, get_database_settings, parse_database_url
+from crm.models.migrations import SchemaVersion, migrate
+from crm.models.models import User, Client, Contrat, Event, Tombstone, USER_ROLES, db
+
+MODELS = [User, Client, Contrat, Event, Tombstone]
+BATCH_SIZE = 5000
+# Nombre maximal de paramètres d'une requête SQLite compilée sans option particulière.
+SQLITE_MAX_VARIABLES = 32766
+COPY_BATCH_SIZE = 100_000
+EPOCH = datetime(2024, 1, 1)
+
+# Échelles nommées : nombre d'événements générés (les autres tables en sont proportionnelles).
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def parse_scale(value: str) -> int:
+    """Nombre d'événements pour une échelle nommée (10k, 100k, 1m, 10m) ou un entier."""
+    value = value.strip().lower().replace("_", "")
+    if value in SCALES:
+        return SCALES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Échelle invalide : {value} (attendu : {', '.join(SCALES)} ou un entier).")
+
+
+def open_sqlite(path: str) -> SqliteDatabase:
+    """Ouvre une base SQLite de benchmark et y rattache les modèles et `db`."""
+    database = SqliteDatabase(path, pragmas={"journal_mode": "off", "synchronous": 0})
+    database.bind(MODELS)
+    db.initialize(database)
+    return database
+
+
+def open_postgres(database_name: str = "epic_events_bench") -> PostgresqlDatabase:
+    """
+    Ouvre la base PostgreSQL de benchmark : mêmes paramètres de connexion que le .env,
+    mais une base dédiée (`database_name`), dont les tables sont recréées par `seed`.
+    """
+    settings = get_database_settings()
+    database = PostgresqlDatabase(database_name, user=settings["user"], password=settings["password"],
+                                  host=settings["host"], port=settings["port"])
+    database.bind(MODELS)
+    db.initialize(database)
+    return database
+
+
+def open_url(url: str) -> Database:
+    """Ouvre la base décrite par une URL (format de DATABASE_URL) et y rattache les modèles et `db`."""
+    database = build_database(parse_database_url(url))
+    database.bind(MODELS)
+    db.initialize(database)
+    return database
+
+
+def insert_batches(model, rows):
+    """Insère un flux de lignes par lots de BATCH_SIZE (borné par le nombre de paramètres de SQLite)."""
+    batch_size = BATCH_SIZE
+    batch = []
+    for row in rows:
+        if not batch:
+            batch_size = min(BATCH_SIZE, SQLITE_MAX_VARIABLES // len(row))
+        batch.append(row)
+        if len(batch) == batch_size:
+            model.insert_many(batch).execute()
+            batch = []
+    if batch:
+        model.insert_many(batch).execute()
+
+
+def copy_batches(database: Database, model, rows):
+    """Charge un flux de lignes avec COPY FROM STDIN (CSV), par lots de COPY_BATCH_SIZE."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+    fields = [model._meta.fields[name] for name in first]
+    columns = ", ".join(f'"{field.column_name}"' for field in fields)
+    statement = f'COPY "{model._meta.table_name}" ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+    def flush(buffer):
+        buffer.seek(0)
+        with database.cursor() as cursor:
+            cursor.copy_expert(statement, buffer)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in itertools.chain([first], rows):
+        # Champ vide non entre guillemets : NULL pour COPY en CSV.
+        writer.writerow(["" if value is None else value for value in row.values()])
+        count += 1
+        if count == COPY_BATCH_SIZE:
+            flush(buffer)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            count = 0
+    if count:
+        flush(buffer)
+
+
+def generate(events: int, seed_value: int = 42):
+    """
+    Génère les lignes de chaque table, dans l'ordre des clés étrangères : (modèle, lignes) et
+    le nombre de lignes par table. Le jeu de données est proportionné au nombre d'événements :
+    un client pour 10 événements, un contrat pour 5 événements, un utilisateur pour 1000 événements
+    (au moins 10). Un événement sur dix n'a pas de membre du support.
+    """
+    rng = random.Random(seed_value)
+    counts = {
+        "users": max(10, events // 1000),
+        "clients": max(1, events // 10),
+        "contrats": max(1, events // 5),
+        "events": events,
+    }
+    # Identifiants par rôle : COMMERCIAL, ADMINISTRATION et SUPPORT alternent.
+    commercials = range(1, counts["users"] + 1, 3)
+    admins = range(2, counts["users"] + 1, 3)
+    supports = range(3, counts["users"] + 1, 3)
+
+    users = (
+        {"username": f"user{i}", "email": f"user{i}@example.com", "role": USER_ROLES[(i - 1) % 3], "password": "x",
+         "updated_at": EPOCH}
+        for i in range(1, counts["users"] + 1)
+    )
+    clients = (
+        {"name": f"Client {i}", "email": f"client{i}@example.com", "phone": f"06{i:08d}",
+         "company_name": f"Entreprise {i % 500}", "creation_date": EPOCH + timedelta(minutes=i),
+         "last_update_date": EPOCH + timedelta(minutes=i), "updated_at": EPOCH + timedelta(minutes=i),
+         "commercial_contact": rng.choice(commercials)}
+        for i in range(1, counts["clients"] + 1)
+    )
+
+    def contrats():
+        # Un seul contrat EN_COURS par client (index unique partiel de la migration m0002).
+        under_contrat = set()
+        for i in range(1, counts["contrats"] + 1):
+            start = EPOCH + timedelta(days=rng.randrange(730))
+            client = rng.randint(1, counts["clients"])
+            status = "EN_COURS" if i % 4 and client not in under_contrat else "TERMINE"
+            if status == "EN_COURS":
+                under_contrat.add(client)
+            yield {"client": client, "status": status,
+                   "start_date": start, "end_date": start + timedelta(days=rng.randint(30, 365)),
+                   "price": rng.randint(1000, 100000), "payment_received": i % 3 != 0, "is_signed": i % 5 != 0,
+                   "contrat_author": rng.choice(admins), "updated_at": start}
+
+    def events_rows():
+        for i in range(1, events + 1):
+            start = EPOCH + timedelta(days=rng.randrange(730), hours=rng.randrange(24))
+            yield {"contrat": rng.randint(1, counts["contrats"]),
+                   "support_contact": None if i % 10 == 0 else rng.choice(supports),
+                   "start_date": start, "end_date": start + timedelta(hours=rng.randint(2, 72)),
+                   "attendees": rng.randint(10, 5000), "notes": f"Événement {i}", "updated_at": start}
+
+    tables = [(User, users), (Client, clients), (Contrat, contrats()), (Event, events_rows())]
+    return tables, counts
+
+
+def seed(database: Database, events: int, seed_value: int = 42) -> dict:
+    """
+    Crée le schéma par les migrations de l'application (tables et index, comme create_database.py)
+    et le remplit avec le jeu de données de `generate` : `insert_many` par lots sur SQLite, COPY
+    sur PostgreSQL (tables recréées, identifiants à partir de 1).
+    Retourne le nombre de lignes par table.
+    """
+    tables, counts = generate(events, seed_value)
+    postgres = isinstance(database, PostgresqlDatabase)
+    if postgres:
+        with database.bind_ctx([SchemaVersion]):
+            database.drop_tables([*MODELS, SchemaVersion], cascade=True)
+    migrate(database)
+
+    with database.atomic():
+        for model, rows in tables:
+            if postgres:
+                copy_batches(database, model, rows)
+            else:
+                insert_batches(model, rows)
+
+    if postgres:
+        database.execute_sql("ANALYZE")
+    return counts
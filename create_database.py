@@ -1,16 +1,19 @@
 import logging
+import sys
 from crm.models.models import db, User, Client, Contrat, Event
+from crm.models.migrations import migrate, SchemaVersion
 
 # Configurer le logging
 logging.basicConfig(level=logging.INFO)
 
-def create_db():
+def create_db(reset=False):
     try:
         """
-        Crée et initialise la base de données.
+        Crée et met à jour la base de données.
 
-        Cette fonction connecte à la base de données, supprime les tables existantes si elles existent,
-        et crée de nouvelles tables pour les utilisateurs, les clients, les contrats et les événements.
+        Cette fonction connecte à la base de données et applique les migrations du schéma
+        qui ne l'ont pas encore été (voir crm/models/migrations), sans supprimer les données.
+        Avec reset=True (option --reset), les tables existantes sont d'abord supprimées.
         Elle gère les exceptions en cas d'erreurs de connexion ou d'opérations avec la base de données
         et assure la fermeture de la connexion à la fin de l'opération.
         """
@@ -18,13 +21,17 @@ def create_db():
         db.connect()
         logging.info("Connecté à la base de données.")
 
-        logging.info("Suppression des tables existantes...")
-        db.drop_tables([User, Client, Contrat, Event])
-        logging.info("Tables supprimées.")
+        if reset:
+            logging.info("Suppression des tables existantes...")
+            with db.bind_ctx([SchemaVersion]):
+                db.drop_tables([User, Client, Contrat, Event, SchemaVersion])
+            logging.info("Tables supprimées.")
 
-        logging.info("Création de nouvelles tables...")
-        db.create_tables([User, Client, Contrat, Event])
-        logging.info("Tables créées avec succès.")
+        logging.info("Application des migrations...")
+        applied = migrate(db)
+        for migration in applied:
+            logging.info(f"Migration {migration.version:04d} ({migration.name}) appliquée.")
+        logging.info("Schéma à jour.")
 
     except Exception as e:
         logging.error(f"Une erreur s'est produite : {e}")
@@ -34,4 +41,4 @@ def create_db():
         db.close()
 
 if __name__ == "__main__":
-    create_db()
+    create_db(reset="--reset" in sys.argv[1:])
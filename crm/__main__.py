@@ -1,18 +1,67 @@
-from crm.cli_commands.cli_user import app as user_app
-from crm.cli_commands.cli_auth import app as auth_app
-from crm.cli_commands.cli_commercial import app as commercial_app
-from crm.cli_commands.cli_administration import app as administration_app
-from crm.cli_commands.cli_support import app as support_app
+import sys
+
+if __name__ == "__main__":
+    # Client léger : si le démon CRM (crm daemon start) est lancé, la commande lui est transmise
+    # avant même de charger typer et les sous-commandes. Sinon, exécution dans ce processus.
+    from crm.cli_commands.cli_daemon_client import forward
+
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+from crm.cli_commands.cli_permissions import get_session, reset_session, use_session
+from crm.cli_commands.cli_registry import LazyTyperGroup
+
+from typing import Optional
 
 import typer
 
-app = typer.Typer()
+# Les sous-commandes (user, auth, commercial, administration, support) sont déclarées
+# dans crm.cli_commands.cli_registry et ne sont importées qu'à leur invocation.
+app = typer.Typer(cls=LazyTyperGroup)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="Affiche la durée de la commande et de ses requêtes SQL."),
+    profile_format: str = typer.Option("text", "--profile-format", help="Format du profil : text ou json."),
+    profile_dump: Optional[str] = typer.Option(None, "--profile-dump", help="Enregistre aussi un profil cProfile dans ce fichier."),
+):
+    """
+    CLI CRM Epic Events.
+    """
+    if profile or profile_dump:
+        start_profiler(ctx, profile_format, profile_dump)
+
+    # La session est lue une seule fois par commande, puis partagée via ctx.obj et get_session().
+    # Le shell (crm shell) et le démon fournissent leur session déjà vérifiée dans ctx.obj : elle
+    # n'est pas relue, et devient la session du fil qui exécute la commande.
+    if ctx.obj is None:
+        reset_session()
+        ctx.obj = get_session()
+    else:
+        use_session(ctx.obj)
+
+
+def start_profiler(ctx: typer.Context, profile_format: str, profile_dump: Optional[str]):
+    """Profile la commande ; le rapport est écrit sur la sortie d'erreur à la fin de la commande."""
+    from crm.models.profiling import Profiler
+
+    if profile_format not in ("text", "json"):
+        raise typer.BadParameter("text ou json attendu.", param_hint="--profile-format")
+
+    profiler = Profiler(ctx.invoked_subcommand or "", cprofile=profile_dump is not None)
+
+    def report():
+        profiler.stop()
+        typer.echo(profiler.to_json() if profile_format == "json" else profiler.to_text(), err=True)
+        if profile_dump:
+            profiler.dump(profile_dump)
+            typer.echo(f"Profil cProfile enregistré dans {profile_dump}.", err=True)
 
-app.add_typer(user_app, name="user")
-app.add_typer(auth_app, name="auth")
-app.add_typer(commercial_app, name="commercial")
-app.add_typer(administration_app, name="administration")
-app.add_typer(support_app, name="support")
+    ctx.call_on_close(report)
+    profiler.start()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 import typer
 from crm.models.models import Client, Contrat, CONTRAT_STATUTS, db
-from crm.cli_commands.cli_permissions import is_administration, load_user_info
-from peewee import DoesNotExist
+from crm.models.authorized import fetch_contrat_for_author
+from crm.models.maintenance import sweep_expired_contrats
+from crm.models.balancing import apply_plan, load_workload, plan_balance
+from crm.cli_commands.cli_permissions import get_session, requires_role
 import peewee 
 from crm.cli_commands.cli_input_validators import (
     get_valid_id,
@@ -17,21 +19,13 @@ app = typer.Typer()
 
 
 @app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour ajouter un contrat.")
 def add_contrat():
     """
     Ajoute un nouveau contrat à la base de données.
     Seul un utilisateur avec le rôle d'administration peut ajouter un contrat.
     """
-    user_info = load_user_info()
-    admin_id = user_info.get('user_id', None)
-
-    if admin_id is None:
-        typer.echo("Impossible de récupérer l'ID de l'administrateur.")
-        return
-
-    if not is_administration():
-        typer.echo("Accès refusé. Vous devez être dans l'équipe d'administration pour ajouter un contrat.")
-        return
+    admin_id = get_session().user_id
 
     
     client_id = get_valid_id(Client, "ID du client", is_client_not_under_contrat)
@@ -71,41 +65,35 @@ def is_client_not_under_contrat(client_id: int) -> bool:
 
 
 @app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour mettre à jour un contrat.")
 def update_contrat():
     """
     Met à jour les informations d'un contrat existant dans la base de données.
     Seul l'administrateur qui a créé le contrat peut mettre à jour le contrat.
     """
-    if not is_administration():
-        typer.echo("Accès refusé. Vous devez être dans l'équipe d'administration pour mettre à jour un contrat.")
-        return
-
-    user_info = load_user_info()
-    admin_id = user_info.get('user_id', None)
-    if admin_id is None:
-        typer.echo("Impossible de récupérer l'ID de l'administrateur.")
-        return
+    admin_id = get_session().user_id
 
     contrat_id_str = typer.prompt("Veuillez entrer l'ID du contrat à mettre à jour")
     
     try:
         contrat_id = int(contrat_id_str)
-        contrat = Contrat.get_by_id(contrat_id)
+        # Contrat et contrôle de l'auteur en une seule requête
+        contrat, allowed = fetch_contrat_for_author(contrat_id, admin_id)
         
     except ValueError:
         typer.echo("L'ID du contrat doit être un nombre entier.")
         return
     
-    except DoesNotExist:
-        typer.echo("Contrat non trouvé.")
-        return
-    
     except Exception as e:
         typer.echo(f"Erreur lors de la récupération du contrat : {e}")
         return
 
+    if contrat is None:
+        typer.echo("Contrat non trouvé.")
+        return
+
     # Vérifiez si l'utilisateur actuel est l'auteur du contrat
-    if contrat.contrat_author.id != admin_id:
+    if not allowed:
         typer.echo("Accès refusé. Vous ne pouvez mettre à jour que les contrats que vous avez créés.")
         return
 
@@ -158,21 +146,13 @@ def update_contrat():
 
 
 @app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour supprimer un contrat.")
 def delete_contrat():
     """
     Supprime un contrat de la base de données.
     Seul l'administrateur qui a créé le contrat peut le supprimer.
     """
-    user_info = load_user_info()
-    admin_id = user_info.get('user_id', None)
-
-    if admin_id is None:
-        typer.echo("Impossible de récupérer l'ID de l'administrateur.")
-        return
-
-    if not is_administration():
-        typer.echo("Accès refusé. Vous devez être dans l'équipe d'administration pour supprimer un contrat.")
-        return
+    admin_id = get_session().user_id
 
     contrat_id = get_valid_input(
         "ID du contrat à supprimer",
@@ -182,16 +162,77 @@ def delete_contrat():
 
     try:
         contrat_id = int(contrat_id)
-        contrat = Contrat.get_by_id(contrat_id)
-        if contrat.contrat_author.id != admin_id:
+        contrat, allowed = fetch_contrat_for_author(contrat_id, admin_id)
+
+        if contrat is None:
+            typer.echo("Contrat non trouvé.")
+            return
+
+        if not allowed:
             typer.echo("Accès refusé. Vous ne pouvez supprimer que les contrats que vous avez créés.")
             return
 
         contrat.delete_instance()
         typer.echo(f"Contrat {contrat_id} supprimé avec succès.")
         
-    except DoesNotExist:
-        typer.echo("Contrat non trouvé.")
-        
     except Exception as e:
         typer.echo(f"Erreur lors de la suppression du contrat : {e}")
+
+
+@app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour clôturer les contrats.", exit_code=1)
+def sweep_contracts(batch_size: int = typer.Option(1000, min=1, help="Nombre maximal de contrats modifiés par transaction.")):
+    """
+    Passe au statut TERMINE les contrats en cours, payés, dont la date de fin est passée.
+    Idempotente et sans interaction : peut être lancée par cron chaque minute, avec la session
+    d'un membre de l'administration (sans session, la commande échoue avec le code 1).
+    """
+    try:
+        result = sweep_expired_contrats(batch_size=batch_size)
+    except peewee.PeeweeException as e:
+        typer.echo(f"Erreur de base de données : {e}")
+        raise typer.Exit(code=1)
+
+    typer.echo(f"{result.changed} contrat(s) passé(s) au statut TERMINE en {result.seconds * 1000:.1f} ms ({result.batches} lot(s)).")
+
+
+@app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour répartir les événements.")
+def balance_support(dry_run: bool = typer.Option(False, "--dry-run", help="Affiche le plan sans rien assigner.")):
+    """
+    Répartit les événements non assignés entre les membres du support, en équilibrant
+    le nombre de participants et d'événements de chacun, sans chevauchement de dates.
+    """
+    try:
+        supports, pending, assigned = load_workload()
+    except peewee.PeeweeException as e:
+        typer.echo(f"Erreur de base de données : {e}")
+        raise typer.Exit(code=1)
+
+    if not supports:
+        typer.echo("Aucun membre du support.")
+        return
+    if not pending:
+        typer.echo("Aucun événement non assigné.")
+        return
+
+    plan = plan_balance(supports, pending, assigned)
+    for support_id, name in supports.items():
+        before, after = plan.before[support_id], plan.after[support_id]
+        typer.echo(f"{name} (id{support_id}) : +{len(plan.assignments[support_id])} événement(s), "
+                   f"{before.events} -> {after.events} événement(s), {before.attendees} -> {after.attendees} participants")
+    if plan.unplaced:
+        typer.echo(f"{len(plan.unplaced)} événement(s) sans membre du support disponible : "
+                   f"{', '.join(map(str, plan.unplaced[:20]))}{' ...' if len(plan.unplaced) > 20 else ''}")
+    typer.echo(f"Plan : {plan.planned} événement(s) sur {len(pending)} calculé en {plan.seconds * 1000:.1f} ms.")
+
+    if dry_run:
+        return
+    try:
+        changed = apply_plan(plan)
+    except peewee.PeeweeException as e:
+        typer.echo(f"Erreur de base de données : {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"{changed} événement(s) assigné(s).")
+    if changed < plan.planned:
+        typer.echo(f"{plan.planned - changed} événement(s) assigné(s) entre-temps par ailleurs, laissé(s) tel(s) quel(s).")
@@ -1,32 +1,45 @@
 import typer
-import bcrypt
-import json
-import os
-from crm.models.models import User
+
+from crm.cli_commands.cli_permissions import reset_session
+from crm.cli_commands.cli_session import clear_session, load_session, save_session
 
 
 app = typer.Typer()
 
 
-def verify_user(email: str, password: str) -> bool:
+def verify_user(email: str, password: str):
     """
     Vérifie l'existence d'un utilisateur avec l'email spécifié et
     si le mot de passe fourni correspond à celui haché enregistré dans la base de données.
+    Retourne l'utilisateur si les identifiants sont corrects, None sinon (une seule requête de lecture).
+    Un hachage obsolète (bcrypt, ou argon2 hors politique) est recalculé au passage.
     """
+    # Imports différés : `auth logout` ne doit pas charger la couche base de données.
+    from crm.cli_commands.cli_passwords import hash_password, verify_password
+    from crm.models.models import User
+    from crm.models.user_cache import invalidate_user
+
     try:
-        # Utilise la méthode get_or_none pour récupérer l'utilisateur correspondant à l'email donné.
-        # Retourne l'utilisateur si trouvé, sinon None.
+        # Récupère l'utilisateur correspondant à l'email donné, toujours dans la base (jamais dans
+        # le cache des utilisateurs) : mot de passe et rôle à jour. Retourne l'utilisateur si trouvé, sinon None.
         user = User.get_or_none(User.email == email)
-        
+
         if user:
             # Compare le mot de passe fourni avec le mot de passe haché de l'utilisateur trouvé.
-            # Encode les mots de passe en UTF-8 avant la comparaison.
-            return bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8'))
-        
+            check = verify_password(password, user.password)
+            if not check.valid:
+                return None
+
+            if check.needs_rehash:
+                user.password = hash_password(password)
+                User.update(password=user.password).where(User.id == user.id).execute()
+                invalidate_user(user.id)
+            return user
+
     except Exception as e:
         typer.echo(f"Une erreur est survenue lors de la vérification de l'utilisateur: {e}")
-        
-    return False
+
+    return None
 
 
 
@@ -35,17 +48,14 @@ def login(email: str, password: str):
     Connecte l'utilisateur en vérifiant son email et mot de passe.
     """
     try:
-        # La fonction verify_user retourne True si l'email et le mot de passe sont corrects.
-        if verify_user(email, password):
-            
-            # La fonction User.get est utilisée pour récupérer l'objet User complet associé à cet email.
-            user = User.get(User.email == email)
-            
+        # La fonction verify_user retourne l'utilisateur si l'email et le mot de passe sont corrects.
+        user = verify_user(email, password)
+        if user:
             typer.echo("Authentification réussie.")
-            
+
             # Enregistre les informations de l'utilisateur pour la session actuelle.
             save_user_info(user.id, user.username, user.email, user.role)
-            
+
         else:
             typer.echo("Email ou mot de passe incorrecte !")
             
@@ -55,36 +65,31 @@ def login(email: str, password: str):
 
 def save_user_info(user_id, username, email, role):
     """
-    Enregistre les informations de l'utilisateur :
+    Enregistre les informations de l'utilisateur dans un jeton de session signé :
     - L'identifiant de l'utilisateur.
     - Le nom d'utilisateur.
     - L'email de l'utilisateur.
     - Le rôle de l'utilisateur.
     """
     try:
-        with open("config.json", "w") as f:
-            json.dump({"user_id": user_id, "username": username, "email": email, "role": role}, f, indent=4)
-            
-    # IOError est levée en cas de problème d'accès au fichier
-    except IOError as e:
+        save_session(user_id, username, email, role)
+        reset_session()
+
+    # OSError est levée en cas de problème d'accès au fichier
+    except OSError as e:
         typer.echo(f"Une erreur est survenue lors de l'enregistrement des informations de l'utilisateur: {e}")
 
 
 def load_user_info():
     """
-    Charge les informations de l'utilisateur et 
-    retour les informations de l'utilisateur 
-    si le fichier existe et est valide, None sinon.
+    Charge les informations de l'utilisateur et
+    retour les informations de l'utilisateur
+    si le jeton existe et est valide (signature, expiration), None sinon.
     """
-    try:
-        with open("config.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
+    user_info = load_session(refresh=False)
+    if user_info is None:
         typer.echo("Aucun utilisateur n'est actuellement connecté.")
-        return None
-    except json.JSONDecodeError:
-        typer.echo("Le fichier de configuration est corrompu.")
-        return None
+    return user_info
 
 
 def clear_user_info():
@@ -92,9 +97,9 @@ def clear_user_info():
     Efface les informations de l'utilisateur pour déconnecter l'utilisateur.
     """
     try:
-        # Vérifie si le fichier config.json existe et le supprime pour déconnecter l'utilisateur.
-        if os.path.exists("config.json"):
-            os.remove("config.json")
+        # Supprime le jeton de session pour déconnecter l'utilisateur.
+        if clear_session():
+            reset_session()
             typer.echo("Déconnexion réussie.")
         else:
             typer.echo("Aucun utilisateur n'est actuellement connecté.")
@@ -107,11 +112,8 @@ def logout():
     """
     Déconnecte l'utilisateur actuel en effaçant ses informations de session.
     """
-    user_info = load_user_info()
-    if user_info:
-        clear_user_info()
-    else:
-        typer.echo("Aucun utilisateur n'est actuellement connecté.")
+    # Un jeton expiré est aussi supprimé.
+    clear_user_info()
 
        
 @app.command()
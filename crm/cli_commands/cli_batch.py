@@ -0,0 +1,321 @@
+"""
+Mode lot : exécute des opérations CRM lues dans un fichier JSONL, dans un seul processus.
+
+Chaque ligne est un objet JSON {"op": "<opération>", ...champs}, par exemple :
+    {"op": "add_client", "name": "ACME", "email": "contact@acme.fr", "phone": "0601020304"}
+    {"op": "update_contrat", "id": 12, "status": "TERMINE"}
+    {"op": "assign_support_to_event", "id": 7}
+
+Les champs reprennent les questions des commandes interactives et sont validés avec les mêmes
+schémas (crm.cli_commands.cli_schema). Les champs absents d'une mise à jour conservent
+leur valeur. La session est lue une fois et toutes les opérations utilisent la même connexion.
+
+Les opérations sont regroupées en transactions de `--transaction-size` opérations ; chaque
+opération s'exécute dans un point de sauvegarde, de sorte qu'une opération en échec n'annule
+qu'elle-même. Un résultat JSON par opération est écrit après la validation de sa transaction.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import peewee
+import typer
+from crm.cli_commands.cli_bulk import chunked, iter_records
+from crm.cli_commands.cli_email import warm_domains
+from crm.cli_commands.cli_permissions import Session, get_session, requires_role
+from crm.cli_commands.cli_support import conflict_message
+from crm.cli_commands.cli_schema import (
+    CLIENT_SCHEMA, CONTRAT_SCHEMA, EVENT_SCHEMA, Context, Schema, contrat_context, first_error, to_datetime
+)
+from crm.models.authorized import (
+    fetch_client_for_commercial, fetch_contrat_for_author, fetch_contrat_for_commercial, fetch_event_for_support
+)
+from crm.models.claims import CONFLICT, NOT_FOUND, TAKEN, UPDATED, assign_event, conflicts_of_event, reschedule_event
+from crm.models.conflicts import conflicting_events
+from crm.models.models import CONTRAT_STATUTS, Client, Contrat, Event, Tombstone, db, local_write
+
+
+app = typer.Typer()
+
+
+class OperationError(Exception):
+    """Opération refusée ou invalide ; le message est renvoyé dans le résultat."""
+
+
+class Operation(NamedTuple):
+    """Opération du mode lot : rôle requis et fonction (session, champs) -> résultat."""
+    role: str
+    run: Callable[[Session, Dict], Dict]
+
+
+def require(fields: Dict, name: str):
+    value = fields.get(name)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        raise OperationError(f"Champ obligatoire manquant : {name}.")
+    return value
+
+
+def as_id(fields: Dict, name: str = "id") -> int:
+    value = require(fields, name)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise OperationError(f"{name} doit être un nombre entier.")
+
+
+def checked(schema: Schema, fields: Dict, context: Optional[Context] = None, partial: bool = False) -> Dict:
+    """Champs validés et convertis par le schéma, ou OperationError avec la première erreur."""
+    result = schema.validate(fields, context, partial)
+    if not result.ok:
+        raise OperationError(first_error(result))
+    return result.data
+
+
+def with_dates(fields: Dict, instance) -> Dict:
+    """Champs d'une mise à jour, complétés par les dates actuelles pour contrôler les nouvelles."""
+    return {"start_date": instance.start_date, "end_date": instance.end_date, **fields}
+
+
+def as_datetimes(data: Dict) -> Dict:
+    for name in ("start_date", "end_date"):
+        if name in data:
+            data[name] = to_datetime(data[name])
+    return data
+
+
+def owned(authorized, not_found: str, denied: str):
+    """Retourne l'enregistrement d'une lecture contrôlée, ou lève l'erreur correspondante."""
+    if not authorized.found:
+        raise OperationError(not_found)
+    if not authorized.allowed:
+        raise OperationError(denied)
+    return authorized.instance
+
+
+# Opérations de l'équipe commerciale
+
+def add_client(session: Session, fields: Dict) -> Dict:
+    data = checked(CLIENT_SCHEMA, fields)
+    if Client.select().where(Client.name == data["name"]).exists():
+        raise OperationError("Ce nom de client existe déjà.")
+    client = Client.create(**data, commercial_contact=session.user_id)
+    return {"id": client.id}
+
+
+def update_client(session: Session, fields: Dict) -> Dict:
+    client = owned(fetch_client_for_commercial(as_id(fields), session.user_id), "Client non trouvé.",
+                   "Accès refusé. Vous ne pouvez mettre à jour que les clients que vous avez créés.")
+    for name, value in checked(CLIENT_SCHEMA, fields, partial=True).items():
+        setattr(client, name, value)
+    client.save()
+    return {"id": client.id}
+
+
+def delete_client(session: Session, fields: Dict) -> Dict:
+    client = owned(fetch_client_for_commercial(as_id(fields), session.user_id), "Client non trouvé.",
+                   "Accès refusé. Vous ne pouvez supprimer que les clients que vous avez créés.")
+    client.delete_instance()
+    return {"id": client.id}
+
+
+def add_event(session: Session, fields: Dict) -> Dict:
+    contrat = owned(fetch_contrat_for_commercial(as_id(fields, "contrat_id"), session.user_id),
+                    "Contrat ou client non trouvé.", "Accès refusé. Vous n'avez pas créé ce client.")
+    if not (contrat.is_signed and contrat.payment_received):
+        raise OperationError("Le contrat doit être signé et le paiement reçu pour ajouter un événement.")
+
+    data = as_datetimes(checked(EVENT_SCHEMA, fields, contrat_context(contrat)))
+    event = Event.create(contrat=contrat, **data)
+    return {"id": event.id}
+
+
+# Opérations de l'équipe d'administration
+
+def add_contrat(session: Session, fields: Dict) -> Dict:
+    client_id = as_id(fields, "client_id")
+    if not Client.select().where(Client.id == client_id).exists():
+        raise OperationError("Aucun client trouvé à cet ID.")
+    if Contrat.select().where(Contrat.client == client_id, Contrat.status == "EN_COURS").exists():
+        raise OperationError("Ce client a déjà un contrat.")
+
+    data = as_datetimes(checked(CONTRAT_SCHEMA, {**fields, "status": CONTRAT_STATUTS[0]}))
+    contrat = Contrat.create(client=client_id, contrat_author=session.user_id, **data)
+    return {"id": contrat.id}
+
+
+def update_contrat(session: Session, fields: Dict) -> Dict:
+    contrat = owned(fetch_contrat_for_author(as_id(fields), session.user_id), "Contrat non trouvé.",
+                    "Accès refusé. Vous ne pouvez mettre à jour que les contrats que vous avez créés.")
+    if "start_date" in fields or "end_date" in fields:
+        fields = with_dates(fields, contrat)
+    for name, value in as_datetimes(checked(CONTRAT_SCHEMA, fields, partial=True)).items():
+        setattr(contrat, name, value)
+    contrat.save()
+    return {"id": contrat.id}
+
+
+def delete_contrat(session: Session, fields: Dict) -> Dict:
+    contrat = owned(fetch_contrat_for_author(as_id(fields), session.user_id), "Contrat non trouvé.",
+                    "Accès refusé. Vous ne pouvez supprimer que les contrats que vous avez créés.")
+    contrat.delete_instance()
+    return {"id": contrat.id}
+
+
+# Opérations de l'équipe support
+
+def assign_support_to_event(session: Session, fields: Dict) -> Dict:
+    event_id = as_id(fields)
+    # Mise à jour conditionnelle : un événement déjà assigné n'est pas modifié.
+    outcome = assign_event(event_id, session.user_id)
+    if outcome == NOT_FOUND:
+        raise OperationError("Événement non trouvé.")
+    if outcome == TAKEN:
+        raise OperationError("Cet événement est déjà assigné à un autre membre du support.")
+    if outcome == CONFLICT:
+        raise OperationError(conflict_message(conflicts_of_event(event_id, session.user_id)))
+    return {"id": event_id}
+
+
+def update_event(session: Session, fields: Dict) -> Dict:
+    event = owned(fetch_event_for_support(as_id(fields), session.user_id), "Événement non trouvé.",
+                  "Accès refusé. Vous ne pouvez mettre à jour que les événements que vous avez assignés.")
+    context = None
+    if "start_date" in fields or "end_date" in fields:
+        fields, context = with_dates(fields, event), contrat_context(event.contrat)
+    data = as_datetimes(checked(EVENT_SCHEMA, fields, context, partial=True))
+    if context is None:
+        for name, value in data.items():
+            setattr(event, name, value)
+        event.save()
+        return {"id": event.id}
+
+    # Nouvelles dates : contrôle des chevauchements et écriture en une mise à jour conditionnelle.
+    start_date, end_date = data.pop("start_date"), data.pop("end_date")
+    outcome = reschedule_event(event.id, session.user_id, start_date, end_date, **data)
+    if outcome == CONFLICT:
+        raise OperationError(conflict_message(
+            conflicting_events(session.user_id, start_date, end_date, exclude=event.id)))
+    if outcome == NOT_FOUND:
+        raise OperationError("Événement non trouvé.")
+    if outcome != UPDATED:
+        raise OperationError("Accès refusé. Vous ne pouvez mettre à jour que les événements que vous avez assignés.")
+    return {"id": event.id}
+
+
+def delete_event(session: Session, fields: Dict) -> Dict:
+    event_id = as_id(fields)
+    deleted = (Event.delete()
+               .where(Event.id == event_id, Event.support_contact == session.user_id)
+               .execute())
+    if deleted:
+        Tombstone.record(Event, [event_id])
+    else:
+        if not Event.select().where(Event.id == event_id).exists():
+            raise OperationError("Événement non trouvé.")
+        raise OperationError("Accès refusé. Vous ne pouvez supprimer que les événements que vous avez assignés.")
+    return {"id": event_id}
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "add_client": Operation("COMMERCIAL", add_client),
+    "update_client": Operation("COMMERCIAL", update_client),
+    "delete_client": Operation("COMMERCIAL", delete_client),
+    "add_event": Operation("COMMERCIAL", add_event),
+    "add_contrat": Operation("ADMINISTRATION", add_contrat),
+    "update_contrat": Operation("ADMINISTRATION", update_contrat),
+    "delete_contrat": Operation("ADMINISTRATION", delete_contrat),
+    "assign_support_to_event": Operation("SUPPORT", assign_support_to_event),
+    "update_event": Operation("SUPPORT", update_event),
+    "delete_event": Operation("SUPPORT", delete_event),
+}
+
+
+def run_operation(session: Session, line_number: int, record: Dict) -> Dict:
+    """
+    Exécute une opération dans un point de sauvegarde et retourne son résultat :
+    {"line", "op", "ok", ...} avec l'identifiant concerné ou le message d'erreur.
+    """
+    name = record.get("op")
+    result = {"line": line_number, "op": name}
+    try:
+        if "_error" in record:
+            raise OperationError(record["_error"])
+        if not isinstance(name, str):
+            raise OperationError(f"Opération invalide : {name!r} (nom d'opération attendu).")
+        operation = OPERATIONS.get(name)
+        if operation is None:
+            raise OperationError(f"Opération inconnue : {name}.")
+        if not session.has_role(operation.role):
+            raise OperationError(f"Accès refusé. L'opération {name} est réservée au rôle {operation.role}.")
+
+        fields = {key: value for key, value in record.items() if key != "op"}
+        with db.atomic():
+            result.update(operation.run(session, fields))
+        result["ok"] = True
+
+    except OperationError as e:
+        result.update(ok=False, error=str(e))
+    except peewee.PeeweeException as e:
+        result.update(ok=False, error=f"Erreur de base de données : {e}")
+    except Exception as e:
+        # Une ligne inattendue ne doit pas interrompre le lot : son erreur est rapportée, les suivantes exécutées.
+        result.update(ok=False, error=f"Erreur inattendue : {e}")
+    return result
+
+
+def run_batch(path: Path, session: Session, out, transaction_size: int = 100) -> Tuple[int, int]:
+    """
+    Exécute les opérations du fichier par transactions de `transaction_size` opérations
+    et écrit un résultat JSON par ligne dans `out`.
+    Retourne le nombre d'opérations réussies et en échec.
+    """
+    succeeded = failed = 0
+    for group in chunked(iter_records(path), transaction_size):
+        # Requêtes DNS hors de la transaction, une par domaine distinct du groupe.
+        warm_domains(record.get("email") for _, record in group)
+        try:
+            with db.atomic():
+                results = [run_operation(session, line_number, record) for line_number, record in group]
+        except peewee.PeeweeException as e:
+            # La validation de la transaction a échoué : aucune opération du groupe n'est enregistrée.
+            results = [{"line": line_number, "op": record.get("op"), "ok": False,
+                        "error": f"Erreur de base de données : {e}"} for line_number, record in group]
+
+        for result in results:
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            if result["ok"]:
+                succeeded += 1
+            else:
+                failed += 1
+        out.flush()
+    if succeeded:
+        local_write()
+    return succeeded, failed
+
+
+@app.command()
+@requires_role(exit_code=1)
+def batch(
+    file: Path = typer.Argument(..., exists=True, dir_okay=False, readable=True, help="Fichier JSONL des opérations."),
+    transaction_size: int = typer.Option(100, min=1, help="Nombre d'opérations par transaction."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Fichier des résultats (sortie standard par défaut)."),
+):
+    """
+    Exécute les opérations d'un fichier JSONL (add_client, update_contrat,
+    assign_support_to_event...) et écrit un résultat JSON par opération.
+    """
+    start = time.perf_counter()
+    if output is None:
+        succeeded, failed = run_batch(file, get_session(), sys.stdout, transaction_size)
+    else:
+        with output.open("w", encoding="utf-8") as out:
+            succeeded, failed = run_batch(file, get_session(), out, transaction_size)
+
+    elapsed = time.perf_counter() - start
+    total = succeeded + failed
+    rate = total / elapsed if elapsed else float(total)
+    typer.echo(f"{total} opération(s) : {succeeded} réussie(s), {failed} en échec en {elapsed:.2f}s ({rate:.0f} op/s).", err=True)
+    if failed:
+        raise typer.Exit(code=1)
@@ -0,0 +1,100 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from peewee import Field
+
+
+def iter_records(path: Path) -> Iterator[Tuple[int, Dict]]:
+    """
+    Lit un fichier CSV (avec en-tête) ou JSONL ligne par ligne, sans le charger en mémoire.
+    Retourne des couples (numéro de ligne, enregistrement).
+    Une ligne JSONL illisible est retournée sous la forme {"_error": message}.
+    """
+    path = Path(path)
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson", ".json"):
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = {"_error": f"JSON invalide : {e}"}
+                if not isinstance(record, dict):
+                    record = {"_error": "La ligne doit être un objet JSON."}
+                yield line_number, record
+        else:
+            # La ligne 1 est l'en-tête du fichier CSV.
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, row
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Découpe un itérable en listes d'au plus `size` éléments."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def existing_values(field: Field, values: Iterable, chunk_size: int = 1000) -> Set:
+    """
+    Retourne les valeurs déjà présentes en base pour un champ,
+    en interrogeant la base par requêtes `IN` de `chunk_size` valeurs.
+    """
+    model = field.model
+    found = set()
+    for chunk in chunked(set(values), chunk_size):
+        query = model.select(field).where(field.in_(chunk)).tuples()
+        found.update(value for (value,) in query)
+    return found
+
+
+def clean(value) -> Optional[str]:
+    """Nettoie une valeur lue dans un fichier : chaîne sans espaces superflus, None si vide."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class RejectWriter:
+    """
+    Écrit les enregistrements rejetés dans un fichier JSONL annexe,
+    avec le numéro de ligne et les raisons du rejet.
+    Le fichier n'est créé qu'au premier rejet.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        self._file = None
+
+    def write(self, line_number: int, record: Dict, errors: List[str]):
+        if self._file is None:
+            self._file = self.path.open("w", encoding="utf-8")
+        json.dump({"line": line_number, "errors": errors, "record": record}, self._file, ensure_ascii=False, default=str)
+        self._file.write("\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def default_rejects_path(path: Path) -> Path:
+    """Fichier des rejets par défaut : <fichier>.rejects.jsonl à côté du fichier importé."""
+    path = Path(path)
+    return path.with_name(path.name + ".rejects.jsonl")
@@ -1,30 +1,27 @@
 from crm.cli_commands.cli_input_validators import get_email, get_phone, is_valid_email, is_valid_phone, get_valid_input, get_event_start, get_event_end, is_valid_id
-from crm.cli_commands.cli_permissions import is_commercial, load_user_info
-from crm.models.models import Client, Event, Contrat, db
+from crm.cli_commands.cli_permissions import get_session, requires_role
+from crm.cli_commands.cli_bulk import iter_records, chunked, existing_values, RejectWriter, default_rejects_path
+from crm.cli_commands.cli_schema import CLIENT_SCHEMA
+from crm.models.models import Client, Event, db, local_write
+from crm.models.authorized import fetch_client_for_commercial, fetch_contrat_for_commercial
 from datetime import datetime
+from pathlib import Path
 from peewee import DoesNotExist
 import peewee 
+import time
 import typer
 
 
 app = typer.Typer()
 
 @app.command()
+@requires_role('COMMERCIAL', message="Accès refusé. Vous devez être un commercial pour ajouter un client.")
 def add_client():
     """
     Ajoute un nouveau client à la base de données.
     Seul un utilisateur avec le rôle de commercial peut ajouter un client.
     """
-    user_info = load_user_info()
-    commercial_id = user_info.get('user_id', None)
-    
-    if commercial_id is None:
-        typer.echo("Impossible de récupérer l'ID du commercial.")
-        return
-   
-    if not is_commercial():
-        typer.echo("Accès refusé. Vous devez être un commercial pour ajouter un client.")
-        return
+    commercial_id = get_session().user_id
 
     name = typer.prompt("Nom du client")
     while Client.select().where(Client.name == name).exists():
@@ -55,31 +52,27 @@ def add_client():
 
 
 @app.command()
+@requires_role('COMMERCIAL', message="Accès refusé. Vous devez être un commercial pour mettre à jour un client.")
 def update_client():
     """
     Met à jour les informations d'un client existant dans la base de données.
     Seul le commercial qui a créé le client peut mettre à jour ses informations.
     """
-    # Vérification de l'authentification et du rôle de l'utilisateur
-    if not is_commercial():
-        typer.echo("Accès refusé. Vous devez être un commercial pour mettre à jour un client.")
-        return
-
     # Récupération de l'ID du commercial
-    user_info = load_user_info()
-    commercial_id = user_info.get('user_id', None)
-    
-    if commercial_id is None:
-        typer.echo("Impossible de récupérer l'ID du commercial.")
-        return
+    commercial_id = get_session().user_id
 
     # Demande de l'ID du client via un prompt
     client_id_str = typer.prompt("Veuillez entrer l'ID du client à mettre à jour")
     try:
         client_id = int(client_id_str)
-        client = Client.get_by_id(client_id)
-        
-        if client.commercial_contact.id != commercial_id:
+        # Client et contrôle de propriété en une seule requête
+        client, allowed = fetch_client_for_commercial(client_id, commercial_id)
+
+        if client is None:
+            typer.echo("Client non trouvé.")
+            return
+
+        if not allowed:
             typer.echo("Accès refusé. Vous ne pouvez mettre à jour que les clients que vous avez créés.")
             return
         
@@ -87,10 +80,6 @@ def update_client():
         typer.echo("L'ID du client doit être un nombre entier.")
         return
     
-    except DoesNotExist:
-        typer.echo("Client non trouvé.")
-        return
-    
     except Exception as e:
         typer.echo(f"Erreur lors de la récupération du client : {e}")
         return
@@ -121,21 +110,13 @@ def update_client():
         
 
 @app.command()
+@requires_role('COMMERCIAL', message="Accès refusé. Vous devez être un commercial pour supprimer un client.")
 def delete_client():
     """
     Supprime un client de la base de données.
     Seul le commercial qui a créé le client peut le supprimer.
     """
-    user_info = load_user_info()
-    commercial_id = user_info.get('user_id', None)
-
-    if commercial_id is None:
-        typer.echo("Impossible de récupérer l'ID du commercial.")
-        return
-
-    if not is_commercial():
-        typer.echo("Accès refusé. Vous devez être un commercial pour supprimer un client.")
-        return
+    commercial_id = get_session().user_id
 
     client_id = get_valid_input(
         "ID du client à supprimer",
@@ -145,17 +126,19 @@ def delete_client():
 
     try:
         client_id = int(client_id)
-        client = Client.get_by_id(client_id)
-        if client.commercial_contact.id != commercial_id:
+        client, allowed = fetch_client_for_commercial(client_id, commercial_id)
+
+        if client is None:
+            typer.echo("Client non trouvé.")
+            return
+
+        if not allowed:
             typer.echo("Accès refusé. Vous ne pouvez supprimer que les clients que vous avez créés.")
             return
 
         client.delete_instance()
         typer.echo(f"Client {client_id} supprimé avec succès.")
         
-    except DoesNotExist:
-        typer.echo("Client non trouvé.")
-        
     except Exception as e:
         typer.echo(f"Erreur lors de la suppression du client : {e}")
 
@@ -163,28 +146,24 @@ def is_valid_attendee_number(input_str):
     return input_str.isdigit() and int(input_str) >= 0
      
 @app.command()
+@requires_role('COMMERCIAL', message="Accès refusé. Vous devez être un commercial pour ajouter un événement.")
 def add_event():
     """
     Ajoute un nouvel événement à la base de données.
     Seul un utilisateur avec le rôle de commercial peut ajouter un événement.
     """
-    user_info = load_user_info()
-    commercial_id = user_info.get('user_id', None)
-
-    if commercial_id is None:
-        typer.echo("Impossible de récupérer l'ID du commercial.")
-        return
-
-    if not is_commercial():
-        typer.echo("Accès refusé. Vous devez être un commercial pour ajouter un événement.")
-        return
+    commercial_id = get_session().user_id
 
     contrat_id = typer.prompt("ID du contrat associé à l'événement")
     try:
-        contrat = Contrat.get_by_id(int(contrat_id))
-        client = Client.get_by_id(contrat.client_id)
+        # Contrat, client et contrôle de propriété en une seule requête
+        contrat, allowed = fetch_contrat_for_commercial(int(contrat_id), commercial_id)
+
+        if contrat is None:
+            typer.echo("Contrat ou client non trouvé.")
+            return
 
-        if client.commercial_contact_id != commercial_id:
+        if not allowed:
             typer.echo("Accès refusé. Vous n'avez pas créé ce client.")
             return
 
@@ -221,4 +200,102 @@ def add_event():
         typer.echo("Contrat ou client non trouvé.")
         
     except Exception as e:
-        typer.echo(f"Erreur lors de l'ajout de l'événement : {e}")
\ No newline at end of file
+        typer.echo(f"Erreur lors de l'ajout de l'événement : {e}")
+
+
+def validate_client_record(record: dict) -> tuple:
+    """
+    Valide un client lu dans un fichier d'import avec les mêmes règles que add_client.
+    Retourne les données nettoyées et la liste des erreurs.
+    """
+    if "_error" in record:
+        return None, [record["_error"]]
+
+    result = CLIENT_SCHEMA.validate(record)
+    return result.data, list(result.errors.values())
+
+
+def import_clients_from_file(path: Path, commercial_id: int, rejects: RejectWriter, batch_size: int = 500) -> int:
+    """
+    Importe les clients d'un fichier CSV/JSONL en flux, par lots de `batch_size` lignes.
+    Les noms et emails déjà utilisés (en base ou plus haut dans le fichier) sont rejetés.
+    Chaque lot est inséré par un seul `insert_many` dans une transaction.
+    Retourne le nombre de clients importés.
+    """
+    imported = 0
+    seen_names, seen_emails = set(), set()
+
+    for batch in chunked(iter_records(path), batch_size):
+        # Validation du lot en une passe : emails validés ensemble, un domaine distinct à la fois.
+        results = CLIENT_SCHEMA.validate_many(record for _, record in batch)
+        candidates = []
+        for (line_number, record), result in zip(batch, results):
+            if "_error" in record:
+                rejects.write(line_number, record, [record["_error"]])
+            elif not result.ok:
+                rejects.write(line_number, record, list(result.errors.values()))
+            else:
+                candidates.append((line_number, record, result.data))
+
+        # Dédoublonnage contre la base : une requête IN par champ et par lot.
+        taken_names = existing_values(Client.name, (data["name"] for _, _, data in candidates))
+        taken_emails = existing_values(Client.email, (data["email"] for _, _, data in candidates))
+
+        now = datetime.now()
+        rows = []
+        for line_number, record, data in candidates:
+            errors = []
+            if data["name"] in taken_names or data["name"] in seen_names:
+                errors.append("Ce nom de client existe déjà.")
+            if data["email"] in taken_emails or data["email"] in seen_emails:
+                errors.append("Cet email est déjà utilisé par un autre client.")
+            if errors:
+                rejects.write(line_number, record, errors)
+                continue
+
+            seen_names.add(data["name"])
+            seen_emails.add(data["email"])
+            rows.append({**data, "creation_date": now, "last_update_date": now, "commercial_contact": commercial_id})
+
+        if rows:
+            with db.atomic():
+                Client.insert_many(rows).execute()
+            imported += len(rows)
+
+    if imported:
+        local_write()
+    return imported
+
+
+@app.command()
+@requires_role('COMMERCIAL', message="Accès refusé. Vous devez être un commercial pour importer des clients.")
+def import_clients(
+    file: Path = typer.Argument(..., exists=True, dir_okay=False, readable=True, help="Fichier CSV ou JSONL des clients."),
+    batch_size: int = typer.Option(500, min=1, help="Nombre de clients insérés par transaction."),
+    rejects: Path = typer.Option(None, help="Fichier JSONL des lignes rejetées (par défaut <FILE>.rejects.jsonl)."),
+):
+    """
+    Importe des clients en masse depuis un fichier CSV ou JSONL
+    (colonnes : name, email, phone, company_name).
+    Seul un utilisateur avec le rôle de commercial peut importer des clients,
+    qui lui sont rattachés. Les lignes invalides sont écrites dans un fichier de rejets.
+    """
+    commercial_id = get_session().user_id
+    rejects_path = rejects or default_rejects_path(file)
+    start = time.perf_counter()
+
+    try:
+        with RejectWriter(rejects_path) as reject_writer:
+            imported = import_clients_from_file(file, commercial_id, reject_writer, batch_size)
+
+    except peewee.PeeweeException as e:
+        typer.echo(f"Erreur de base de données : {e}")
+        return
+
+    elapsed = time.perf_counter() - start
+    total = imported + reject_writer.count
+    rate = total / elapsed if elapsed else float(total)
+
+    typer.echo(f"{imported} client(s) importé(s), {reject_writer.count} ligne(s) rejetée(s) en {elapsed:.2f}s ({rate:.0f} lignes/s).")
+    if reject_writer.count:
+        typer.echo(f"Lignes rejetées : {rejects_path}")
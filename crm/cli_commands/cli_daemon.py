@@ -0,0 +1,322 @@
+"""
+Démon CRM (crm daemon start) : un processus de longue durée qui garde en mémoire les modules,
+le pool de connexions, la session vérifiée et les caches, et exécute les commandes reçues
+du client léger (`python -m crm ...`, voir crm.cli_commands.cli_daemon_client).
+
+Les requêtes sont servies en parallèle par un pool de fils d'exécution. Les commandes
+existantes écrivent avec typer.echo et lisent avec typer.prompt : sys.stdout, sys.stderr et
+sys.stdin sont remplacés par des flux aiguillés par fil d'exécution, qui relaient sorties
+et saisies vers le client de la requête en cours.
+"""
+import io
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+import click
+import typer
+from crm.cli_commands.cli_daemon_client import (
+    ProtocolError, recv_frame, request, send_frame, socket_path
+)
+from crm.cli_commands import cli_permissions
+from crm.cli_commands.cli_permissions import Session, reset_session
+from crm.cli_commands.cli_session import session_path
+
+
+app = typer.Typer()
+
+
+class RoutedStream(io.TextIOBase):
+    """Flux standard dont la destination dépend du fil d'exécution (par défaut : le flux d'origine)."""
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    @property
+    def target(self):
+        return getattr(self.local, "stream", None) or self.default
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    @property
+    def errors(self):
+        return "strict"
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def write(self, data):
+        # Flux texte : click vérifie en écrivant b"" qu'il ne s'agit pas d'un flux binaire.
+        if not isinstance(data, str):
+            raise TypeError("write() argument must be str")
+        return self.target.write(data)
+
+    def flush(self):
+        return self.target.flush()
+
+    def readline(self, size=-1):
+        return self.target.readline(size)
+
+    def read(self, size=-1):
+        return self.target.read(size)
+
+    @contextmanager
+    def route(self, stream):
+        """Aiguille le flux du fil courant vers `stream` le temps du bloc."""
+        self.local.stream = stream
+        try:
+            yield stream
+        finally:
+            self.local.stream = None
+
+
+class FrameWriter(io.TextIOBase):
+    """Sortie d'une requête : chaque écriture est envoyée au client dans une trame "out" ou "err"."""
+
+    def __init__(self, sock: socket.socket, kind: str):
+        self.sock = sock
+        self.kind = kind
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if not isinstance(data, str):
+            raise TypeError("write() argument must be str")
+        if data:
+            try:
+                send_frame(self.sock, {"type": self.kind, "data": data})
+            except OSError as e:
+                raise ProtocolError(f"Client déconnecté : {e}") from e
+        return len(data)
+
+
+class FrameReader(io.TextIOBase):
+    """Entrée d'une requête : chaque lecture de ligne est demandée au client (trame "read")."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+
+    def readable(self):
+        return True
+
+    def readline(self, size=-1):
+        try:
+            send_frame(self.sock, {"type": "read"})
+            message = recv_frame(self.sock)
+        except OSError as e:
+            raise ProtocolError(f"Client déconnecté : {e}") from e
+        if message.get("type") != "stdin":
+            raise ProtocolError("Réponse attendue : stdin.")
+        return message.get("data") or ""
+
+    def read(self, size=-1):
+        return self.readline()
+
+
+class Daemon:
+    """Serveur du démon : accepte les connexions et exécute les commandes dans un pool de fils."""
+
+    def __init__(self, path: Path, workers: int = 4):
+        self.path = path
+        self.workers = workers
+        self.cwd = os.getcwd()
+        self.started = time.time()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._session: Optional[Session] = None
+        self._session_stamp = None
+        self._stopping = threading.Event()
+
+        from crm.__main__ import app as main_app
+        self.group = typer.main.get_command(main_app)
+
+    def session(self) -> Session:
+        """
+        Session de la requête, lue depuis le jeton seulement si son fichier a changé (connexion,
+        déconnexion, renouvellement) ou s'il a expiré. Elle est transmise à la commande par ctx.obj
+        et ne remplace jamais la session d'une requête déjà en cours dans un autre fil.
+        """
+        try:
+            stat = session_path().stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        with self._lock:
+            session = self._session
+            if session is None or stamp != self._session_stamp or (session.data and not session.is_authenticated):
+                session = self._session = Session(cli_permissions.read_session_file())
+                self._session_stamp = stamp
+            return session
+
+    def run_command(self, sock: socket.socket, args: List[str]) -> int:
+        """Exécute une commande de la CLI en relayant ses flux vers le client ; retourne le code de sortie."""
+        with STDOUT.route(FrameWriter(sock, "out")), STDERR.route(FrameWriter(sock, "err")), STDIN.route(FrameReader(sock)):
+            try:
+                result = self.group.main(args=args, prog_name="crm", standalone_mode=False, obj=self.session())
+                return result if isinstance(result, int) and not isinstance(result, bool) else 0
+            except click.ClickException as e:
+                e.show()
+                return e.exit_code
+            except click.Abort:
+                typer.echo("Aborted!", err=True)
+                return 1
+            except ProtocolError:
+                raise
+            except Exception as e:
+                typer.echo(f"Erreur inattendue : {e}", err=True)
+                return 1
+            finally:
+                # Le fil servira d'autres requêtes : il ne garde pas la session de celle-ci.
+                reset_session()
+                self.release_connection()
+
+    @staticmethod
+    def release_connection():
+        """Rend la connexion du fil au pool à la fin de la requête."""
+        from crm.models.models import db
+        try:
+            if not db.is_closed():
+                db.close()
+        except Exception:
+            pass
+
+    def handle(self, sock: socket.socket):
+        with sock:
+            try:
+                message = recv_frame(sock)
+                kind = message.get("type")
+                if kind == "ping":
+                    send_frame(sock, {"type": "pong", "pid": os.getpid(), "workers": self.workers,
+                                      "requests": self.requests, "uptime": time.time() - self.started})
+                elif kind == "stop":
+                    send_frame(sock, {"type": "stopping"})
+                    self.stop()
+                elif kind == "run":
+                    # Les chemins relatifs (fichiers d'import, d'export) sont résolus dans le répertoire du démon.
+                    if message.get("cwd") != self.cwd:
+                        send_frame(sock, {"type": "fallback"})
+                        return
+                    with self._lock:
+                        self.requests += 1
+                    code = self.run_command(sock, message.get("args") or [])
+                    send_frame(sock, {"type": "exit", "code": code})
+                else:
+                    send_frame(sock, {"type": "err", "data": f"Requête inconnue : {kind}\n"})
+                    send_frame(sock, {"type": "exit", "code": 2})
+            except (ProtocolError, OSError, ValueError):
+                # Client parti en cours de route : rien à lui répondre.
+                pass
+
+    def serve(self):
+        """Écoute sur le socket jusqu'à l'arrêt (daemon stop, SIGTERM ou Ctrl-C)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Socket accessible uniquement par l'utilisateur : le démon agit avec sa session.
+        previous_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.path))
+        finally:
+            os.umask(previous_umask)
+        server.listen(64)
+        server.settimeout(0.5)
+        install_routed_streams()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crm-daemon") as pool:
+                while not self._stopping.is_set():
+                    try:
+                        sock, _ = server.accept()
+                    except socket.timeout:
+                        continue
+                    except OSError:
+                        break
+                    sock.settimeout(None)
+                    pool.submit(self.handle, sock)
+        finally:
+            server.close()
+            if self.path.exists():
+                self.path.unlink()
+
+    def stop(self):
+        self._stopping.set()
+
+
+STDOUT: Optional[RoutedStream] = None
+STDERR: Optional[RoutedStream] = None
+STDIN: Optional[RoutedStream] = None
+
+
+def install_routed_streams():
+    """Remplace les flux standard du processus par des flux aiguillés par fil d'exécution."""
+    import sys
+    global STDOUT, STDERR, STDIN
+    if STDOUT is None:
+        STDOUT, STDERR, STDIN = RoutedStream(sys.stdout), RoutedStream(sys.stderr), RoutedStream(sys.stdin)
+        sys.stdout, sys.stderr, sys.stdin = STDOUT, STDERR, STDIN
+
+
+@app.command()
+def start(
+    workers: int = typer.Option(4, min=1, help="Nombre de requêtes servies en parallèle (au plus la taille du pool de connexions)."),
+    socket_file: Optional[Path] = typer.Option(None, "--socket", help="Chemin du socket (par défaut dans le répertoire de session)."),
+):
+    """
+    Lance le démon au premier plan. Tant qu'il tourne, `python -m crm ...`
+    lui transmet les commandes lancées depuis le même répertoire.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        typer.echo("Le démon nécessite les sockets Unix, indisponibles sur ce système.")
+        raise typer.Exit(code=1)
+
+    path = socket_file or socket_path()
+    if request({"type": "ping"}, path) is not None:
+        typer.echo(f"Un démon est déjà lancé sur {path}.")
+        raise typer.Exit(code=1)
+
+    daemon = Daemon(path, workers)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    typer.echo(f"Démon CRM à l'écoute sur {path} ({workers} fil(s)). Ctrl-C pour l'arrêter.")
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+    typer.echo("Démon CRM arrêté.")
+
+
+@app.command()
+def stop(socket_file: Optional[Path] = typer.Option(None, "--socket", help="Chemin du socket.")):
+    """Arrête le démon."""
+    if request({"type": "stop"}, socket_file) is None:
+        typer.echo("Aucun démon n'est lancé.")
+    else:
+        typer.echo("Démon CRM arrêté.")
+
+
+@app.command()
+def status(socket_file: Optional[Path] = typer.Option(None, "--socket", help="Chemin du socket.")):
+    """Indique si le démon est lancé."""
+    reply = request({"type": "ping"}, socket_file)
+    if reply is None:
+        typer.echo("Aucun démon n'est lancé.")
+        raise typer.Exit(code=1)
+    typer.echo(f"Démon CRM lancé (pid {reply['pid']}, {reply['workers']} fil(s), "
+               f"{reply['requests']} requête(s), depuis {reply['uptime']:.0f}s).")
@@ -0,0 +1,125 @@
+"""
+Client léger du démon CRM (crm daemon) et protocole d'échange.
+
+Protocole : sur un socket Unix, des trames "longueur sur 4 octets (big-endian) + JSON UTF-8".
+- client -> démon : {"type": "run", "args": [...], "cwd": "..."}, {"type": "ping"}, {"type": "stop"} ;
+- démon -> client : {"type": "out" | "err", "data": "..."} pour les sorties de la commande,
+  {"type": "read"} lorsque la commande attend une ligne sur l'entrée standard
+  (le client répond {"type": "stdin", "data": "..."}), puis {"type": "exit", "code": n}.
+  {"type": "fallback"} demande au client d'exécuter la commande lui-même.
+
+Ce module n'importe que la bibliothèque standard : `python -m crm` l'utilise avant de charger
+typer et les sous-commandes, pour transmettre la commande au démon s'il est lancé.
+"""
+import json
+import os
+import socket
+import struct
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from crm.cli_commands.cli_session import session_dir
+
+SOCKET_FILE = "crm.sock"
+HEADER = struct.Struct("!I")
+MAX_FRAME = 64 * 1024 * 1024
+
+# Commandes toujours exécutées par le client : elles gèrent elles-mêmes leur processus.
+LOCAL_COMMANDS = ("daemon", "shell")
+
+
+class ProtocolError(Exception):
+    """Trame invalide ou connexion interrompue."""
+
+
+def socket_path() -> Path:
+    """Socket du démon, dans le répertoire de session de l'utilisateur (CRM_DAEMON_SOCKET pour le changer)."""
+    return Path(os.getenv("CRM_DAEMON_SOCKET") or session_dir() / SOCKET_FILE)
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ProtocolError("Connexion interrompue.")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def send_frame(sock: socket.socket, message: dict):
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> dict:
+    (size,) = HEADER.unpack(recv_exactly(sock, HEADER.size))
+    if size > MAX_FRAME:
+        raise ProtocolError(f"Trame trop grande : {size} octets.")
+    return json.loads(recv_exactly(sock, size).decode("utf-8"))
+
+
+def connect(path: Optional[Path] = None, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """Se connecte au démon ; retourne None s'il n'est pas lancé."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or socket_path()
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: dict, path: Optional[Path] = None) -> Optional[dict]:
+    """Envoie une requête simple (ping, stop) et retourne la réponse, ou None sans démon."""
+    sock = connect(path, timeout=5)
+    if sock is None:
+        return None
+    with sock:
+        send_frame(sock, message)
+        return recv_frame(sock)
+
+
+def forward(args: List[str], path: Optional[Path] = None, stdin=None, stdout=None, stderr=None) -> Optional[int]:
+    """
+    Transmet la commande au démon et relaie ses sorties et son entrée standard.
+    Retourne le code de sortie, ou None si la commande doit s'exécuter dans le processus courant
+    (pas de démon, CRM_NO_DAEMON=1, commande locale ou démon lancé dans un autre répertoire).
+    """
+    if os.getenv("CRM_NO_DAEMON") or (args and args[0] in LOCAL_COMMANDS):
+        return None
+    stdin, stdout, stderr = stdin or sys.stdin, stdout or sys.stdout, stderr or sys.stderr
+
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock:
+        try:
+            send_frame(sock, {"type": "run", "args": list(args), "cwd": os.getcwd()})
+            while True:
+                message = recv_frame(sock)
+                kind = message.get("type")
+                if kind == "out":
+                    stdout.write(message["data"])
+                    stdout.flush()
+                elif kind == "err":
+                    stderr.write(message["data"])
+                    stderr.flush()
+                elif kind == "read":
+                    send_frame(sock, {"type": "stdin", "data": stdin.readline()})
+                elif kind == "exit":
+                    return int(message.get("code") or 0)
+                elif kind == "fallback":
+                    return None
+                else:
+                    raise ProtocolError(f"Trame inattendue : {kind}.")
+        except (ProtocolError, OSError, ValueError) as e:
+            stderr.write(f"Erreur de communication avec le démon CRM : {e}\n")
+            return 1
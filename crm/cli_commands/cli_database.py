@@ -0,0 +1,80 @@
+import typer
+from crm.cli_commands.cli_permissions import requires_role
+from crm.models.index_check import check_indexes
+from crm.models.migrations import applied_versions, load_migrations, migrate as apply_migrations, rollback as rollback_migrations
+from crm.models.models import db
+
+
+app = typer.Typer()
+
+
+@app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour migrer le schéma.", exit_code=1)
+def migrate(to: int = typer.Option(None, help="Version cible (la dernière par défaut).")):
+    """
+    Applique les migrations du schéma qui ne l'ont pas encore été.
+    Une base vierge est créée par create_database.py, sans session.
+    """
+    try:
+        applied = apply_migrations(db, target=to)
+    except Exception as e:
+        typer.echo(f"Erreur lors de la migration : {e}")
+        raise typer.Exit(code=1)
+
+    if not applied:
+        typer.echo("Le schéma est à jour.")
+    for migration in applied:
+        typer.echo(f"Migration {migration.version:04d} ({migration.name}) appliquée.")
+
+
+@app.command()
+@requires_role('ADMINISTRATION', message="Accès refusé. Vous devez être dans l'équipe d'administration pour annuler une migration.", exit_code=1)
+def rollback(
+    steps: int = typer.Option(1, min=1, help="Nombre de migrations à annuler."),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Annule sans demander de confirmation."),
+):
+    """
+    Annule les dernières migrations appliquées (jamais la migration initiale, qui supprimerait les tables).
+    """
+    if not yes and not typer.confirm(f"Annuler les {steps} dernière(s) migration(s) du schéma ?"):
+        typer.echo("Annulation abandonnée.")
+        raise typer.Exit(code=1)
+
+    try:
+        rolled_back = rollback_migrations(db, steps=steps)
+    except Exception as e:
+        typer.echo(f"Erreur lors de l'annulation de la migration : {e}")
+        raise typer.Exit(code=1)
+
+    if not rolled_back:
+        typer.echo("Aucune migration à annuler.")
+    for migration in rolled_back:
+        typer.echo(f"Migration {migration.version:04d} ({migration.name}) annulée.")
+
+
+@app.command()
+def status():
+    """
+    Affiche les migrations appliquées et en attente.
+    """
+    done = set(applied_versions(db))
+    for migration in load_migrations():
+        state = "appliquée" if migration.version in done else "en attente"
+        typer.echo(f"{migration.version:04d} {migration.name:<24} {state}")
+
+
+@app.command("check-indexes")
+def report_missing_indexes():
+    """
+    Vérifie que les requêtes fréquentes de la CLI sont servies par un index.
+    """
+    results = check_indexes(db)
+    for result in results:
+        state = "OK" if result.uses_index else "INDEX MANQUANT"
+        typer.echo(f"{state:<15} {result.name:<36} {result.plan}")
+
+    missing = [result for result in results if not result.uses_index]
+    if missing:
+        typer.echo(f"{len(missing)} requête(s) sans index.")
+        raise typer.Exit(code=1)
+    typer.echo("Toutes les requêtes sont servies par un index.")
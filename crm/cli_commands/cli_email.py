@@ -0,0 +1,174 @@
+"""
+Validation des adresses email selon le mode EMAIL_VALIDATION :
+- syntax : syntaxe seule, sans requête réseau ;
+- cached (par défaut) : syntaxe, puis délivrabilité du domaine (enregistrements MX, A ou AAAA)
+  lue dans un cache par domaine partagé entre les exécutions (fichier email_domains.json du
+  répertoire de session). Un domaine délivrable y reste EMAIL_DOMAIN_TTL secondes (7 jours),
+  un domaine refusé EMAIL_DOMAIN_NEGATIVE_TTL secondes (1 heure). Une résolution sans réponse
+  (délai dépassé, serveurs DNS injoignables) accepte l'adresse sans rien mettre en cache ;
+- full : syntaxe et requête DNS à chaque validation (comportement par défaut d'email_validator).
+
+`validate_emails` valide un lot d'adresses en ne résolvant qu'une fois chaque domaine distinct,
+avec des requêtes DNS parallèles (EMAIL_DNS_WORKERS fils d'exécution, 8 par défaut).
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from email_validator import EmailNotValidError, EmailUndeliverableError, caching_resolver, validate_email
+from email_validator.deliverability import validate_email_deliverability
+
+from crm.cli_commands.cli_session import atomic_write, env_seconds, session_dir
+
+MODES = ("syntax", "cached", "full")
+DEFAULT_MODE = "cached"
+DOMAINS_FILE = "email_domains.json"
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 3600
+DEFAULT_WORKERS = 8
+DNS_TIMEOUT = 5
+CACHE_NAME = "email_domain"
+
+
+def validation_mode() -> str:
+    mode = (os.getenv("EMAIL_VALIDATION") or DEFAULT_MODE).lower()
+    if mode not in MODES:
+        raise EnvironmentError(f"EMAIL_VALIDATION={mode} : valeur attendue parmi {', '.join(MODES)}.")
+    return mode
+
+
+class DomainCache:
+    """Délivrabilité des domaines, avec date d'expiration, gardée dans un fichier JSON."""
+
+    def __init__(self, path: Path, ttl: int = DEFAULT_TTL, negative_ttl: int = DEFAULT_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Optional[Dict[str, dict]] = None
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, domain: str) -> Optional[bool]:
+        """True / False si le domaine est en cache et non expiré, None sinon."""
+        with self._lock:
+            entry = self._load().get(domain)
+        if entry is None or entry["expires"] <= time.time():
+            return None
+        return entry["deliverable"]
+
+    def put(self, domain: str, deliverable: bool):
+        ttl = self.ttl if deliverable else self.negative_ttl
+        with self._lock:
+            self._load()[domain] = {"deliverable": deliverable, "expires": time.time() + ttl}
+            self._changed = True
+
+    def save(self):
+        """Écrit le fichier s'il a changé (sans les entrées expirées)."""
+        with self._lock:
+            if not self._changed:
+                return
+            now = time.time()
+            self._entries = {domain: entry for domain, entry in self._entries.items() if entry["expires"] > now}
+            try:
+                atomic_write(self.path, json.dumps(self._entries))
+            except OSError:
+                # Cache seulement : la prochaine exécution refera les requêtes DNS.
+                pass
+            self._changed = False
+
+
+_domains: Optional[DomainCache] = None
+
+
+def domain_cache() -> DomainCache:
+    """Cache du processus, relu si le répertoire de session change."""
+    global _domains
+    path = session_dir() / DOMAINS_FILE
+    if _domains is None or _domains.path != path:
+        _domains = DomainCache(path, env_seconds("EMAIL_DOMAIN_TTL", DEFAULT_TTL),
+                               env_seconds("EMAIL_DOMAIN_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL))
+    return _domains
+
+
+def domain_deliverable(domain: str, domain_i18n: str, resolver=None) -> Optional[bool]:
+    """True / False selon les enregistrements DNS du domaine, None si la résolution n'a pas abouti."""
+    try:
+        info = validate_email_deliverability(domain, domain_i18n, dns_resolver=resolver)
+    except EmailUndeliverableError:
+        return False
+    return None if "unknown-deliverability" in info else True
+
+
+def resolve_domains(domains: Dict[str, str]) -> Dict[str, Optional[bool]]:
+    """Délivrabilité de chaque domaine ({ascii: affichage}), par requêtes DNS parallèles."""
+    try:
+        resolver = caching_resolver(timeout=DNS_TIMEOUT)
+    except Exception:
+        # Pas de configuration DNS sur ce poste (ex. hors ligne) : délivrabilité inconnue.
+        return {domain: None for domain in domains}
+    if len(domains) == 1:
+        ((domain, domain_i18n),) = domains.items()
+        return {domain: domain_deliverable(domain, domain_i18n, resolver)}
+
+    workers = min(env_seconds("EMAIL_DNS_WORKERS", DEFAULT_WORKERS), len(domains))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda item: domain_deliverable(*item, resolver), domains.items())
+        return dict(zip(domains, results))
+
+
+def validate_emails(emails: Iterable[str], mode: Optional[str] = None) -> List[bool]:
+    """Validité de chaque adresse, dans l'ordre ; chaque domaine distinct n'est résolu qu'une fois."""
+    mode = mode or validation_mode()
+    parsed = []
+    for email in emails:
+        try:
+            parsed.append(validate_email(email, check_deliverability=False))
+        except EmailNotValidError:
+            parsed.append(None)
+    if mode == "syntax":
+        return [result is not None for result in parsed]
+
+    domains = {result.ascii_domain: result.domain for result in parsed if result is not None}
+    cache = domain_cache() if mode == "cached" else None
+    deliverable: Dict[str, bool] = {}
+    if cache is not None:
+        from crm.models.profiling import current_profiler
+        profiler = current_profiler()
+        for domain in domains:
+            known = cache.get(domain)
+            if known is not None:
+                deliverable[domain] = known
+            if profiler is not None:
+                profiler.cache_event(CACHE_NAME, known is not None)
+
+    pending = {domain: domain_i18n for domain, domain_i18n in domains.items() if domain not in deliverable}
+    if pending:
+        for domain, result in resolve_domains(pending).items():
+            deliverable[domain] = result is not False
+            if cache is not None and result is not None:
+                cache.put(domain, result)
+        if cache is not None:
+            cache.save()
+
+    return [result is not None and deliverable[result.ascii_domain] for result in parsed]
+
+
+def warm_domains(emails: Iterable) -> None:
+    """
+    Résout d'avance, en parallèle, les domaines d'un lot d'adresses (mode cached) : les validations
+    adresse par adresse qui suivent (imports, mode lot) sont alors servies par le cache.
+    """
+    if validation_mode() == "cached":
+        validate_emails([email for email in emails if isinstance(email, str) and email], "cached")
@@ -0,0 +1,156 @@
+import csv
+import json
+import sys
+from datetime import date, datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import typer
+from crm.cli_commands.cli_permissions import get_session, requires_role
+from crm.models.database import iter_rows
+from crm.models.models import Client, Contrat, Event
+from crm.models.snapshot import reading_snapshot, snapshot_notice
+
+
+app = typer.Typer()
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+DATE_FORMATS = ["%Y-%m-%d"]
+
+
+def to_json_value(value):
+    """Convertit les dates en texte ISO 8601 pour la sérialisation JSON."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+def write_rows(rows: Iterable[tuple], columns: List[str], export_format: ExportFormat, out) -> int:
+    """
+    Écrit les lignes au format CSV ou NDJSON au fil de l'eau.
+    Retourne le nombre de lignes écrites.
+    """
+    count = 0
+    if export_format == ExportFormat.csv:
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            out.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=to_json_value))
+            out.write("\n")
+            count += 1
+    return count
+
+
+def export_query(query, columns: List[str], export_format: ExportFormat, output: Optional[Path]):
+    """
+    Exporte une requête vers un fichier ou la sortie standard, en mémoire constante.
+    Les lignes viennent de l'instantané local (crm sync) s'il est à jour.
+    """
+    with reading_snapshot(get_session().user_id) as synced_at:
+        if synced_at is not None:
+            typer.echo(snapshot_notice(synced_at), err=True)
+        if output is None:
+            count = write_rows(iter_rows(query), columns, export_format, sys.stdout)
+        else:
+            with output.open("w", newline="", encoding="utf-8") as out:
+                count = write_rows(iter_rows(query), columns, export_format, out)
+            typer.echo(f"{count} ligne(s) exportée(s) dans {output}.", err=True)
+
+
+def date_range(query, field, since: Optional[datetime], until: Optional[datetime]):
+    """Restreint la requête aux dates comprises entre `since` et `until` (inclus, à la journée)."""
+    if since:
+        query = query.where(field >= since)
+    if until:
+        query = query.where(field < until + timedelta(days=1))
+    return query
+
+
+@app.command()
+@requires_role(exit_code=1)
+def clients(
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format", help="Format de sortie."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Fichier de sortie (sortie standard par défaut)."),
+    commercial: Optional[int] = typer.Option(None, help="ID du commercial en charge des clients."),
+    since: Optional[datetime] = typer.Option(None, formats=DATE_FORMATS, help="Créés à partir de cette date (AAAA-MM-JJ)."),
+    until: Optional[datetime] = typer.Option(None, formats=DATE_FORMATS, help="Créés jusqu'à cette date (AAAA-MM-JJ)."),
+):
+    """
+    Exporte les clients au format CSV ou NDJSON.
+    """
+    columns = ["id", "name", "email", "phone", "company_name", "creation_date", "last_update_date", "commercial_contact_id"]
+    query = Client.select(
+        Client.id, Client.name, Client.email, Client.phone, Client.company_name,
+        Client.creation_date, Client.last_update_date, Client.commercial_contact
+    )
+    if commercial is not None:
+        query = query.where(Client.commercial_contact == commercial)
+    query = date_range(query, Client.creation_date, since, until)
+
+    export_query(query.order_by(Client.id), columns, export_format, output)
+
+
+@app.command()
+@requires_role(exit_code=1)
+def contrats(
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format", help="Format de sortie."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Fichier de sortie (sortie standard par défaut)."),
+    commercial: Optional[int] = typer.Option(None, help="ID du commercial en charge du client."),
+    status: Optional[str] = typer.Option(None, help="Statut du contrat (EN_COURS, TERMINE)."),
+    since: Optional[datetime] = typer.Option(None, formats=DATE_FORMATS, help="Commençant à partir de cette date (AAAA-MM-JJ)."),
+    until: Optional[datetime] = typer.Option(None, formats=DATE_FORMATS, help="Commençant jusqu'à cette date (AAAA-MM-JJ)."),
+):
+    """
+    Exporte les contrats au format CSV ou NDJSON.
+    """
+    columns = ["id", "client_id", "status", "start_date", "end_date", "price", "payment_received", "is_signed", "contrat_author_id"]
+    query = Contrat.select(
+        Contrat.id, Contrat.client, Contrat.status, Contrat.start_date, Contrat.end_date,
+        Contrat.price, Contrat.payment_received, Contrat.is_signed, Contrat.contrat_author
+    )
+    if commercial is not None:
+        query = query.join(Client).where(Client.commercial_contact == commercial)
+    if status:
+        query = query.where(Contrat.status == status.upper())
+    query = date_range(query, Contrat.start_date, since, until)
+
+    export_query(query.order_by(Contrat.id), columns, export_format, output)
+
+
+@app.command()
+@requires_role(exit_code=1)
+def events(
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format", help="Format de sortie."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Fichier de sortie (sortie standard par défaut)."),
+    commercial: Optional[int] = typer.Option(None, help="ID du commercial en charge du client."),
+    status: Optional[str] = typer.Option(None, help="Statut du contrat associé (EN_COURS, TERMINE)."),
+    since: Optional[datetime] = typer.Option(None, formats=DATE_FORMATS, help="Commençant à partir de cette date (AAAA-MM-JJ)."),
+    until: Optional[datetime] = typer.Option(None, formats=DATE_FORMATS, help="Commençant jusqu'à cette date (AAAA-MM-JJ)."),
+):
+    """
+    Exporte les événements au format CSV ou NDJSON.
+    """
+    columns = ["id", "contrat_id", "support_contact_id", "start_date", "end_date", "attendees", "notes"]
+    query = Event.select(
+        Event.id, Event.contrat, Event.support_contact, Event.start_date, Event.end_date,
+        Event.attendees, Event.notes
+    )
+    if commercial is not None or status:
+        query = query.join(Contrat)
+    if status:
+        query = query.where(Contrat.status == status.upper())
+    if commercial is not None:
+        query = query.join(Client).where(Client.commercial_contact == commercial)
+    query = date_range(query, Event.start_date, since, until)
+
+    export_query(query.order_by(Event.id), columns, export_format, output)
@@ -1,20 +1,15 @@
 import typer
 from crm.models.models import USER_ROLES
 from datetime import datetime
-from email_validator import validate_email, EmailNotValidError
+from crm.cli_commands.cli_email import validate_emails
+from crm.cli_commands.cli_schema import CLIENT_SCHEMA, CONTRAT_SCHEMA, EVENT_SCHEMA, Context, contrat_window, to_date
 from peewee import Model
 
 
 def is_valid_email(email: str) -> bool:
-    """Vérifie si l'email est valide."""
+    """Vérifie si l'email est valide (syntaxe, puis domaine selon EMAIL_VALIDATION : syntax, cached ou full)."""
     
-    try:
-        validate_email(email)
-        return True
-    
-    # Email n'est pas valide selon les critères de validation
-    except EmailNotValidError:
-        return False
+    return validate_emails([email])[0]
 
 
 def is_strong_password(password: str) -> bool:
@@ -25,7 +20,7 @@ def is_strong_password(password: str) -> bool:
 
 def is_valid_phone(phone: str) -> bool:
     
-    return len(phone) >= 10 and phone.isdigit()
+    return CLIENT_SCHEMA.field_error("phone", phone) is None
 
 
 def get_valid_input(prompt_message, validation_function, error_message, default=None):
@@ -97,16 +92,10 @@ def get_price() -> int:
             typer.echo("Veuillez entrer un nombre entier valide.")
 
 
-def is_valid_date(date_str: str, format="%Y-%m-%d") -> bool:
+def is_valid_date(date_str: str) -> bool:
     """Vérifie si la date est valide et n'est pas antérieure à aujourd'hui."""
     
-    try:
-        input_date = datetime.strptime(date_str, format).date()
-        current_date = datetime.now().date()
-        return input_date >= current_date
-    
-    except ValueError:
-        return False
+    return CONTRAT_SCHEMA.field_error("start_date", date_str) is None
 
 
 def get_start_date() -> str:
@@ -123,19 +112,20 @@ def is_end_date_valid(end_date_str: str, start_date_str: str) -> bool:
     """Vérifie si la date de fin est valide et postérieure à la date de début."""
     
     try:
-        end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-        start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-        return end_date >= start_date
-    
+        values = {"start_date": to_date(start_date_str)}
     except ValueError:
         return False
+    return CONTRAT_SCHEMA.field_error("end_date", end_date_str, values) is None
 
 
 def get_end_date(start_date_str: str) -> str:
     """Obtient une date de fin valide de l'utilisateur, qui doit être postérieure à la date de début."""
     
+    # La date de début est convertie une fois pour toutes les réponses.
+    values = {"start_date": to_date(start_date_str)}
+
     def validation_function(end_date_str):
-        return is_end_date_valid(end_date_str, start_date_str)
+        return CONTRAT_SCHEMA.field_error("end_date", end_date_str, values) is None
     
     return get_valid_input(
         prompt_message="Date de fin (AAAA-MM-JJ)",
@@ -184,35 +174,36 @@ def get_valid_id(model: Model, prompt_message: str, validation_function) -> int:
 def valid_event_date(date_str: str, start_str: str, end_str: str) -> bool:
     """ Vérifie si la date de l'événement est pendant la durée du contrat"""
     
-    event_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    start = datetime.strptime(start_str, "%Y-%m-%d").date()
-    end = datetime.strptime(end_str, "%Y-%m-%d").date()
-    return start <= event_date <= end
+    return EVENT_SCHEMA.field_error("start_date", date_str, context=event_context(start_str, end_str)) is None
 
 
 def valid_event_date_for_start(date_str: str, start_str: str, end_str: str) -> bool:
     """ Vérifie si la date de l'événement est pendant la durée du contrat"""
     
-    event_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    start = datetime.strptime(start_str, "%Y-%m-%d").date()
-    end = datetime.strptime(end_str, "%Y-%m-%d").date()
-    return start <= event_date <= end
+    return valid_event_date(date_str, start_str, end_str)
 
 
 def valid_event_date_for_end(date_str: str, start_event_str: str, end_str: str) -> bool:
     """ Vérifie si la date de fin de l'événement est après la date de début et avant la fin du contrat"""
     
-    event_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    start_event = datetime.strptime(start_event_str, "%Y-%m-%d").date()
-    end = datetime.strptime(end_str, "%Y-%m-%d").date()
-    return start_event <= event_date <= end
+    values = {"start_date": to_date(start_event_str)}
+    context = event_context(start_event_str, end_str)
+    return EVENT_SCHEMA.field_error("end_date", date_str, values, context) is None
+
+
+def event_context(start_str: str, end_str: str) -> Context:
+    """Contexte de validation des dates d'événement : bornes du contrat converties une fois."""
+    
+    return Context(datetime.now().date(), contrat_window(start_str, end_str))
 
 
 def get_event_start(start_str: str, end_str: str) -> str:
     """ Demande la date de début de l'événement"""
     
+    context = event_context(start_str, end_str)
+
     def validation_function(date_str):
-        return valid_event_date_for_start(date_str, start_str, end_str)
+        return EVENT_SCHEMA.field_error("start_date", date_str, context=context) is None
     return get_valid_input(
         "Début de l'événement (AAAA-MM-JJ)",
         validation_function,
@@ -222,8 +213,11 @@ def get_event_start(start_str: str, end_str: str) -> str:
 def get_event_end(start_event_str: str, end_str: str) -> str:
     """ Demande la date de fin de l'événement"""
     
+    values = {"start_date": to_date(start_event_str)}
+    context = event_context(start_event_str, end_str)
+
     def validation_function(date_str):
-        return valid_event_date_for_end(date_str, start_event_str, end_str)
+        return EVENT_SCHEMA.field_error("end_date", date_str, values, context) is None
     return get_valid_input(
         "Fin de l'événement (AAAA-MM-JJ)",
         validation_function,
@@ -0,0 +1,162 @@
+from datetime import date, datetime
+from typing import Optional, Sequence, Tuple
+
+import typer
+from crm.cli_commands.cli_permissions import get_session, requires_role
+from crm.models.models import Client, Contrat, Event
+from crm.models.snapshot import reading_snapshot, snapshot_notice
+from crm.models.queries import (
+    clients_of_commercial,
+    contrats_of_author,
+    contrats_of_commercial,
+    decode_cursor,
+    encode_cursor,
+    events_of_commercial,
+    events_of_support,
+    iter_keyset_pages,
+    unassigned_events,
+)
+
+
+app = typer.Typer()
+
+
+def format_cell(value, width: int) -> str:
+    """Met en forme une valeur dans une colonne de largeur fixe."""
+    if value is None:
+        text = ""
+    elif isinstance(value, bool):
+        text = "Oui" if value else "Non"
+    elif isinstance(value, (datetime, date)):
+        text = value.strftime("%Y-%m-%d")
+    else:
+        text = str(value)
+    if len(text) > width:
+        text = text[:width - 1] + "…"
+    return text.ljust(width)
+
+
+def print_table(columns: Sequence[Tuple[str, int]], pages, keys_count: int, show_all: bool):
+    """
+    Affiche les lignes au fur et à mesure, dans un tableau à colonnes de largeur fixe :
+    aucune ligne n'est gardée en mémoire au-delà de la page courante.
+    Affiche ensuite le curseur de la page suivante, s'il en existe une.
+    """
+    typer.echo(" ".join(format_cell(title, width) for title, width in columns).rstrip())
+    typer.echo(" ".join("-" * width for _, width in columns))
+
+    count = 0
+    last_page = []
+    for last_page in pages:
+        for row in last_page:
+            # Les colonnes de tri en tête de ligne servent au curseur, pas à l'affichage.
+            typer.echo(" ".join(format_cell(value, width) for value, (_, width) in zip(row[keys_count:], columns)).rstrip())
+            count += 1
+        if not show_all:
+            break
+
+    typer.echo(f"{count} ligne(s).")
+    if last_page and last_page.has_more and not show_all:
+        typer.echo(f"Page suivante : --after {encode_cursor(last_page[-1][:keys_count])}")
+
+
+def run_listing(query, keys, columns, after: Optional[str], limit: int, show_all: bool):
+    """Pagine la requête par clé à partir du curseur `after` et affiche le tableau."""
+    try:
+        after_key = decode_cursor(after, keys) if after else None
+    except ValueError:
+        typer.echo("Curseur de pagination invalide.")
+        return
+
+    with reading_snapshot(get_session().user_id) as synced_at:
+        if synced_at is not None:
+            typer.echo(snapshot_notice(synced_at), err=True)
+        pages = iter_keyset_pages(query, keys, after_key, limit)
+        print_table(columns, pages, len(keys), show_all)
+
+
+PAGE_OPTIONS = {
+    "after": typer.Option(None, help="Curseur de la page suivante, affiché en fin de page."),
+    "limit": typer.Option(50, min=1, max=1000, help="Nombre de lignes par page."),
+    "all_pages": typer.Option(False, "--all-pages", help="Affiche toutes les pages à la suite."),
+}
+
+
+@app.command()
+@requires_role()
+def clients(
+    everyone: bool = typer.Option(False, "--all", help="Tous les clients, et pas seulement les vôtres."),
+    after: Optional[str] = PAGE_OPTIONS["after"],
+    limit: int = PAGE_OPTIONS["limit"],
+    all_pages: bool = PAGE_OPTIONS["all_pages"],
+):
+    """
+    Liste les clients, par ordre d'ID.
+    Un commercial voit ses propres clients, sauf avec --all.
+    """
+    session = get_session()
+    fields = [Client.id, Client.name, Client.email, Client.phone, Client.company_name, Client.commercial_contact]
+    if session.has_role('COMMERCIAL') and not everyone:
+        query = clients_of_commercial(session.user_id)
+    else:
+        query = Client.select()
+
+    columns = [("ID", 8), ("Nom", 24), ("Email", 30), ("Téléphone", 12), ("Entreprise", 20), ("Commercial", 10)]
+    run_listing(query.select(Client.id, *fields), [Client.id], columns, after, limit, all_pages)
+
+
+@app.command()
+@requires_role()
+def contrats(
+    everyone: bool = typer.Option(False, "--all", help="Tous les contrats, et pas seulement les vôtres."),
+    after: Optional[str] = PAGE_OPTIONS["after"],
+    limit: int = PAGE_OPTIONS["limit"],
+    all_pages: bool = PAGE_OPTIONS["all_pages"],
+):
+    """
+    Liste les contrats, par ordre d'ID.
+    L'administration voit les contrats qu'elle a créés, un commercial ceux de ses clients, sauf avec --all.
+    """
+    session = get_session()
+    role = session.role
+    if role == 'ADMINISTRATION' and not everyone:
+        query = contrats_of_author(session.user_id)
+    elif role == 'COMMERCIAL' and not everyone:
+        query = contrats_of_commercial(session.user_id)
+    else:
+        query = Contrat.select()
+
+    fields = [Contrat.id, Contrat.client, Contrat.status, Contrat.start_date, Contrat.end_date,
+              Contrat.price, Contrat.is_signed, Contrat.payment_received]
+    columns = [("ID", 8), ("Client", 8), ("Statut", 9), ("Début", 10), ("Fin", 10), ("Prix", 10), ("Signé", 5), ("Payé", 5)]
+    run_listing(query.select(Contrat.id, *fields), [Contrat.id], columns, after, limit, all_pages)
+
+
+@app.command()
+@requires_role()
+def events(
+    unassigned: bool = typer.Option(False, "--unassigned", help="Événements sans membre du support."),
+    everyone: bool = typer.Option(False, "--all", help="Tous les événements, et pas seulement les vôtres."),
+    after: Optional[str] = PAGE_OPTIONS["after"],
+    limit: int = PAGE_OPTIONS["limit"],
+    all_pages: bool = PAGE_OPTIONS["all_pages"],
+):
+    """
+    Liste les événements, par date de début.
+    Le support voit ses événements, un commercial ceux de ses clients, sauf avec --all ou --unassigned.
+    """
+    session = get_session()
+    role = session.role
+    if unassigned:
+        query = unassigned_events()
+    elif role == 'SUPPORT' and not everyone:
+        query = events_of_support(session.user_id)
+    elif role == 'COMMERCIAL' and not everyone:
+        query = events_of_commercial(session.user_id)
+    else:
+        query = Event.select()
+
+    keys = [Event.start_date, Event.id]
+    fields = [Event.id, Event.contrat, Event.support_contact, Event.start_date, Event.end_date, Event.attendees, Event.notes]
+    columns = [("ID", 8), ("Contrat", 8), ("Support", 8), ("Début", 10), ("Fin", 10), ("Participants", 12), ("Notes", 30)]
+    run_listing(query.select(*keys, *fields), keys, columns, after, limit, all_pages)
@@ -0,0 +1,68 @@
+"""
+Hachage des mots de passe.
+
+Les nouveaux mots de passe sont hachés avec argon2id ; les paramètres de coût sont réglables
+par variables d'environnement :
+- ARGON2_TIME_COST : nombre de passes (3 par défaut) ;
+- ARGON2_MEMORY_COST : mémoire en Kio (65536, soit 64 Mio, par défaut) ;
+- ARGON2_PARALLELISM : nombre de fils (4 par défaut).
+
+Les anciens hachages bcrypt restent acceptés. `verify_password` signale quand un hachage
+doit être recalculé (bcrypt, ou argon2 avec des paramètres différents de la politique courante),
+ce que la connexion fait de façon transparente avec le mot de passe en clair qu'elle vient de vérifier.
+"""
+import os
+from typing import NamedTuple
+
+DEFAULT_TIME_COST = 3
+DEFAULT_MEMORY_COST = 65536
+DEFAULT_PARALLELISM = 4
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+class PasswordCheck(NamedTuple):
+    """Résultat d'une vérification : mot de passe correct, et hachage à recalculer."""
+    valid: bool
+    needs_rehash: bool = False
+
+
+def password_hasher(time_cost: int = None, memory_cost: int = None, parallelism: int = None):
+    """Hacheur argon2id configuré selon la politique courante (ou les paramètres donnés)."""
+    from argon2 import PasswordHasher, Type
+
+    return PasswordHasher(
+        time_cost=time_cost or int(os.getenv("ARGON2_TIME_COST", DEFAULT_TIME_COST)),
+        memory_cost=memory_cost or int(os.getenv("ARGON2_MEMORY_COST", DEFAULT_MEMORY_COST)),
+        parallelism=parallelism or int(os.getenv("ARGON2_PARALLELISM", DEFAULT_PARALLELISM)),
+        type=Type.ID,
+    )
+
+
+def hash_password(password: str) -> str:
+    """Hache un mot de passe avec argon2id."""
+    return password_hasher().hash(password)
+
+
+def verify_password(password: str, hashed: str) -> PasswordCheck:
+    """
+    Vérifie un mot de passe contre un hachage argon2 ou bcrypt.
+    Un hachage bcrypt, ou argon2 hors politique, est signalé comme à recalculer.
+    """
+    if hashed.startswith(BCRYPT_PREFIXES):
+        import bcrypt
+
+        try:
+            valid = bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            return PasswordCheck(False)
+        return PasswordCheck(valid, needs_rehash=valid)
+
+    from argon2.exceptions import InvalidHashError, VerificationError
+
+    hasher = password_hasher()
+    try:
+        hasher.verify(hashed, password)
+    except (VerificationError, InvalidHashError):
+        return PasswordCheck(False)
+    return PasswordCheck(True, needs_rehash=hasher.check_needs_rehash(hashed))
@@ -1,28 +1,112 @@
-import json
+import functools
+import threading
+import time
+from typing import Optional
+
+import typer
+
+from crm.cli_commands.cli_session import load_session
+
+
+class Session:
+    """
+    Session de l'utilisateur connecté, chargée une seule fois par commande.
+    Les vérifications de rôle sont de simples lectures en mémoire.
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        self.data = data or {}
+
+    @property
+    def is_authenticated(self) -> bool:
+        return bool(self.data) and self.expires_in > 0
+
+    @property
+    def expires_in(self) -> float:
+        """Secondes avant l'expiration du jeton (une session gardée en mémoire peut expirer)."""
+        return self.data.get('expires_at', float('inf')) - time.time()
+
+    @property
+    def user_id(self) -> Optional[int]:
+        return self.data.get('user_id')
+
+    @property
+    def role(self) -> str:
+        return (self.data.get('role') or '').upper()
+
+    def has_role(self, role: str) -> bool:
+        """Vérifie le rôle, insensible à la casse."""
+        return self.is_authenticated and self.role == role.upper()
+
+
+# Session de la commande en cours, rechargée au début de chaque commande (voir reset_session).
+# Elle est propre à chaque fil d'exécution : les requêtes servies en parallèle par le démon
+# (crm daemon) ne voient jamais l'identité d'une autre requête.
+_local = threading.local()
+
+
+def read_session_file() -> Optional[dict]:
+    """Lit et vérifie le jeton de session (signature et expiration), sans accès à la base de données."""
+    return load_session()
+
+
+def get_session() -> Session:
+    """Retourne la session courante, en la chargeant au premier appel."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = Session(read_session_file())
+    return session
+
+
+def use_session(session: Session):
+    """Fixe la session de la commande en cours (ex. celle fournie par le shell ou le démon dans ctx.obj)."""
+    _local.session = session
+
+
+def reset_session():
+    """Oublie la session mémorisée : elle sera relue au prochain appel (connexion, déconnexion, nouvelle commande)."""
+    _local.session = None
+
+
+def requires_role(*roles: str, message: str = None, exit_code: int = 0):
+    """
+    Décorateur de commande : exige un utilisateur connecté ayant l'un des rôles indiqués
+    (n'importe quel rôle si aucun n'est indiqué). Sinon, affiche `message` et n'exécute pas la commande ;
+    avec `exit_code` non nul, la commande se termine en erreur (utile pour les scripts).
+    """
+    def refuse(text: str):
+        typer.echo(text, err=bool(exit_code))
+        if exit_code:
+            raise typer.Exit(code=exit_code)
+
+    def decorator(command):
+        @functools.wraps(command)
+        def wrapper(*args, **kwargs):
+            session = get_session()
+            if not session.is_authenticated or session.user_id is None:
+                return refuse("Accès refusé. Aucun utilisateur n'est actuellement connecté.")
+            if roles and not any(session.has_role(role) for role in roles):
+                return refuse(message or "Accès refusé. Votre rôle ne permet pas d'exécuter cette commande.")
+            return command(*args, **kwargs)
+        return wrapper
+    return decorator
 
 
 def load_user_info():
-    """Charge les informations de l'utilisateur à partir de config.json."""
-    try:
-        with open("config.json", "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
+    """Charge les informations de l'utilisateur à partir du jeton de session."""
+    return get_session().data or None
 
 
 def is_authenticated():
     """Vérifie si l'utilisateur est authentifié."""
-    return bool(load_user_info())
+    return get_session().is_authenticated
 
 
 def check_role(role):
     """
     Vérifie si l'utilisateur authentifié a le rôle spécifié, insensible à la casse.
     """
-    user_info = load_user_info()
-    
-    # Convertit les deux chaînes en minuscules avant de les comparer pour l'insensibilité à la casse.
-    return is_authenticated() and user_info.get('role', '').lower() == role.lower()
+    return get_session().has_role(role)
 
 
 def is_commercial():
@@ -43,4 +127,4 @@ def is_support():
     """
     Vérifie si l'utilisateur authentifié a le rôle 'Support'.
     """
-    return check_role('SUPPORT')
\ No newline at end of file
+    return check_role('SUPPORT')
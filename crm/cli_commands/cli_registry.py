@@ -0,0 +1,99 @@
+import importlib
+from typing import Dict, List, NamedTuple, Optional
+
+import click
+import typer
+from typer.core import TyperGroup
+
+
+class LazySubcommand(NamedTuple):
+    """
+    Décrit une sous-commande chargée à la demande :
+    - le chemin d'import "module:attribut" de l'application Typer,
+    - le texte d'aide court affiché par --help sans importer le module,
+    - group : False pour une application à commande unique (ex. `crm batch FICHIER`).
+    """
+    import_path: str
+    help: str
+    group: bool = True
+
+
+# Registre des sous-commandes de la CLI.
+# Aucun module n'est importé tant que la sous-commande n'est pas invoquée :
+# peewee, psycopg2, bcrypt, argon2 et email_validator ne sont chargés qu'au besoin.
+SUBCOMMANDS: Dict[str, LazySubcommand] = {
+    "user": LazySubcommand("crm.cli_commands.cli_user:app", "Gestion des utilisateurs."),
+    "auth": LazySubcommand("crm.cli_commands.cli_auth:app", "Connexion et déconnexion."),
+    "commercial": LazySubcommand("crm.cli_commands.cli_commercial:app", "Clients et événements (équipe commerciale)."),
+    "administration": LazySubcommand("crm.cli_commands.cli_administration:app", "Contrats (équipe d'administration)."),
+    "support": LazySubcommand("crm.cli_commands.cli_support:app", "Événements (équipe support)."),
+    "db": LazySubcommand("crm.cli_commands.cli_database:app", "Migrations du schéma et vérification des index."),
+    "list": LazySubcommand("crm.cli_commands.cli_list:app", "Listes paginées des clients, contrats et événements."),
+    "export": LazySubcommand("crm.cli_commands.cli_export:app", "Export des clients, contrats et événements (CSV, NDJSON)."),
+    "daemon": LazySubcommand("crm.cli_commands.cli_daemon:app", "Démon local servant les commandes via un socket Unix."),
+    "shell": LazySubcommand("crm.cli_commands.cli_shell:app", "Shell interactif (connexion et session gardées en mémoire).", group=False),
+    "batch": LazySubcommand("crm.cli_commands.cli_batch:app", "Exécute des opérations en lot depuis un fichier JSONL.", group=False),
+    "sync": LazySubcommand("crm.cli_commands.cli_sync:app", "Synchronise l'instantané local (lectures hors ligne).", group=False),
+}
+
+
+def load_subcommand(name: str, entry: LazySubcommand) -> click.Command:
+    """
+    Importe le module de la sous-commande et convertit son application Typer en commande click.
+    """
+    module_name, attribute = entry.import_path.split(":")
+    sub_app = getattr(importlib.import_module(module_name), attribute)
+
+    if entry.group:
+        command = typer.main.get_group(sub_app)
+    else:
+        command = typer.main.get_command(sub_app)
+
+    command.name = name
+    return command
+
+
+class LazyTyperGroup(TyperGroup):
+    """
+    Groupe Typer dont les sous-commandes sont résolues via le registre SUBCOMMANDS,
+    uniquement lorsqu'elles sont invoquées.
+    """
+
+    def __init__(self, *args, subcommands: Optional[Dict[str, LazySubcommand]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = SUBCOMMANDS if subcommands is None else subcommands
+        self._loaded: Dict[str, click.Command] = {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.commands:
+            return self.commands[cmd_name]
+
+        entry = self.lazy_subcommands.get(cmd_name)
+        if entry is None:
+            return None
+
+        if cmd_name not in self._loaded:
+            self._loaded[cmd_name] = load_subcommand(cmd_name, entry)
+        return self._loaded[cmd_name]
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """
+        Affiche la liste des commandes à partir des aides du registre,
+        sans importer les modules des sous-commandes.
+        """
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                command = self.commands[name]
+                if command.hidden:
+                    continue
+                rows.append((name, command.get_short_help_str()))
+            else:
+                rows.append((name, self.lazy_subcommands[name].help))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
@@ -0,0 +1,242 @@
+"""
+Schémas de validation des enregistrements Client, Contrat et Event.
+
+Un schéma décrit chaque champ (conversion, obligatoire ou non, contrôles, message d'erreur) ;
+ses règles sont compilées une fois, à l'import du module, en une fonction par champ.
+`Schema.validate` valide un enregistrement (dict) et `Schema.validate_many` un lot, avec des
+erreurs structurées par champ : {"email": "L'e-mail n'est pas valide.", ...}.
+
+- Une date n'est analysée qu'une fois par valeur (`parse_date`, mémorisée) et la date du jour
+  est lue une fois par validation (`Context.today`).
+- La règle « pendant le contrat » compare des dates déjà converties : les bornes du contrat
+  sont passées dans le contexte (`contrat_context`).
+- `validate_many` valide les emails du lot en un appel (un domaine distinct, une requête DNS).
+
+Les questions interactives (cli_input_validators), le mode lot et les imports utilisent ces schémas.
+"""
+import functools
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from crm.cli_commands.cli_bulk import clean
+from crm.cli_commands.cli_email import validate_emails
+from crm.models.models import CONTRAT_STATUTS
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+class Context(NamedTuple):
+    """Données partagées par les contrôles : date du jour, bornes du contrat, emails déjà validés."""
+    today: date
+    window: Optional[Tuple[date, date]] = None
+    emails: Optional[Dict[str, bool]] = None
+
+
+class ValidationResult(NamedTuple):
+    data: Dict[str, Any]
+    errors: Dict[str, str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+# (valeur convertie, valeurs déjà converties de l'enregistrement, contexte) -> contrôle réussi
+Check = Callable[[Any, Dict[str, Any], Context], bool]
+
+
+class Field(NamedTuple):
+    name: str
+    convert: Callable[[Any], Any]
+    message: str
+    required: bool = True
+    default: Any = None
+    checks: Tuple[Check, ...] = ()
+
+
+# Conversions
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(text: str) -> date:
+    return datetime.strptime(text, DATE_FORMAT).date()
+
+
+def to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return parse_date(str(value).strip())
+
+
+def to_datetime(value: date) -> datetime:
+    """Date convertie en datetime à minuit, comme les dates saisies jusqu'ici."""
+    return datetime(value.year, value.month, value.day)
+
+
+def positive_int(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError(value)
+    number = int(value)
+    if number < 0:
+        raise ValueError(value)
+    return number
+
+
+def boolean(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("oui", "true", "1"):
+        return True
+    if text in ("non", "false", "0"):
+        return False
+    raise ValueError(value)
+
+
+def contrat_status(value) -> str:
+    status = str(value).strip().upper()
+    if status not in CONTRAT_STATUTS:
+        raise ValueError(value)
+    return status
+
+
+# Contrôles
+
+def valid_email(value, values, context: Context) -> bool:
+    if context.emails is not None and value in context.emails:
+        return context.emails[value]
+    return validate_emails([value])[0]
+
+
+def valid_phone(value, values, context: Context) -> bool:
+    return len(value) >= 10 and value.isdigit()
+
+
+def not_in_past(value, values, context: Context) -> bool:
+    return value >= context.today
+
+
+def after_start(value, values, context: Context) -> bool:
+    start = values.get("start_date")
+    return start is None or value >= start
+
+
+def within_contrat(value, values, context: Context) -> bool:
+    return context.window is None or context.window[0] <= value <= context.window[1]
+
+
+# Compilation
+
+def compile_field(field: Field) -> Callable[[Any, Dict[str, Any], Context], Tuple[Any, Optional[str]]]:
+    """Fonction (valeur brute, valeurs converties, contexte) -> (valeur convertie, erreur ou None)."""
+    convert, checks, message = field.convert, field.checks, field.message
+    required, default = field.required, field.default
+
+    def validate_field(raw, values, context):
+        if raw is None or (isinstance(raw, str) and not raw.strip()):
+            return (None, message) if required else (default, None)
+        try:
+            value = convert(raw)
+        except (TypeError, ValueError):
+            return None, message
+        for check in checks:
+            if not check(value, values, context):
+                return value, message
+        return value, None
+
+    return validate_field
+
+
+class Schema:
+    """Schéma compilé d'un type d'enregistrement."""
+
+    def __init__(self, fields: List[Field]):
+        self.fields = {field.name: field for field in fields}
+        self._compiled = [(field.name, compile_field(field)) for field in fields]
+        self._email_fields = [field.name for field in fields if valid_email in field.checks]
+
+    def validate(self, record: Dict[str, Any], context: Optional[Context] = None,
+                 partial: bool = False) -> ValidationResult:
+        """
+        Valide un enregistrement. Avec `partial` (mise à jour), seuls les champs présents sont
+        validés et retournés ; les autres champs de l'enregistrement (ex. id) sont ignorés.
+        """
+        context = context or Context(date.today())
+        values, errors = {}, {}
+        for name, validate_field in self._compiled:
+            if partial and name not in record:
+                continue
+            value, error = validate_field(record.get(name), values, context)
+            if error is None:
+                values[name] = value
+            else:
+                errors[name] = error
+        return ValidationResult(values, errors)
+
+    def field_error(self, name: str, raw, values: Optional[Dict[str, Any]] = None,
+                    context: Optional[Context] = None) -> Optional[str]:
+        """Erreur d'un seul champ (questions interactives), ou None si la valeur est valide."""
+        for field_name, validate_field in self._compiled:
+            if field_name == name:
+                return validate_field(raw, values or {}, context or Context(date.today()))[1]
+        raise KeyError(name)
+
+    def validate_many(self, records: Iterable[Dict[str, Any]],
+                      windows: Optional[Callable[[Dict[str, Any]], Optional[Tuple[date, date]]]] = None,
+                      partial: bool = False) -> List[ValidationResult]:
+        """
+        Valide un lot d'enregistrements ; `windows` donne les bornes du contrat de chaque
+        enregistrement (événements). La date du jour est lue et les emails validés une seule fois.
+        """
+        records = list(records)
+        emails = None
+        if self._email_fields:
+            addresses = sorted({clean(record.get(name)) for record in records for name in self._email_fields} - {None})
+            emails = dict(zip(addresses, validate_emails(addresses)))
+        shared = Context(date.today(), emails=emails)
+        return [self.validate(record, shared._replace(window=windows(record)) if windows else shared, partial)
+                for record in records]
+
+
+def contrat_window(start, end) -> Tuple[date, date]:
+    """Bornes d'un contrat (dates, datetimes ou textes AAAA-MM-JJ)."""
+    return to_date(start), to_date(end)
+
+
+def contrat_context(contrat) -> Context:
+    """Contexte de validation des événements d'un contrat."""
+    return Context(date.today(), contrat_window(contrat.start_date, contrat.end_date))
+
+
+CLIENT_SCHEMA = Schema([
+    Field("name", clean, "Le nom du client ne peut pas être vide."),
+    Field("email", clean, "L'e-mail n'est pas valide.", checks=(valid_email,)),
+    Field("phone", clean, "Le numéro de téléphone doit avoir au moins 10 chiffres.", checks=(valid_phone,)),
+    Field("company_name", clean, "", required=False),
+])
+
+CONTRAT_SCHEMA = Schema([
+    Field("status", contrat_status, "Statut non valide.", required=False, default=CONTRAT_STATUTS[0]),
+    Field("start_date", to_date,
+          "La date de début doit être au format AAAA-MM-JJ et ne peut pas être antérieure à aujourd'hui.",
+          checks=(not_in_past,)),
+    Field("end_date", to_date, "La date de fin doit être au format AAAA-MM-JJ et postérieure à la date de début.",
+          checks=(after_start,)),
+    Field("price", positive_int, "Le prix doit être un nombre entier positif."),
+    Field("payment_received", boolean, "Réponse invalide. Répondez par 'Oui' ou 'Non'.", required=False,
+          default=False),
+    Field("is_signed", boolean, "Réponse invalide. Répondez par 'Oui' ou 'Non'.", required=False, default=False),
+])
+
+EVENT_SCHEMA = Schema([
+    Field("start_date", to_date, "La date doit être durant la période du contrat.", checks=(within_contrat,)),
+    Field("end_date", to_date, "La fin doit être après le début et avant la fin du contrat.",
+          checks=(after_start, within_contrat)),
+    Field("attendees", positive_int, "Le nombre de participants doit être un nombre entier positif."),
+    Field("notes", str, "", required=False, default=""),
+])
+
+
+def first_error(result: ValidationResult) -> Optional[str]:
+    return next(iter(result.errors.values()), None)
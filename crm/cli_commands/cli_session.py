@@ -0,0 +1,223 @@
+"""
+Jeton de session signé (JWT) de la CLI.
+
+Après `auth authenticate`, la CLI enregistre un JWT signé (HS256) contenant l'identifiant,
+le rôle, une date d'expiration et une date d'authentification. Chaque commande vérifie
+la signature et l'expiration localement, sans requête à la base de données.
+
+- Le jeton est rafraîchi automatiquement lorsqu'il reste moins de SESSION_REFRESH secondes
+  avant son expiration, dans la limite de SESSION_MAX_AGE depuis l'authentification.
+- Le fichier est stocké dans un répertoire propre à l'utilisateur du système
+  (CRM_SESSION_DIR, sinon %APPDATA%, ~/Library/Application Support ou $XDG_CONFIG_HOME),
+  et écrit de façon atomique (fichier temporaire puis os.replace).
+- Un jeton n'est jamais valable au-delà de SESSION_MAX_AGE après l'authentification :
+  son expiration est plafonnée à l'émission et vérifiée au décodage.
+- La clé de signature est lue dans SESSION_SECRET ; à défaut, une clé aléatoire est générée
+  dans le répertoire de session avec des droits restreints (création exclusive : deux
+  processus lancés en même temps utilisent la même clé).
+
+Les jetons sont émis et vérifiés avec PyJWT (signature, en-tête, exp, nbf, iat). PyJWT est
+importé au premier jeton émis ou lu seulement : les commandes sans session ne paient pas son import.
+"""
+import os
+import re
+import secrets
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+APP_DIR_NAME = "epic_events"
+TOKEN_FILE = "session.jwt"
+SECRET_FILE = "session.key"
+ALGORITHM = "HS256"
+# Forme compacte canonique : trois segments base64url sans remplissage. PyJWT tolère le
+# remplissage "=" ; un jeton émis par issue_token n'en contient jamais.
+TOKEN_FORMAT = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+
+DEFAULT_TTL = 8 * 3600
+DEFAULT_REFRESH = 3600
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+# Attente maximale de la clé écrite par un autre processus (secondes).
+KEY_WAIT = 1.0
+
+
+def env_seconds(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def session_dir() -> Path:
+    """Répertoire de session propre à l'utilisateur du système."""
+    configured = os.getenv("CRM_SESSION_DIR")
+    if configured:
+        return Path(configured)
+    if sys.platform == "win32":
+        base = Path(os.getenv("APPDATA") or Path.home() / "AppData" / "Roaming")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    else:
+        base = Path(os.getenv("XDG_CONFIG_HOME") or Path.home() / ".config")
+    return base / APP_DIR_NAME
+
+
+def session_path() -> Path:
+    return session_dir() / TOKEN_FILE
+
+
+def atomic_write(path: Path, content: str):
+    """
+    Écrit `content` dans `path` de façon atomique, avec des droits limités à l'utilisateur :
+    une commande concurrente lit l'ancien fichier ou le nouveau, jamais un fichier tronqué.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def signing_key() -> str:
+    """Clé de signature : SESSION_SECRET, sinon une clé locale générée au premier usage."""
+    secret = os.getenv("SESSION_SECRET")
+    if secret:
+        return secret
+
+    path = session_dir() / SECRET_FILE
+    try:
+        return read_key(path)
+    except FileNotFoundError:
+        pass
+
+    secret = secrets.token_hex(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # O_EXCL : un seul processus crée la clé ; les autres relisent la sienne.
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return read_key(path)
+    with os.fdopen(fd, "w") as f:
+        f.write(secret)
+    return secret
+
+
+def read_key(path: Path) -> str:
+    """Lit la clé locale ; attend brièvement qu'un autre processus ait fini de l'écrire."""
+    deadline = time.monotonic() + KEY_WAIT
+    while True:
+        secret = path.read_text().strip()
+        if secret or time.monotonic() > deadline:
+            return secret
+        time.sleep(0.01)
+
+
+def max_expiry(auth_time: int) -> int:
+    """Date au-delà de laquelle aucun jeton de cette authentification n'est valable."""
+    return auth_time + env_seconds("SESSION_MAX_AGE", DEFAULT_MAX_AGE)
+
+
+def issue_token(user_id: int, username: str, email: str, role: str, auth_time: Optional[int] = None) -> str:
+    """
+    Crée un jeton signé pour l'utilisateur, valable SESSION_TTL secondes,
+    sans dépasser SESSION_MAX_AGE après l'authentification.
+    """
+    import jwt
+
+    now = int(time.time())
+    auth_time = auth_time or now
+    claims = {
+        "sub": str(user_id),
+        "username": username,
+        "email": email,
+        "role": role,
+        "iat": now,
+        "auth_time": auth_time,
+        "exp": min(now + env_seconds("SESSION_TTL", DEFAULT_TTL), max_expiry(auth_time)),
+    }
+    return jwt.encode(claims, signing_key(), algorithm=ALGORITHM)
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """
+    Vérifie le jeton avec PyJWT (signature HS256, typ, exp, nbf, iat) ; retourne ses données,
+    ou None s'il est invalide. Contrôle en plus SESSION_MAX_AGE depuis l'authentification
+    (auth_time, sinon iat).
+    """
+    if not isinstance(token, str) or not TOKEN_FORMAT.fullmatch(token):
+        return None
+
+    import jwt
+
+    try:
+        claims = jwt.decode(token, signing_key(), algorithms=[ALGORITHM], options={"require": ["sub", "exp"]})
+        if jwt.get_unverified_header(token).get("typ", "JWT") != "JWT":
+            return None
+    except jwt.InvalidTokenError:
+        return None
+
+    now = time.time()
+    auth_time = claims.get("auth_time", claims.get("iat"))
+    if auth_time is not None and (not isinstance(auth_time, (int, float)) or max_expiry(int(auth_time)) <= now):
+        return None
+    return claims
+
+
+def claims_to_user_info(claims: dict) -> dict:
+    """Convertit les données du jeton au format des informations de session de la CLI."""
+    return {
+        "user_id": int(claims["sub"]),
+        "username": claims.get("username"),
+        "email": claims.get("email"),
+        "role": claims.get("role"),
+        "expires_at": claims["exp"],
+    }
+
+
+def save_session(user_id: int, username: str, email: str, role: str, auth_time: Optional[int] = None):
+    """Enregistre un nouveau jeton de session."""
+    atomic_write(session_path(), issue_token(user_id, username, email, role, auth_time))
+
+
+def load_session(refresh: bool = True) -> Optional[dict]:
+    """
+    Lit et vérifie le jeton de session, sans accès à la base de données.
+    Retourne les informations de l'utilisateur, ou None si le jeton est absent, invalide ou expiré.
+    Si le jeton expire bientôt, il est renouvelé (fenêtre SESSION_REFRESH, limite SESSION_MAX_AGE).
+    """
+    try:
+        token = session_path().read_text().strip()
+    except FileNotFoundError:
+        return None
+
+    claims = decode_token(token)
+    if claims is None:
+        return None
+
+    user_info = claims_to_user_info(claims)
+    now = int(time.time())
+    auth_time = int(claims.get("auth_time", claims.get("iat", now)))
+    if (refresh
+            and claims["exp"] - now < env_seconds("SESSION_REFRESH", DEFAULT_REFRESH)
+            and claims["exp"] < max_expiry(auth_time)):
+        try:
+            save_session(user_info["user_id"], user_info["username"], user_info["email"], user_info["role"], auth_time)
+        except OSError:
+            # Le jeton courant reste valide : le renouvellement sera retenté à la prochaine commande.
+            pass
+    return user_info
+
+
+def clear_session() -> bool:
+    """Supprime le jeton de session ; retourne False s'il n'y en avait pas."""
+    try:
+        session_path().unlink()
+        return True
+    except FileNotFoundError:
+        return False
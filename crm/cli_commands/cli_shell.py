@@ -0,0 +1,207 @@
+"""
+Shell interactif de la CLI (crm shell).
+
+Les commandes s'exécutent dans un seul processus : les modules, la connexion à la base
+(pool ouvert au premier usage puis réutilisé) et la session vérifiée restent en mémoire
+d'une commande à l'autre. La session n'est relue qu'après `auth authenticate` / `auth logout`,
+ou lorsque le jeton approche de son expiration (il est alors renouvelé).
+
+Historique (fichier shell_history du répertoire de session) et complétion des commandes
+et des options par la touche Tab, si le module readline est disponible.
+"""
+import shlex
+import time
+from typing import List, Optional
+
+import click
+import typer
+from crm.cli_commands.cli_permissions import Session, get_session, reset_session
+from crm.cli_commands.cli_session import DEFAULT_REFRESH, env_seconds, session_dir
+
+try:
+    import readline
+except ImportError:  # Windows sans pyreadline
+    readline = None
+
+
+app = typer.Typer()
+
+HISTORY_FILE = "shell_history"
+HISTORY_LENGTH = 1000
+EXIT_WORDS = ("exit", "quit")
+BUILTINS = {
+    "help": "Affiche les commandes disponibles.",
+    "whoami": "Affiche l'utilisateur connecté.",
+    "users": "Liste les utilisateurs (annuaire en mémoire) : users [ROLE].",
+    "exit": "Quitte le shell (ou Ctrl-D).",
+}
+# Sous-commandes qui n'ont pas de sens à l'intérieur du shell.
+EXCLUDED = ("shell",)
+
+
+class Shell:
+    """Boucle de lecture et d'exécution des commandes sur le groupe racine de la CLI."""
+
+    def __init__(self, group: click.Group, timing: bool = False):
+        self.group = group
+        self.timing = timing
+        self._matches: List[str] = []
+
+    def session(self) -> Session:
+        """Session en mémoire, relue (et renouvelée) uniquement lorsqu'elle approche de son expiration."""
+        session = get_session()
+        if session.data and session.expires_in < env_seconds("SESSION_REFRESH", DEFAULT_REFRESH):
+            reset_session()
+            session = get_session()
+        return session
+
+    def prompt(self) -> str:
+        session = self.session()
+        if session.is_authenticated:
+            return f"crm ({session.data.get('username')})> "
+        return "crm> "
+
+    def run_line(self, line: str) -> bool:
+        """Exécute une ligne de commande ; retourne False pour quitter le shell."""
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            typer.echo(f"Commande invalide : {e}")
+            return True
+        if not args:
+            return True
+
+        name = args[0]
+        if name in EXIT_WORDS:
+            return False
+        if name == "help":
+            args = ["--help"] if len(args) == 1 else args[1:] + ["--help"]
+        elif name in BUILTINS:
+            self.run_builtin(name, args[1:])
+            return True
+        elif name in EXCLUDED:
+            typer.echo("Vous êtes déjà dans le shell crm.")
+            return True
+
+        start = time.perf_counter()
+        try:
+            self.group.main(args=args, prog_name="crm", standalone_mode=False, obj=self.session())
+        except click.ClickException as e:
+            e.show()
+        except click.Abort:
+            typer.echo("Commande annulée.")
+        except Exception as e:
+            typer.echo(f"Erreur inattendue : {e}")
+
+        if self.timing:
+            typer.echo(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return True
+
+    def run_builtin(self, name: str, args: List[str]):
+        if name == "whoami":
+            session = self.session()
+            if session.is_authenticated:
+                typer.echo(f"{session.data.get('username')} (id {session.user_id}, {session.role})")
+            else:
+                typer.echo("Aucun utilisateur n'est actuellement connecté.")
+        elif name == "users":
+            from crm.models.user_cache import user_directory
+            role = args[0].upper() if args else None
+            for user in user_directory().values():
+                if role is None or user.role == role:
+                    typer.echo(f"{user.id:>6}  {user.username:<24}{user.role}")
+
+    def candidates(self, words: List[str]) -> List[str]:
+        """Complétions possibles après les mots déjà saisis : sous-commandes, puis options."""
+        ctx = click.Context(self.group)
+        command = self.group
+        for word in words:
+            if not isinstance(command, click.Group):
+                break
+            command = command.get_command(ctx, word)
+            if command is None:
+                return []
+
+        if isinstance(command, click.Group):
+            names = [name for name in command.list_commands(ctx) if name not in EXCLUDED]
+            return names + list(BUILTINS) if command is self.group else names
+        options = [opt for param in command.params for opt in param.opts if opt.startswith("-")]
+        return options + ["--help"]
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        """Fonction de complétion pour readline."""
+        if state == 0:
+            buffer = readline.get_line_buffer()[:readline.get_begidx()]
+            try:
+                words = shlex.split(buffer)
+            except ValueError:
+                words = []
+            words = [word for word in words if not word.startswith("-")]
+            try:
+                self._matches = [c for c in self.candidates(words) if c.startswith(text)]
+            except Exception:
+                self._matches = []
+        return self._matches[state] if state < len(self._matches) else None
+
+    def loop(self):
+        while True:
+            try:
+                line = input(self.prompt())
+            except EOFError:
+                typer.echo()
+                return
+            except KeyboardInterrupt:
+                typer.echo()
+                continue
+            if not self.run_line(line):
+                return
+
+
+def setup_readline(shell: Shell):
+    """Active l'historique persistant et la complétion par Tab."""
+    history = session_dir() / HISTORY_FILE
+    try:
+        readline.read_history_file(history)
+    except OSError:
+        pass
+    readline.set_history_length(HISTORY_LENGTH)
+    readline.set_completer(shell.complete)
+    readline.set_completer_delims(" \t")
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    return history
+
+
+def warm_up():
+    """Ouvre la connexion à la base dès le démarrage du shell, si elle est configurée."""
+    try:
+        from crm.models.models import db
+        db.connect(reuse_if_open=True)
+    except Exception as e:
+        typer.echo(f"Base de données indisponible pour le moment : {e}", err=True)
+
+
+@app.command()
+def shell(timing: bool = typer.Option(False, help="Affiche la durée de chaque commande.")):
+    """
+    Ouvre un shell interactif : les commandes (commercial, support, administration,
+    user, auth...) s'y tapent sans le préfixe crm, avec historique et complétion.
+    """
+    from crm.__main__ import app as main_app
+
+    shell = Shell(typer.main.get_command(main_app), timing=timing)
+    warm_up()
+
+    history = setup_readline(shell) if readline is not None else None
+    typer.echo("Shell CRM Epic Events. Tapez help pour l'aide, exit ou Ctrl-D pour quitter.")
+    try:
+        shell.loop()
+    finally:
+        if history is not None:
+            try:
+                history.parent.mkdir(parents=True, exist_ok=True)
+                readline.write_history_file(history)
+            except OSError:
+                pass
@@ -1,84 +1,101 @@
-from crm.cli_commands.cli_permissions import load_user_info
+from crm.cli_commands.cli_permissions import get_session, requires_role
 from crm.cli_commands.cli_input_validators import get_event_start, get_event_end
 from peewee import DoesNotExist
 import typer
 from datetime import datetime
-from crm.models.models import db, Event
+from crm.models.models import Event
+from crm.models.authorized import fetch_event_for_support
+from crm.models.claims import (
+    ALREADY_YOURS, ASSIGNED, CONFLICT, NOT_FOUND, UPDATED, assign_event, claim_next_event, conflicts_of_event,
+    reschedule_event
+)
+from crm.models.conflicts import conflicting_events, find_conflicts
 
 
 app = typer.Typer()
 
 
 @app.command()
+@requires_role('SUPPORT', message="Accès refusé. Seuls les membres du support peuvent assigner du support aux événements.")
 def assign_support_to_event():
     """
     Assigner un membre du support à un événement.
     Seuls les membres du support peuvent exécuter cette commande.
     """
-    user_info = load_user_info()
-    support_id = user_info.get('user_id', None)
-
-    if support_id is None:
-        typer.echo("Impossible de récupérer l'ID du membre du support.")
-        return
-
-    if user_info.get('role').upper() != 'SUPPORT':
-        typer.echo("Accès refusé. Seuls les membres du support peuvent assigner du support aux événements.")
-        return
+    support_id = get_session().user_id
 
     event_id = typer.prompt("ID de l'événement à assigner au support")
 
     try:
-        event = Event.get_by_id(int(event_id))
-
-        # Vérifie si l'événement est déjà assigné à un membre du support
-        if event.support_contact:
-            if event.support_contact.id == support_id:
-                typer.echo(f"Cet événement est déjà assigné à vous-même.")
-            else:
-                typer.echo("Cet événement est déjà assigné à un autre membre du support.")
-        else:
-            event.support_contact = support_id
-            event.save()
+        # Mise à jour conditionnelle (événement non assigné) : deux membres du support
+        # qui assignent le même événement en même temps ne s'écrasent pas.
+        outcome = assign_event(int(event_id), support_id)
+
+        if outcome == ASSIGNED:
             typer.echo(f"Membre du support avec l'id{support_id} assigné à l'événement id{event_id} avec succès.")
+        elif outcome == ALREADY_YOURS:
+            typer.echo(f"Cet événement est déjà assigné à vous-même.")
+        elif outcome == NOT_FOUND:
+            typer.echo("Événement non trouvé.")
+        elif outcome == CONFLICT:
+            typer.echo(conflict_message(conflicts_of_event(int(event_id), support_id)))
+        else:
+            typer.echo("Cet événement est déjà assigné à un autre membre du support.")
 
     except ValueError:
         typer.echo("L'ID de l'événement doit être un nombre entier.")
         
-    except DoesNotExist:
-        typer.echo("Événement non trouvé.")
-        
     except Exception as e:
         typer.echo(f"Erreur lors de l'assignation du support à l'événement : {e}")
 
 
 
 @app.command()
+@requires_role('SUPPORT', message="Accès refusé. Seuls les membres du support peuvent assigner du support aux événements.")
+def claim_next(count: int = typer.Option(1, "--count", "-n", min=1, help="Nombre d'événements à prendre.")):
+    """
+    Prend le prochain événement non assigné (ordre des dates de début) ;
+    deux membres du support qui le demandent en même temps reçoivent deux événements différents.
+    """
+    support_id = get_session().user_id
+
+    for _ in range(count):
+        claim = claim_next_event(support_id)
+        if claim is None:
+            typer.echo("Aucun événement non assigné.")
+            return
+        typer.echo(f"Événement {claim.event_id} (contrat {claim.contrat_id}, du {claim.start_date:%Y-%m-%d} "
+                   f"au {claim.end_date:%Y-%m-%d}, {claim.attendees} participants) assigné à vous-même.")
+
+
+
+def conflict_message(conflicts) -> str:
+    return f"Conflit de planning : l'événement chevauche vos événements {', '.join(map(str, conflicts))}."
+
+
+@app.command()
+@requires_role('SUPPORT', message="Accès refusé. Seuls les membres du support peuvent mettre à jour des événements.")
 def update_event():
     """
     Met à jour un événement existant dans la base de données.
     Seuls les membres de l'équipe de support peuvent exécuter cette commande.
     """
-    user_info = load_user_info()
-    support_id = user_info.get('user_id', None)
-
-    if support_id is None:
-        typer.echo("Impossible de récupérer l'ID du membre du support.")
-        return
-
-    if user_info.get('role').upper() != 'SUPPORT':
-        typer.echo("Accès refusé. Seuls les membres du support peuvent mettre à jour des événements.")
-        return
+    support_id = get_session().user_id
 
     event_id_str = typer.prompt("ID de l'événement")
     try:
         event_id = int(event_id_str)
-        event = Event.get_by_id(event_id)
-        
-        # Récupération du contrat associé à l'événement
+        # Événement, contrat associé et contrôle d'assignation en une seule requête
+        event, allowed = fetch_event_for_support(event_id, support_id)
+
+        if event is None:
+            typer.echo("Événement non trouvé.")
+            return
+
+        # Récupération du contrat associé à l'événement (chargé par jointure)
         contrat = event.contrat  
 
-        if event.support_contact_id != support_id:
+        if not allowed:
             typer.echo("Accès refusé. Vous ne pouvez mettre à jour que les événements que vous avez assignés.")
             return
         
@@ -86,10 +103,6 @@ def update_event():
         typer.echo("L'ID de l'événement doit être un nombre entier.")
         return
     
-    except DoesNotExist:
-        typer.echo("Événement non trouvé.")
-        return
-    
     except Exception as e:
         typer.echo(f"Erreur : {e}")
         return
@@ -107,37 +120,35 @@ def update_event():
         typer.echo("Le nombre de participants doit être un nombre entier positif.")
         return
 
-    # Mise à jour de l'événement dans la base de données
+    start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+    end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
+
+    # Mise à jour conditionnelle : refusée si les nouvelles dates chevauchent un autre événement du membre
     try:
-        with db.atomic():
-            event.start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            event.end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            event.attendees = int(attendees_str)
-            event.notes = notes_str
-            event.save()
+        outcome = reschedule_event(event_id, support_id, start_date, end_date,
+                                   attendees=int(attendees_str), notes=notes_str)
+        if outcome == UPDATED:
             typer.echo(f"Événement ID {event_id} mis à jour avec succès.")
-            
+        elif outcome == CONFLICT:
+            typer.echo(conflict_message(conflicting_events(support_id, start_date, end_date, exclude=event_id)))
+        elif outcome == NOT_FOUND:
+            typer.echo("Événement non trouvé.")
+        else:
+            typer.echo("Accès refusé. Vous ne pouvez mettre à jour que les événements que vous avez assignés.")
+
     except Exception as e:
         typer.echo(f"Erreur lors de la mise à jour de l'événement : {e}")
 
 
 
 @app.command()
+@requires_role('SUPPORT', message="Accès refusé. Seuls les membres du support peuvent supprimer des événements.")
 def delete_event():
     """
     Supprime un événement de la base de données.
     Seuls les membres de l'équipe de support peuvent exécuter cette commande.
     """
-    user_info = load_user_info()
-    support_id = user_info.get('user_id', None)
-
-    if support_id is None:
-        typer.echo("Impossible de récupérer l'ID du membre du support.")
-        return
-
-    if user_info.get('role').upper() != 'SUPPORT':
-        typer.echo("Accès refusé. Seuls les membres du support peuvent supprimer des événements.")
-        return
+    support_id = get_session().user_id
 
     event_id_str = typer.prompt("ID de l'événement à supprimer")
     
@@ -159,4 +170,28 @@ def delete_event():
         typer.echo("Événement non trouvé.")
         
     except Exception as e:
-        typer.echo(f"Erreur lors de la suppression de l'événement : {e}")
\ No newline at end of file
+        typer.echo(f"Erreur lors de la suppression de l'événement : {e}")
+
+
+
+@app.command()
+@requires_role('SUPPORT', message="Accès refusé. Seuls les membres du support peuvent consulter les conflits de planning.")
+def conflicts(
+    all_members: bool = typer.Option(False, "--all", help="Conflits de tous les membres du support."),
+    limit: int = typer.Option(50, min=0, help="Nombre maximal de conflits affichés (tous sont comptés)."),
+):
+    """
+    Liste les paires d'événements d'un même membre du support dont les dates se chevauchent
+    (les vôtres par défaut).
+    """
+    support_id = None if all_members else get_session().user_id
+
+    count = 0
+    for conflict in find_conflicts(support_id):
+        count += 1
+        if count <= limit:
+            typer.echo(f"Support id{conflict.support_id} : événements {conflict.first_id} et {conflict.second_id}, "
+                       f"du {conflict.start:%Y-%m-%d} au {conflict.end:%Y-%m-%d}.")
+    if count > limit:
+        typer.echo("...")
+    typer.echo(f"{count} conflit(s) de planning.")
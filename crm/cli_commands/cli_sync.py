@@ -0,0 +1,29 @@
+"""
+Synchronisation de l'instantané local (crm sync).
+
+Rapatrie dans un fichier SQLite du répertoire de session les lignes modifiées ou supprimées
+depuis la dernière synchronisation (voir crm.models.snapshot). Tant qu'il est à jour,
+`crm list` et `crm export` le lisent au lieu d'interroger la base centrale.
+"""
+import typer
+from crm.cli_commands.cli_permissions import get_session, requires_role
+from crm.models.snapshot import PAGE_SIZE, snapshot_path, sync as sync_snapshot
+
+
+app = typer.Typer()
+
+
+@app.command()
+@requires_role(exit_code=1)
+def sync(
+    full: bool = typer.Option(False, "--full", help="Recrée l'instantané au lieu de le compléter."),
+    page_size: int = typer.Option(PAGE_SIZE, min=1, help="Nombre de lignes lues par requête."),
+):
+    """
+    Met à jour l'instantané local avec les modifications de la base centrale.
+    """
+    result = sync_snapshot(get_session().user_id, full=full, page_size=page_size)
+
+    details = ", ".join(f"{count} {table}" for table, count in result.pulled.items())
+    typer.echo(f"Instantané synchronisé en {result.seconds:.2f}s : {details} ; {result.deleted} suppression(s).")
+    typer.echo(f"Fichier : {snapshot_path()}", err=True)
@@ -1,7 +1,18 @@
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import peewee
 import typer
-import bcrypt
-from crm.models.models import User, db
-from crm.cli_commands.cli_input_validators import get_username, get_email, get_password, get_role  
+from crm.cli_commands.cli_bulk import RejectWriter, chunked, clean, default_rejects_path, existing_values, iter_records
+from crm.cli_commands.cli_email import warm_domains
+from crm.cli_commands.cli_passwords import hash_password
+from crm.models.models import USER_ROLES, User, db, local_write
+from crm.models.user_cache import cached_user, invalidate_user_directory
+from crm.cli_commands.cli_input_validators import (get_username, get_email, get_password, get_role,
+                                                   is_valid_email, is_strong_password)
 
 app = typer.Typer()
 
@@ -15,13 +26,13 @@ def add_user():
 
     # Obtenir un nom d'utilisateur valide et unique
     username = get_username()
-    while User.get_or_none(User.username == username):
+    while cached_user(username=username):
         typer.echo("Ce nom d'utilisateur est déjà pris. Veuillez en choisir un autre.")
         username = get_username()
 
     # Obtenir un email valide et unique
     email = get_email()
-    while User.get_or_none(User.email == email):
+    while cached_user(email=email):
         typer.echo("Cet email est déjà utilisé par un autre utilisateur. Veuillez en utiliser un différent.")
         email = get_email()
 
@@ -31,8 +42,8 @@ def add_user():
     # Obtenir un rôle valide
     role = get_role()
 
-    # Hasher le mot de passe
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    # Hasher le mot de passe (argon2id, coût réglable via ARGON2_*)
+    hashed_password = hash_password(password)
 
     # Ajouter l'utilisateur à la base de données
     try:
@@ -41,9 +52,145 @@ def add_user():
                 username=username,
                 email=email,
                 role=role,
-                password=hashed_password.decode('utf-8')
+                password=hashed_password
             )
         typer.echo(f"Utilisateur {username} ajouté avec succès avec le rôle {role}.")
         
     except Exception as e:
         typer.echo(f"Une erreur s'est produite lors de l'ajout de l'utilisateur : {e}")
+
+
+def validate_user_record(record: dict) -> tuple:
+    """
+    Valide un utilisateur lu dans un fichier d'import avec les mêmes règles que add_user.
+    Retourne les données nettoyées et la liste des erreurs.
+    """
+    if "_error" in record:
+        return None, [record["_error"]]
+
+    data = {
+        "username": clean(record.get("username")),
+        "email": clean(record.get("email")),
+        "password": record.get("password") or "",
+        "role": (clean(record.get("role")) or "").upper(),
+    }
+    errors = []
+
+    if not data["username"]:
+        errors.append("Le nom d'utilisateur ne peut pas être vide.")
+    if not data["email"] or not is_valid_email(data["email"]):
+        errors.append("L'e-mail n'est pas valide.")
+    if not is_strong_password(data["password"]):
+        errors.append("Le mot de passe doit avoir au moins 8 caractères.")
+    if data["role"] not in USER_ROLES:
+        errors.append("Le rôle spécifié n'est pas valide.")
+
+    return data, errors
+
+
+def masked(record: dict) -> dict:
+    """Copie de l'enregistrement sans le mot de passe en clair, pour le fichier des rejets."""
+    return {**record, "password": "***"} if record.get("password") else record
+
+
+def hash_passwords(passwords: List[str], executor: Optional[Executor] = None) -> List[str]:
+    """
+    Hache une liste de mots de passe, en parallèle sur les processus de `executor` s'il est fourni.
+    Le hachage est volontairement coûteux en CPU : des processus (et non des threads) utilisent tous les cœurs.
+    """
+    if executor is None:
+        return [hash_password(password) for password in passwords]
+    # Un hachage coûte des dizaines de millisecondes : l'envoi mot de passe par mot de passe est négligeable.
+    return list(executor.map(hash_password, passwords))
+
+
+def import_users_from_file(path: Path, rejects: RejectWriter, batch_size: int = 500,
+                           executor: Optional[Executor] = None) -> int:
+    """
+    Importe les utilisateurs d'un fichier CSV/JSONL en flux, par lots de `batch_size` lignes.
+    Les noms d'utilisateur et emails déjà utilisés (en base ou plus haut dans le fichier) sont rejetés.
+    Les mots de passe d'un lot sont hachés en parallèle, puis le lot est inséré par un seul
+    `insert_many` dans une transaction.
+    Retourne le nombre d'utilisateurs importés.
+    """
+    imported = 0
+    seen_usernames, seen_emails = set(), set()
+
+    for batch in chunked(iter_records(path), batch_size):
+        warm_domains(record.get("email") for _, record in batch)
+        candidates = []
+        for line_number, record in batch:
+            data, errors = validate_user_record(record)
+            if errors:
+                rejects.write(line_number, masked(record), errors)
+            else:
+                candidates.append((line_number, record, data))
+
+        # Dédoublonnage contre la base : une requête IN par champ et par lot.
+        taken_usernames = existing_values(User.username, (data["username"] for _, _, data in candidates))
+        taken_emails = existing_values(User.email, (data["email"] for _, _, data in candidates))
+
+        rows = []
+        for line_number, record, data in candidates:
+            errors = []
+            if data["username"] in taken_usernames or data["username"] in seen_usernames:
+                errors.append("Ce nom d'utilisateur est déjà pris.")
+            if data["email"] in taken_emails or data["email"] in seen_emails:
+                errors.append("Cet email est déjà utilisé par un autre utilisateur.")
+            if errors:
+                rejects.write(line_number, masked(record), errors)
+                continue
+
+            seen_usernames.add(data["username"])
+            seen_emails.add(data["email"])
+            rows.append(data)
+
+        if rows:
+            hashes = hash_passwords([row["password"] for row in rows], executor)
+            for row, hashed in zip(rows, hashes):
+                row["password"] = hashed
+            with db.atomic():
+                User.insert_many(rows).execute()
+            imported += len(rows)
+
+    if imported:
+        invalidate_user_directory()
+        local_write()
+    return imported
+
+
+@app.command("import")
+def import_users(
+    file: Path = typer.Argument(..., exists=True, dir_okay=False, readable=True, help="Fichier CSV ou JSONL des utilisateurs."),
+    workers: int = typer.Option(os.cpu_count() or 1, min=1, help="Nombre de processus de hachage des mots de passe."),
+    batch_size: int = typer.Option(500, min=1, help="Nombre d'utilisateurs insérés par transaction."),
+    rejects: Path = typer.Option(None, help="Fichier JSONL des lignes rejetées (par défaut <FILE>.rejects.jsonl)."),
+):
+    """
+    Importe des utilisateurs en masse depuis un fichier CSV ou JSONL
+    (colonnes : username, email, password, role).
+    Les mots de passe sont hachés en parallèle sur plusieurs processus.
+    Les lignes invalides sont écrites dans un fichier de rejets.
+    """
+    rejects_path = rejects or default_rejects_path(file)
+    start = time.perf_counter()
+
+    try:
+        with RejectWriter(rejects_path) as reject_writer:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    imported = import_users_from_file(file, reject_writer, batch_size, executor)
+            else:
+                imported = import_users_from_file(file, reject_writer, batch_size)
+
+    except peewee.PeeweeException as e:
+        typer.echo(f"Erreur de base de données : {e}")
+        return
+
+    elapsed = time.perf_counter() - start
+    rate = imported / elapsed if elapsed else float(imported)
+
+    typer.echo(f"{imported} utilisateur(s) importé(s), {reject_writer.count} ligne(s) rejetée(s) "
+               f"en {elapsed:.2f}s ({rate:.1f} utilisateurs/s, {workers} processus).")
+    if reject_writer.count:
+        typer.echo(f"Lignes rejetées : {rejects_path}")
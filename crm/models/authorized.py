@@ -0,0 +1,66 @@
+"""
+Lectures avec contrôle de propriété en une seule requête.
+
+Chaque fonction retourne l'enregistrement demandé et indique si l'utilisateur en est
+propriétaire, à partir d'une seule requête SQL : le prédicat de propriété est calculé
+par la base sur les colonnes `*_id`, sans charger l'utilisateur lié.
+Les données liées nécessaires à la commande (ex. le contrat d'un événement) sont
+récupérées par jointure dans la même requête.
+"""
+from typing import NamedTuple, Optional
+
+from peewee import Model
+
+from crm.models.models import Client, Contrat, Event
+
+
+class Authorized(NamedTuple):
+    """
+    Résultat d'une lecture contrôlée :
+    - instance : l'enregistrement, ou None s'il n'existe pas ;
+    - allowed : True si l'utilisateur est autorisé à le modifier.
+    """
+    instance: Optional[Model]
+    allowed: bool
+
+    @property
+    def found(self) -> bool:
+        return self.instance is not None
+
+
+def fetch_authorized(query, model, row_id: int, ownership) -> Authorized:
+    """
+    Récupère la ligne `row_id` de `query` et évalue l'expression `ownership` dans la même requête.
+    """
+    instance = query.select_extend(ownership.alias("is_owner")).where(model.id == row_id).first()
+    if instance is None:
+        return Authorized(None, False)
+    return Authorized(instance, bool(instance.is_owner))
+
+
+def fetch_client_for_commercial(client_id: int, commercial_id: int) -> Authorized:
+    """Client, modifiable uniquement par son commercial."""
+    return fetch_authorized(Client.select(), Client, client_id, Client.commercial_contact == commercial_id)
+
+
+def fetch_contrat_for_author(contrat_id: int, author_id: int) -> Authorized:
+    """Contrat, modifiable uniquement par le membre de l'administration qui l'a créé."""
+    return fetch_authorized(Contrat.select(), Contrat, contrat_id, Contrat.contrat_author == author_id)
+
+
+def fetch_contrat_for_commercial(contrat_id: int, commercial_id: int) -> Authorized:
+    """
+    Contrat avec son client (contrat.client est chargé par jointure),
+    utilisable uniquement par le commercial du client.
+    """
+    query = Contrat.select(Contrat, Client).join(Client)
+    return fetch_authorized(query, Contrat, contrat_id, Client.commercial_contact == commercial_id)
+
+
+def fetch_event_for_support(event_id: int, support_id: int) -> Authorized:
+    """
+    Événement avec son contrat (event.contrat est chargé par jointure),
+    modifiable uniquement par le membre du support qui lui est assigné.
+    """
+    query = Event.select(Event, Contrat).join(Contrat)
+    return fetch_authorized(query, Event, event_id, Event.support_contact == support_id)
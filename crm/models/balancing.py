@@ -0,0 +1,153 @@
+"""
+Répartition automatique des événements non assignés entre les membres du support
+(commande `administration balance-support`).
+
+- Chargement ensembliste : les membres du support, les événements non assignés et les
+  événements déjà assignés qui chevauchent leur période, en trois requêtes.
+- Planification gloutonne : les événements sont placés du plus grand au plus petit nombre de
+  participants ; chacun va au membre le moins chargé (participants et nombre d'événements,
+  rapportés à la moyenne visée) parmi ceux qui sont libres sur ses dates. Les périodes occupées
+  d'un membre sont gardées fusionnées et triées : le test de chevauchement est une recherche
+  dichotomique. Les dates sont inclusives : deux événements le même jour se chevauchent.
+- Application : par membre du support, des UPDATE `id IN (...)` par lots de APPLY_BATCH_SIZE
+  identifiants (sous la limite de paramètres de SQLite), limités aux événements encore non
+  assignés et libres pour ce membre (`free_for`), le tout dans une seule transaction.
+"""
+import bisect
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Tuple
+
+from crm.models.claims import is_unassigned
+from crm.models.conflicts import free_for
+from crm.models.models import Event, User, local_write
+from crm.models.queries import unassigned_events
+
+# Identifiants par UPDATE : chacun est un paramètre lié, et les anciennes versions de SQLite
+# en acceptent au plus 999 par requête.
+APPLY_BATCH_SIZE = 500
+
+
+class Workload(NamedTuple):
+    events: int
+    attendees: int
+
+
+class Busy:
+    """Périodes occupées d'un membre du support : intervalles fermés, disjoints et triés."""
+
+    def __init__(self, periods=()):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        for start, end in sorted(periods):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        # Dernier intervalle qui commence au plus tard à `end` : les fins étant croissantes,
+        # c'est le seul qui peut atteindre `start`.
+        index = bisect.bisect_right(self.starts, end)
+        return index == 0 or self.ends[index - 1] < start
+
+    def add(self, start: datetime, end: datetime):
+        """Ajoute une période libre (voir `is_free`)."""
+        index = bisect.bisect_right(self.starts, end)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+
+
+class BalancePlan(NamedTuple):
+    assignments: Dict[int, List[int]]
+    before: Dict[int, Workload]
+    after: Dict[int, Workload]
+    unplaced: List[int]
+    seconds: float
+
+    @property
+    def planned(self) -> int:
+        return sum(len(ids) for ids in self.assignments.values())
+
+
+def load_workload() -> Tuple[Dict[int, str], List[tuple], List[tuple]]:
+    """
+    Membres du support {id: nom}, événements non assignés (id, début, fin, participants)
+    et événements assignés (support, début, fin, participants) qui comptent pour l'équilibrage :
+    ceux qui ne sont pas encore terminés à la date du premier événement à placer.
+    """
+    supports = dict(User.select(User.id, User.username).where(User.role == "SUPPORT").order_by(User.id).tuples())
+    pending = list(unassigned_events()
+                   .select(Event.id, Event.start_date, Event.end_date, Event.attendees)
+                   .order_by(Event.start_date, Event.id)
+                   .tuples())
+    if not supports or not pending:
+        return supports, pending, []
+    assigned = list(Event
+                    .select(Event.support_contact, Event.start_date, Event.end_date, Event.attendees)
+                    .where(Event.support_contact.in_(list(supports)) & (Event.end_date >= pending[0][1]))
+                    .tuples())
+    return supports, pending, assigned
+
+
+def plan_balance(supports, pending, assigned) -> BalancePlan:
+    """Affecte les événements `pending` aux membres `supports` (voir la docstring du module)."""
+    start = time.perf_counter()
+    events = {support_id: 0 for support_id in supports}
+    attendees = dict(events)
+    periods: Dict[int, list] = {support_id: [] for support_id in supports}
+    for support_id, start_date, end_date, count in assigned:
+        events[support_id] += 1
+        attendees[support_id] += count
+        periods[support_id].append((start_date, end_date))
+    before = {support_id: Workload(events[support_id], attendees[support_id]) for support_id in supports}
+    busy = {support_id: Busy(periods[support_id]) for support_id in supports}
+
+    # Charge moyenne visée par membre : sert à rendre comparables participants et nombre d'événements.
+    members = len(supports) or 1
+    event_target = max((sum(events.values()) + len(pending)) / members, 1)
+    attendee_target = max((sum(attendees.values()) + sum(row[3] for row in pending)) / members, 1)
+
+    assignments: Dict[int, List[int]] = {support_id: [] for support_id in supports}
+    unplaced = []
+    for event_id, start_date, end_date, count in sorted(pending, key=lambda row: (-row[3], row[1], row[0])):
+        best, best_score = None, None
+        for support_id in supports:
+            if not busy[support_id].is_free(start_date, end_date):
+                continue
+            score = (attendees[support_id] + count) / attendee_target + (events[support_id] + 1) / event_target
+            if best is None or score < best_score:
+                best, best_score = support_id, score
+        if best is None:
+            unplaced.append(event_id)
+            continue
+        busy[best].add(start_date, end_date)
+        assignments[best].append(event_id)
+        events[best] += 1
+        attendees[best] += count
+
+    after = {support_id: Workload(events[support_id], attendees[support_id]) for support_id in supports}
+    return BalancePlan(assignments, before, after, sorted(unplaced), time.perf_counter() - start)
+
+
+def apply_plan(plan: BalancePlan) -> int:
+    """
+    Applique le plan : un UPDATE par lot d'événements de chaque membre du support, dans une seule
+    transaction. Un événement pris entre-temps (ex. `support claim-next`) n'est pas réattribué, ni
+    un événement qui chevauche désormais un événement du membre (assigné après le calcul du plan).
+    Retourne le nombre d'événements assignés.
+    """
+    now = datetime.now()
+    changed = 0
+    with Event._meta.database.atomic():
+        for support_id, event_ids in plan.assignments.items():
+            for index in range(0, len(event_ids), APPLY_BATCH_SIZE):
+                batch = event_ids[index:index + APPLY_BATCH_SIZE]
+                changed += (Event
+                            .update(support_contact=support_id, updated_at=now)
+                            .where(Event.id.in_(batch) & is_unassigned() & free_for(support_id))
+                            .execute())
+    if changed:
+        local_write()
+    return changed
@@ -0,0 +1,150 @@
+"""
+Attribution des événements aux membres du support, sans course entre deux membres.
+
+- `claim_next_event` donne au membre du support le prochain événement non assigné (ordre des
+  dates de début). Sur PostgreSQL, une seule requête :
+      UPDATE event SET support_contact_id = ... WHERE id = (SELECT id ... WHERE support_contact_id IS NULL
+      ORDER BY start_date, id LIMIT 1 FOR UPDATE SKIP LOCKED) RETURNING ...
+  Deux membres qui réclament en même temps obtiennent deux événements différents : la ligne
+  verrouillée par l'un est sautée par l'autre, sans attente.
+  Sur SQLite (pas de FOR UPDATE), l'événement candidat est lu puis attribué par une mise à jour
+  conditionnelle (support_contact_id IS NULL) ; si un autre processus l'a pris entre-temps,
+  le candidat suivant est essayé.
+- `assign_event` attribue un événement donné par la même mise à jour conditionnelle.
+- `reschedule_event` change les dates d'un événement du membre par la même méthode.
+
+Un événement qui chevauche un événement déjà assigné au membre ne lui est pas attribué, et
+les dates d'un événement ne sont pas changées pour en chevaucher un autre
+(crm.models.conflicts.free_for / free_between, dans la même requête ; sur PostgreSQL, la ligne
+du membre est de plus verrouillée, voir crm.models.conflicts.schedule_lock).
+"""
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+
+from peewee import OP, SQL, Expression
+
+from crm.models.conflicts import conflicting_events, free_between, free_for, schedule_lock
+from crm.models.database import unwrap_database
+from crm.models.models import Event, local_write
+from crm.models.queries import unassigned_events
+
+CLAIM_RETRIES = 20
+
+# Résultats de assign_event et reschedule_event
+ASSIGNED, ALREADY_YOURS, TAKEN, NOT_FOUND, CONFLICT = "assigned", "already_yours", "taken", "not_found", "conflict"
+UPDATED = "updated"
+
+
+class Claim(NamedTuple):
+    event_id: int
+    contrat_id: int
+    start_date: datetime
+    end_date: datetime
+    attendees: int
+
+
+CLAIM_FIELDS = (Event.id, Event.contrat, Event.start_date, Event.end_date, Event.attendees)
+
+
+def next_unassigned(support_id: int, fields=(Event.id,)):
+    """Prochain événement non assigné libre pour le membre du support, dans l'ordre des dates de début."""
+    return (unassigned_events()
+            .select(*fields)
+            .where(free_for(support_id))
+            .order_by(Event.start_date, Event.id)
+            .limit(1))
+
+
+def is_unassigned():
+    return Expression(Event.support_contact, OP.IS, SQL("NULL"))
+
+
+def claim_next_event(support_id: int) -> Optional[Claim]:
+    """Attribue au membre du support le prochain événement non assigné ; None s'il n'y en a plus."""
+    database = unwrap_database(Event._meta.database)
+    if database.for_update and database.returning_clause:
+        claimed = claim_with_skip_locked(support_id)
+    else:
+        claimed = claim_with_conditional_update(support_id)
+    if claimed is not None:
+        local_write()
+    return claimed
+
+
+def claim_with_skip_locked(support_id: int) -> Optional[Claim]:
+    candidate = next_unassigned(support_id).for_update("FOR UPDATE SKIP LOCKED")
+    query = (Event
+             .update(support_contact=support_id, updated_at=datetime.now())
+             .where(Event.id == candidate)
+             .returning(*CLAIM_FIELDS)
+             .tuples())
+    with schedule_lock(support_id):
+        row = next(iter(query.execute()), None)
+    return Claim(*row) if row else None
+
+
+def claim_with_conditional_update(support_id: int) -> Optional[Claim]:
+    for _ in range(CLAIM_RETRIES):
+        row = next_unassigned(support_id, CLAIM_FIELDS).tuples().first()
+        if row is None:
+            return None
+        updated = (Event
+                   .update(support_contact=support_id, updated_at=datetime.now())
+                   .where((Event.id == row[0]) & is_unassigned() & free_for(support_id))
+                   .execute())
+        if updated:
+            return Claim(*row)
+    # Forte contention : le prochain appel réessaiera.
+    return None
+
+
+def assign_event(event_id: int, support_id: int) -> str:
+    """
+    Attribue l'événement au membre du support s'il n'est assigné à personne et ne chevauche
+    aucun de ses événements (une requête) ; sinon, une lecture indique pourquoi
+    (ALREADY_YOURS, TAKEN, NOT_FOUND ou CONFLICT, voir `conflicts_of_event`).
+    """
+    with schedule_lock(support_id):
+        updated = (Event
+                   .update(support_contact=support_id, updated_at=datetime.now())
+                   .where((Event.id == event_id) & is_unassigned() & free_for(support_id))
+                   .execute())
+    if updated:
+        local_write()
+        return ASSIGNED
+    row = Event.select(Event.support_contact).where(Event.id == event_id).tuples().first()
+    if row is None:
+        return NOT_FOUND
+    if row[0] is None:
+        return CONFLICT
+    return ALREADY_YOURS if row[0] == support_id else TAKEN
+
+
+def reschedule_event(event_id: int, support_id: int, start_date: datetime, end_date: datetime,
+                     **fields: Any) -> str:
+    """
+    Change les dates (et les autres champs `fields`) d'un événement assigné au membre du support,
+    s'il ne chevauche alors aucun autre de ses événements : contrôle et écriture en une requête.
+    Retourne UPDATED, sinon CONFLICT (voir `conflicting_events`), TAKEN ou NOT_FOUND.
+    """
+    with schedule_lock(support_id):
+        updated = (Event
+                   .update(start_date=start_date, end_date=end_date, updated_at=datetime.now(), **fields)
+                   .where((Event.id == event_id) & (Event.support_contact == support_id) &
+                          free_between(support_id, start_date, end_date, event_id))
+                   .execute())
+    if updated:
+        local_write()
+        return UPDATED
+    row = Event.select(Event.support_contact).where(Event.id == event_id).tuples().first()
+    if row is None:
+        return NOT_FOUND
+    return CONFLICT if row[0] == support_id else TAKEN
+
+
+def conflicts_of_event(event_id: int, support_id: int) -> List[int]:
+    """Événements du membre du support qui chevauchent l'événement `event_id`."""
+    event = Event.select(Event.start_date, Event.end_date).where(Event.id == event_id).tuples().first()
+    if event is None:
+        return []
+    return conflicting_events(support_id, *event, exclude=event_id)
@@ -0,0 +1,172 @@
+"""
+Conflits de planning du support : deux événements d'un même membre dont les dates se chevauchent.
+Les dates sont inclusives, comme pour `administration balance-support` : deux événements
+le même jour se chevauchent.
+
+- `free_for(support_id)` / `free_between(...)` : condition SQL « l'événement ne chevauche aucun
+  autre événement du membre », ajoutée aux mises à jour conditionnelles de `assign_event`,
+  `claim_next_event` et `reschedule_event` (crm.models.claims) : le contrôle et l'écriture
+  sont une seule requête. `schedule_lock` verrouille en plus la ligne du membre sur PostgreSQL.
+- `conflicting_events` : événements d'un membre qui chevauchent une période (message d'erreur),
+  en une requête indexée. Sur PostgreSQL, l'opérateur && sur tsrange(start_date, end_date, '[]'),
+  servi par l'index GiST `event_support_period` (migration m0004) ; sur SQLite, l'index
+  (support_contact_id, start_date, id) de la migration m0002.
+- `find_conflicts` : toutes les paires en conflit, en un seul balayage des événements triés
+  par (membre, date de début) : O(n log n + paires) au lieu de comparer les paires une à une.
+- `IntervalTree` : recherches répétées dans un planning gardé en mémoire (O(log n + résultats)).
+"""
+import heapq
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from peewee import SQL, Expression, PostgresqlDatabase, fn
+
+from crm.models.database import unwrap_database
+from crm.models.models import Event, User
+
+
+class Conflict(NamedTuple):
+    support_id: int
+    first_id: int
+    second_id: int
+    # Période commune aux deux événements
+    start: datetime
+    end: datetime
+
+
+def is_postgresql() -> bool:
+    return isinstance(unwrap_database(Event._meta.database), PostgresqlDatabase)
+
+
+def period(start, end):
+    """Période fermée [start, end] (PostgreSQL), même expression que l'index event_support_period."""
+    return fn.tsrange(start, end, SQL("'[]'"))
+
+
+def overlaps(model, start, end):
+    """Condition : l'événement `model` (Event ou un alias) chevauche [start, end]."""
+    if is_postgresql():
+        return Expression(period(model.start_date, model.end_date), "&&", period(start, end))
+    return (model.start_date <= end) & (model.end_date >= start)
+
+
+def overlapping_query(support_id: int, start, end, model=Event):
+    return model.select(model.id).where((model.support_contact == support_id) & overlaps(model, start, end))
+
+
+def free_between(support_id: int, start, end, exclude):
+    """Condition : aucun événement du membre du support, hors `exclude`, ne chevauche [start, end]."""
+    other = Event.alias()
+    return ~fn.EXISTS(overlapping_query(support_id, start, end, other).where(other.id != exclude))
+
+
+def free_for(support_id: int):
+    """Condition sur Event : l'événement ne chevauche aucun autre événement du membre du support."""
+    return free_between(support_id, Event.start_date, Event.end_date, Event.id)
+
+
+@contextmanager
+def schedule_lock(support_id: int):
+    """
+    Transaction qui sérialise les changements de planning d'un membre du support. Sur PostgreSQL,
+    la ligne du membre est verrouillée (SELECT ... FOR UPDATE) : deux mises à jour conditionnelles
+    concurrentes ne peuvent pas passer toutes deux le test `free_for` sur des instantanés différents.
+    Sur SQLite, une écriture verrouille déjà toute la base : la mise à jour conditionnelle suffit.
+    """
+    database = unwrap_database(Event._meta.database)
+    if not database.for_update:
+        yield
+        return
+    with database.atomic():
+        User.select(User.id).where(User.id == support_id).for_update().execute()
+        yield
+
+
+class IntervalTree:
+    """
+    Arbre d'intervalles fermés statique : intervalles triés par début, rangés comme un arbre binaire
+    de recherche implicite (le milieu de chaque tranche est la racine de la tranche), chaque nœud
+    portant la plus grande fin de son sous-arbre. Une recherche coûte O(log n + résultats).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, int]]):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.ids = [key for _, _, key in intervals]
+        self.max_ends = list(self.ends)
+        self._augment(0, len(intervals))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _augment(self, low: int, high: int):
+        # Fin maximale de chaque sous-arbre, calculée des feuilles vers la racine (sans récursion).
+        stack, order = [(low, high)], []
+        while stack:
+            low, high = stack.pop()
+            if low < high:
+                middle = (low + high) // 2
+                order.append((low, middle, high))
+                stack.extend(((low, middle), (middle + 1, high)))
+        for low, middle, high in reversed(order):
+            best = self.ends[middle]
+            if low < middle:
+                best = max(best, self.max_ends[(low + middle) // 2])
+            if middle + 1 < high:
+                best = max(best, self.max_ends[(middle + 1 + high) // 2])
+            self.max_ends[middle] = best
+
+    def overlapping(self, start: datetime, end: datetime) -> List[int]:
+        """Identifiants des intervalles qui chevauchent [start, end], dans l'ordre des débuts."""
+        found, stack = [], [(0, len(self.ids))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            if self.max_ends[middle] < start:
+                # Aucun intervalle du sous-arbre n'atteint `start`.
+                continue
+            if self.starts[middle] <= end:
+                if self.ends[middle] >= start:
+                    found.append(middle)
+                stack.append((middle + 1, high))
+            stack.append((low, middle))
+        return [self.ids[index] for index in sorted(found)]
+
+
+def conflicting_events(support_id: int, start: datetime, end: datetime, exclude: Optional[int] = None) -> List[int]:
+    """Événements du membre du support qui chevauchent [start, end], hors l'événement `exclude`."""
+    query = overlapping_query(support_id, start, end).order_by(Event.start_date, Event.id)
+    return [event_id for (event_id,) in query.tuples() if event_id != exclude]
+
+
+def sweep_conflicts(rows: Iterable[Sequence]) -> Iterator[Conflict]:
+    """
+    Paires en conflit parmi des lignes (membre, début, fin, id) triées par (membre, début, id).
+    Les événements en cours sont gardés dans un tas ordonné par date de fin : à chaque nouvel
+    événement, ceux qui sont terminés avant son début sont retirés, les autres le chevauchent.
+    """
+    current, active = None, []
+    for support_id, start, end, event_id in rows:
+        if support_id != current:
+            current, active = support_id, []
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        for other_end, other_id in sorted(active, key=lambda item: item[1]):
+            yield Conflict(support_id, other_id, event_id, start, min(end, other_end))
+        heapq.heappush(active, (end, event_id))
+
+
+def find_conflicts(support_id: Optional[int] = None) -> Iterator[Conflict]:
+    """Conflits de planning d'un membre du support (ou de tous), en une requête et un balayage."""
+    query = (Event
+             .select(Event.support_contact, Event.start_date, Event.end_date, Event.id)
+             .order_by(Event.support_contact, Event.start_date, Event.id))
+    if support_id is None:
+        query = query.where(Event.support_contact.is_null(False))
+    else:
+        query = query.where(Event.support_contact == support_id)
+    return sweep_conflicts(query.tuples().iterator())
@@ -0,0 +1,88 @@
+"""
+Vérification des index utilisés par les requêtes fréquentes de la CLI.
+
+Chaque requête est analysée avec EXPLAIN : une lecture séquentielle d'une table
+signale un index manquant. Sur PostgreSQL, les lectures séquentielles sont désactivées
+le temps de l'analyse, pour que le résultat ne dépende pas de la taille des tables.
+"""
+import json
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple
+
+from peewee import PostgresqlDatabase
+
+from crm.models.conflicts import overlapping_query
+from crm.models.database import unwrap_database
+from crm.models.models import Client, Contrat, Event
+from crm.models.queries import clients_of_commercial, contrats_of_author, events_of_support, unassigned_events
+
+
+class IndexCheck(NamedTuple):
+    name: str
+    uses_index: bool
+    plan: str
+
+
+# Requêtes émises par les commandes, avec des paramètres représentatifs.
+HOT_QUERIES: Dict[str, Callable] = {
+    "add_client : nom déjà utilisé": lambda: Client.select(Client.id).where(Client.name == "nom").limit(1),
+    "add_client : email déjà utilisé": lambda: Client.select(Client.id).where(Client.email == "a@b.fr").limit(1),
+    "add_contrat : client sous contrat": lambda: Contrat.select(Contrat.id).where(
+        Contrat.client == 1, Contrat.status == "EN_COURS"),
+    "list clients : mes clients": lambda: clients_of_commercial(1).select(Client.id).order_by(Client.id).limit(50),
+    "list contrats : mes contrats": lambda: contrats_of_author(1).select(Contrat.id).order_by(Contrat.id).limit(50),
+    "list events : mes événements": lambda: events_of_support(1).select(Event.id).order_by(
+        Event.start_date, Event.id).limit(50),
+    "list events : non assignés": lambda: unassigned_events().select(Event.id).order_by(
+        Event.start_date, Event.id).limit(50),
+    "export clients : par date": lambda: Client.select(Client.id).where(Client.creation_date >= datetime(2024, 1, 1)),
+    "export events : par date": lambda: Event.select(Event.id).where(Event.start_date >= datetime(2024, 1, 1)),
+    "événements d'un contrat": lambda: Event.select(Event.id).where(Event.contrat == 1),
+    "contrats expirés": lambda: Contrat.select(Contrat.id).where(
+        Contrat.status == "EN_COURS", Contrat.end_date < datetime(2024, 1, 1)),
+    "conflits de planning d'un support": lambda: overlapping_query(1, datetime(2024, 1, 1), datetime(2024, 1, 2)),
+}
+
+
+def explain_sqlite(database, sql: str, params) -> (bool, str):
+    rows = database.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    details = [row[-1] for row in rows]
+    # "SCAN t1" : lecture complète de la table ; "SCAN t1 USING INDEX ..." : parcours d'index.
+    # "USE TEMP B-TREE FOR ORDER BY" : tri de tout le résultat, faute d'index dans l'ordre demandé.
+    missing = any(
+        (detail.startswith("SCAN ") and " USING " not in detail) or detail.startswith("USE TEMP B-TREE FOR ORDER BY")
+        for detail in details
+    )
+    return not missing, " | ".join(details)
+
+
+def explain_postgresql(database, sql: str, params) -> (bool, str):
+    with database.atomic() as transaction:
+        database.execute_sql("SET LOCAL enable_seqscan = off")
+        (plan,) = database.execute_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).fetchone()
+        transaction.rollback()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    node_types = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        node_types.append(node["Node Type"] + (f" ({node['Index Name']})" if "Index Name" in node else ""))
+        nodes.extend(node.get("Plans", []))
+    return not any(node.startswith("Seq Scan") for node in node_types), " | ".join(node_types)
+
+
+def check_indexes(database) -> List[IndexCheck]:
+    """Analyse chaque requête fréquente et indique si elle est servie par un index."""
+    database = unwrap_database(database)
+    explain = explain_postgresql if isinstance(database, PostgresqlDatabase) else explain_sqlite
+
+    results = []
+    with database.bind_ctx([Client, Contrat, Event]):
+        for name, build_query in HOT_QUERIES.items():
+            sql, params = build_query().sql()
+            uses_index, plan = explain(database, sql, params)
+            results.append(IndexCheck(name, uses_index, plan))
+    return results
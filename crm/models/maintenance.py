@@ -0,0 +1,64 @@
+"""
+Tâches de maintenance ensemblistes, exécutables depuis cron.
+"""
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from crm.models.database import unwrap_database
+from crm.models.models import Contrat, CONTRAT_STATUTS, local_write
+
+
+class SweepResult(NamedTuple):
+    changed: int
+    batches: int
+    seconds: float
+
+
+def expired_contrats_batch(now: datetime, batch_size: int):
+    """
+    Sous-requête des IDs d'un lot de contrats EN_COURS, payés et dont la date de fin est passée.
+    Sur PostgreSQL, les lignes déjà verrouillées par un autre balayage sont ignorées (SKIP LOCKED).
+    """
+    query = (Contrat
+             .select(Contrat.id)
+             .where((Contrat.status == CONTRAT_STATUTS[0]) &
+                    (Contrat.end_date < now) &
+                    (Contrat.payment_received == True))  # noqa: E712
+             .order_by(Contrat.id)
+             .limit(batch_size))
+
+    if unwrap_database(Contrat._meta.database).for_update:
+        query = query.for_update("FOR UPDATE SKIP LOCKED")
+    return query
+
+
+def sweep_expired_contrats(batch_size: int = 1000, now: Optional[datetime] = None) -> SweepResult:
+    """
+    Passe au statut TERMINE tous les contrats EN_COURS payés dont la date de fin est passée.
+
+    Chaque lot est un seul `UPDATE ... WHERE id IN (<lot>)` dans sa propre transaction,
+    pour garder des verrous courts. Idempotent : une nouvelle exécution ne modifie
+    que les contrats arrivés à échéance entre-temps.
+    """
+    now = now or datetime.now()
+    database = Contrat._meta.database
+    start = time.perf_counter()
+    changed = batches = 0
+
+    while True:
+        with database.atomic():
+            count = (Contrat
+                     .update(status=CONTRAT_STATUTS[1], updated_at=datetime.now())
+                     .where(Contrat.id.in_(expired_contrats_batch(now, batch_size)))
+                     .execute())
+        if not count:
+            break
+        changed += count
+        batches += 1
+        if count < batch_size:
+            break
+
+    if changed:
+        local_write()
+    return SweepResult(changed, batches, time.perf_counter() - start)
@@ -0,0 +1,130 @@
+"""
+Migrations versionnées du schéma de la base de données.
+
+Chaque migration est un module `mNNNN_nom.py` de ce paquet qui définit :
+- `upgrade(migrator)` : applique la modification,
+- `downgrade(migrator)` : l'annule.
+`migrator` est un `playhouse.migrate.SchemaMigrator` ; la base est accessible par `migrator.database`.
+
+Les versions appliquées sont enregistrées dans la table `schema_version`.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from peewee import SQL, CharField, DateTimeField, Index, IntegerField, Model, Table
+from playhouse.migrate import SchemaMigrator
+
+from crm.models.database import unwrap_database
+
+MIGRATION_MODULE = re.compile(r"^m(\d{4})_(\w+)$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: object
+
+
+class SchemaVersion(Model):
+    """Version de migration appliquée à la base."""
+    version = IntegerField(primary_key=True)
+    name = CharField()
+    applied_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = "schema_version"
+
+
+def load_migrations() -> List[Migration]:
+    """Retourne les migrations du paquet, triées par version."""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MIGRATION_MODULE.match(module_info.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.{module_info.name}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def applied_versions(database) -> List[int]:
+    """Retourne les versions déjà appliquées, dans l'ordre."""
+    database = unwrap_database(database)
+    with database.bind_ctx([SchemaVersion]):
+        SchemaVersion.create_table(safe=True)
+        return [version for (version,) in SchemaVersion.select(SchemaVersion.version).order_by(SchemaVersion.version).tuples()]
+
+
+def migrate(database, target: Optional[int] = None) -> List[Migration]:
+    """
+    Applique les migrations non encore appliquées, jusqu'à la version `target` incluse
+    (la dernière par défaut). Chaque migration est appliquée dans sa propre transaction.
+    Retourne les migrations appliquées.
+    """
+    database = unwrap_database(database)
+    done = set(applied_versions(database))
+    migrator = SchemaMigrator.from_database(database)
+    applied = []
+
+    with database.bind_ctx([SchemaVersion]):
+        for migration in load_migrations():
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            with database.atomic():
+                migration.module.upgrade(migrator)
+                SchemaVersion.create(version=migration.version, name=migration.name)
+            applied.append(migration)
+    return applied
+
+
+def rollback(database, steps: int = 1) -> List[Migration]:
+    """
+    Annule les `steps` dernières migrations appliquées, de la plus récente à la plus ancienne.
+    La migration initiale n'est jamais annulée : elle supprimerait les tables et leurs données
+    (create_database.py --reset recrée une base vide). Retourne les migrations annulées.
+    """
+    database = unwrap_database(database)
+    done = applied_versions(database)
+    migrations = {migration.version: migration for migration in load_migrations()}
+    selected = done[-steps:] if steps > 0 else []
+    if selected and selected[0] == min(migrations):
+        raise MigrationError(
+            f"La migration initiale ne peut pas être annulée : au plus {len(done) - 1} migration(s) à annuler."
+        )
+    migrator = SchemaMigrator.from_database(database)
+    rolled_back = []
+
+    with database.bind_ctx([SchemaVersion]):
+        for version in reversed(selected):
+            migration = migrations[version]
+            with database.atomic():
+                migration.module.downgrade(migrator)
+                SchemaVersion.delete().where(SchemaVersion.version == version).execute()
+            rolled_back.append(migration)
+    return rolled_back
+
+
+class MigrationError(Exception):
+    """Migration impossible en l'état des données ; le message indique quoi corriger."""
+
+
+def add_index(migrator, name: str, table: str, columns: list, unique: bool = False, where: str = None,
+              using: str = None):
+    """
+    Crée un index nommé s'il n'existe pas déjà, construit par peewee (`Index`) et exécuté
+    par la base du migrateur. `columns` : noms de colonnes ou expressions ; `where` : condition
+    d'un index partiel (en SQL littéral : SQLite n'y accepte pas de paramètres) ; `using` :
+    méthode d'index (ex. "gist" sur PostgreSQL). L'opération `add_index` de playhouse.migrate
+    ne permet ni de nommer l'index ni d'y ajouter une condition.
+    """
+    table_ref = Table(table)
+    expressions = [getattr(table_ref.c, column) if isinstance(column, str) else column for column in columns]
+    migrator.database.execute(Index(name, table_ref, expressions, unique=unique, safe=True,
+                                    where=SQL(where) if where else None, using=using))
+
+
+def drop_index(migrator, table: str, name: str):
+    """Supprime un index (opération `drop_index` de playhouse.migrate)."""
+    migrator.drop_index(table, name).run()
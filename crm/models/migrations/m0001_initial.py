@@ -0,0 +1,72 @@
+"""
+Schéma initial : tables des utilisateurs, clients, contrats et événements.
+Sans effet sur une base déjà créée par l'ancien create_database.py.
+
+Les colonnes sont figées ici, telles qu'à la version 1 : les modèles de crm.models.models
+évoluent par les migrations suivantes (ex. `updated_at`, ajoutée par m0003).
+"""
+from datetime import datetime
+
+from peewee import SQL, BooleanField, CharField, DateTimeField, ForeignKeyField, IntegerField, Model, TextField
+
+
+class User(Model):
+    username = CharField(unique=True)
+    email = CharField(unique=True)
+    role = CharField()
+    password = CharField()
+
+    class Meta:
+        table_name = "user"
+
+
+class Client(Model):
+    name = CharField()
+    email = CharField(unique=True)
+    phone = CharField(null=True)
+    company_name = CharField(null=True)
+    creation_date = DateTimeField(default=datetime.now)
+    last_update_date = DateTimeField(constraints=[SQL('DEFAULT CURRENT_TIMESTAMP')])
+    commercial_contact = ForeignKeyField(User)
+
+    class Meta:
+        table_name = "client"
+
+
+class Contrat(Model):
+    client = ForeignKeyField(Client)
+    status = CharField(default="EN_COURS")
+    start_date = DateTimeField()
+    end_date = DateTimeField()
+    price = IntegerField()
+    payment_received = BooleanField(default=False)
+    is_signed = BooleanField(default=False)
+    contrat_author = ForeignKeyField(User)
+
+    class Meta:
+        table_name = "contrat"
+
+
+class Event(Model):
+    contrat = ForeignKeyField(Contrat)
+    support_contact = ForeignKeyField(User, null=True)
+    start_date = DateTimeField()
+    end_date = DateTimeField()
+    attendees = IntegerField()
+    notes = TextField(null=True)
+
+    class Meta:
+        table_name = "event"
+
+
+MODELS = [User, Client, Contrat, Event]
+
+
+def upgrade(migrator):
+    with migrator.database.bind_ctx(MODELS):
+        migrator.database.create_tables(MODELS, safe=True)
+
+
+def downgrade(migrator):
+    with migrator.database.bind_ctx(MODELS):
+        migrator.database.drop_tables(MODELS, safe=True)
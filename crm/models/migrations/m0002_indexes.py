@@ -0,0 +1,59 @@
+"""
+Index secondaires des requêtes fréquentes de la CLI :
+- unicité du nom de client (vérifiée à chaque add_client) ;
+- un seul contrat EN_COURS par client (index unique partiel, vérifié par is_client_not_under_contrat) ;
+- périmètres par utilisateur triés (mes clients, mes contrats, événements d'un support) ;
+- événements non assignés triés par date (index partiel : list events --unassigned, claim-next,
+  balance-support) ;
+- colonnes de dates (filtres d'export et balayage des contrats expirés).
+
+Une base où un client a plusieurs contrats EN_COURS ne peut pas recevoir l'index unique :
+la migration s'arrête en indiquant les clients concernés, sans rien modifier.
+"""
+from peewee import Table, fn
+
+from crm.models.migrations import MigrationError, add_index, drop_index
+
+INDEXES = [
+    # (nom, table, colonnes, unique, condition)
+    ("client_name", "client", ["name"], False, None),
+    ("client_commercial_contact_id_id", "client", ["commercial_contact_id", "id"], False, None),
+    ("client_creation_date", "client", ["creation_date"], False, None),
+    ("contrat_client_id_status", "contrat", ["client_id", "status"], False, None),
+    ("contrat_one_en_cours_per_client", "contrat", ["client_id"], True, "status = 'EN_COURS'"),
+    ("contrat_contrat_author_id_id", "contrat", ["contrat_author_id", "id"], False, None),
+    ("contrat_start_date", "contrat", ["start_date"], False, None),
+    ("contrat_en_cours_end_date", "contrat", ["end_date"], False, "status = 'EN_COURS'"),
+    ("event_support_contact_id_start_date", "event", ["support_contact_id", "start_date", "id"], False, None),
+    ("event_start_date", "event", ["start_date"], False, None),
+    ("event_unassigned_start_date", "event", ["start_date", "id"], False, "support_contact_id IS NULL"),
+]
+
+
+def clients_with_several_en_cours(database) -> list:
+    """Clients ayant plus d'un contrat EN_COURS (incompatibles avec contrat_one_en_cours_per_client)."""
+    contrat = Table("contrat")
+    query = (contrat
+             .select(contrat.c.client_id)
+             .where(contrat.c.status == "EN_COURS")
+             .group_by(contrat.c.client_id)
+             .having(fn.COUNT(contrat.c.id) > 1)
+             .order_by(contrat.c.client_id))
+    return [client_id for (client_id,) in database.execute(query)]
+
+
+def upgrade(migrator):
+    duplicates = clients_with_several_en_cours(migrator.database)
+    if duplicates:
+        raise MigrationError(
+            "Plusieurs contrats EN_COURS pour le(s) client(s) " + ", ".join(map(str, duplicates)) +
+            " : ne laissez qu'un contrat EN_COURS par client (passez les autres au statut TERMINE), "
+            "puis relancez la migration."
+        )
+    for name, table, columns, unique, where in INDEXES:
+        add_index(migrator, name, table, columns, unique=unique, where=where)
+
+
+def downgrade(migrator):
+    for name, table, *_ in reversed(INDEXES):
+        drop_index(migrator, table, name)
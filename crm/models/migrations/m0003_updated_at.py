@@ -0,0 +1,37 @@
+"""
+Suivi des modifications pour la synchronisation incrémentale (crm sync) :
+- colonne `updated_at` sur toutes les tables, indexée avec l'id (pagination par clé) ;
+- table `tombstone` des suppressions, indexée par (deleted_at, id).
+Les lignes existantes prennent la date de la migration.
+"""
+from datetime import datetime
+
+from peewee import DateTimeField
+
+from crm.models.migrations import add_index, drop_index
+from crm.models.models import Tombstone
+
+TABLES = ["user", "client", "contrat", "event"]
+
+
+def upgrade(migrator):
+    database = migrator.database
+    for table in TABLES:
+        # Déjà présente si la table a été créée à partir des modèles actuels (ancien create_database.py).
+        if "updated_at" not in {column.name for column in database.get_columns(table)}:
+            migrator.add_column(table, "updated_at", DateTimeField(default=datetime.now)).run()
+        add_index(migrator, f"{table}_updated_at_id", table, ["updated_at", "id"])
+
+    with database.bind_ctx([Tombstone]):
+        database.create_tables([Tombstone], safe=True)
+    add_index(migrator, "tombstone_deleted_at_id", "tombstone", ["deleted_at", "id"])
+
+
+def downgrade(migrator):
+    database = migrator.database
+    drop_index(migrator, "tombstone", "tombstone_deleted_at_id")
+    with database.bind_ctx([Tombstone]):
+        database.drop_tables([Tombstone], safe=True)
+    for table in reversed(TABLES):
+        drop_index(migrator, table, f"{table}_updated_at_id")
+        migrator.drop_column(table, "updated_at").run()
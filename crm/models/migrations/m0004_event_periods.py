@@ -0,0 +1,30 @@
+"""
+Détection des conflits de planning du support (crm.models.conflicts) :
+sur PostgreSQL, index GiST sur (support_contact_id, tsrange(start_date, end_date, '[]')),
+qui sert l'opérateur && des requêtes de chevauchement. L'extension btree_gist permet
+d'y inclure la colonne entière du membre du support.
+
+Sans effet sur SQLite : les chevauchements d'un membre y sont cherchés par l'index
+event_support_contact_id_start_date (m0002).
+"""
+from peewee import SQL, PostgresqlDatabase, Table, fn
+
+from crm.models.migrations import add_index, drop_index
+
+INDEX = "event_support_period"
+
+
+def upgrade(migrator):
+    database = migrator.database
+    if not isinstance(database, PostgresqlDatabase):
+        return
+    # Pas d'opération playhouse.migrate pour les extensions.
+    database.execute_sql("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    event = Table("event")
+    period = fn.tsrange(event.c.start_date, event.c.end_date, SQL("'[]'"))
+    add_index(migrator, INDEX, "event", ["support_contact_id", period], using="gist")
+
+
+def downgrade(migrator):
+    if isinstance(migrator.database, PostgresqlDatabase):
+        drop_index(migrator, "event", INDEX)
@@ -1,41 +1,88 @@
-from peewee import Model, CharField, ForeignKeyField, DateTimeField, IntegerField, BooleanField, TextField, SQL
+from peewee import Model, CharField, ForeignKeyAccessor, ForeignKeyField, DateTimeField, IntegerField, BooleanField, TextField, SQL
+from playhouse import signals
 from datetime import datetime
-# déclenché après qu'un enregistrement a été sauvegardé dans la bdd.
-from playhouse.signals import post_save
-from peewee import PostgresqlDatabase
-from dotenv import load_dotenv
-import os
+from crm.models.database import LazyDatabase
 
-load_dotenv()
+# La base est construite à partir du .env au premier usage (voir crm.models.database) :
+# pool de connexions, ouverture paresseuse et reconnexion automatique.
+db = LazyDatabase()
 
-DB_USERNAME = os.getenv("DB_USERNAME")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = int(os.getenv("DB_PORT"))
 
-# Vérification des variables d'environnement
-if not all([DB_USERNAME, DB_PASSWORD, DB_NAME, DB_HOST, DB_PORT]):
-    raise EnvironmentError("Variables d'environnement sont manquantes! Vérifiez votre fichier .env")
-
-
-db = PostgresqlDatabase(
-    DB_NAME,  # Nom de la base de données
-    user=DB_USERNAME,  # Nom d'utilisateur de la base de données
-    password=DB_PASSWORD,
-    host=DB_HOST,
-    port=DB_PORT
-)
-
-
-class BaseModel(Model):
+class BaseModel(signals.Model):
     """
     Classe de base pour tous les modèles.
     Définit la base de données à utiliser pour tous les modèles qui en héritent.
+    Les signaux pre_save / post_save / post_delete (playhouse.signals) sont émis à chaque
+    écriture d'une instance (ex. invalidation du cache des utilisateurs).
+
+    `updated_at` date chaque création ou modification et chaque suppression laisse une
+    pierre tombale (Tombstone) : la commande `crm sync` ne rapatrie ainsi que les lignes
+    changées depuis sa dernière synchronisation. Les mises à jour et suppressions en masse
+    (Model.update / Model.delete) doivent renseigner `updated_at` et `Tombstone.record`
+    elles-mêmes.
     """
+    updated_at = DateTimeField(default=datetime.now)
+
     class Meta:
         database = db  
 
+    def save(self, *args, **kwargs):
+        self.updated_at = datetime.now()
+        result = super().save(*args, **kwargs)
+        local_write()
+        return result
+
+    def delete_instance(self, *args, **kwargs):
+        with self._meta.database.atomic():
+            Tombstone.record(type(self), [self.get_id()])
+            result = super().delete_instance(*args, **kwargs)
+        local_write()
+        return result
+
+
+class Tombstone(Model):
+    """Suppression d'une ligne (table, id), conservée pour la synchronisation des instantanés."""
+    source_table = CharField()
+    row_id = IntegerField()
+    deleted_at = DateTimeField(default=datetime.now)
+
+    class Meta:
+        database = db
+        table_name = "tombstone"
+
+    @classmethod
+    def record(cls, model, ids):
+        """Enregistre la suppression des lignes `ids` de `model`."""
+        now = datetime.now()
+        rows = [{"source_table": model._meta.table_name, "row_id": row_id, "deleted_at": now} for row_id in ids]
+        if rows:
+            cls.insert_many(rows).execute()
+
+
+def local_write():
+    """Une écriture de ce poste rend l'instantané local obsolète jusqu'à la prochaine synchronisation."""
+    from crm.models.snapshot import mark_stale
+    mark_stale()
+
+
+class CachedUserAccessor(ForeignKeyAccessor):
+    """Déréférence la clé étrangère (ex. event.support_contact) à travers le cache des utilisateurs."""
+
+    def get_rel_instance(self, instance):
+        value = instance.__data__.get(self.name)
+        if value is not None and self.name not in instance.__rel__ and self.field.lazy_load:
+            from crm.models.user_cache import cached_user
+            user = cached_user(value)
+            if user is None:
+                raise self.rel_model.DoesNotExist
+            instance.__rel__[self.name] = user
+        return super().get_rel_instance(instance)
+
+
+class UserForeignKeyField(ForeignKeyField):
+    """Clé étrangère vers `User`, lue à travers le cache des utilisateurs."""
+    accessor_class = CachedUserAccessor
+
 
 USER_ROLES = [
     'COMMERCIAL',
@@ -70,7 +117,7 @@ class Client(BaseModel):
     company_name = CharField(null=True)
     creation_date = DateTimeField(default=datetime.now)
     last_update_date = DateTimeField(constraints=[SQL('DEFAULT CURRENT_TIMESTAMP')])
-    commercial_contact = ForeignKeyField(User, backref='clients')
+    commercial_contact = UserForeignKeyField(User, backref='clients')
     
     def save(self, *args, **kwargs):
         """
@@ -91,33 +138,28 @@ class Contrat(BaseModel):
     price = IntegerField()
     payment_received = BooleanField(default=False)
     is_signed = BooleanField(default=False)
-    contrat_author = ForeignKeyField(User, backref='contrats_author')
+    contrat_author = UserForeignKeyField(User, backref='contrats_author')
+
+    def save(self, *args, **kwargs):
+        """
+        Sauvegarde l'instance du contrat en base de données.
+        À la création, un contrat dont la date de fin est passée et le paiement reçu
+        est directement enregistré au statut 'TERMINE' (une seule écriture).
+        Les contrats qui arrivent à échéance plus tard sont traités par
+        crm.models.maintenance.sweep_expired_contrats (commande `administration sweep-contracts`).
+        """
+        if self._pk is None:
+            end_date = Contrat.end_date.python_value(self.end_date)
+            if isinstance(end_date, datetime) and end_date < datetime.now() and self.payment_received:
+                self.status = CONTRAT_STATUTS[1]
+        return super(Contrat, self).save(*args, **kwargs)
 
 class Event(BaseModel):
     """ 
     Modèle représentant un événement lié à un contrat"""
     contrat = ForeignKeyField(Contrat, backref='events')
-    support_contact = ForeignKeyField(User, backref='events', null=True)
+    support_contact = UserForeignKeyField(User, backref='events', null=True)
     start_date = DateTimeField()
     end_date = DateTimeField()
     attendees = IntegerField()
     notes = TextField(null=True)
-
-
-@post_save(sender=Contrat)
-def update_contract_status(model_class, instance, created):
-    """ 
-    Signal déclenché après la sauvegarde d'un contrat.
-    Met à jour le statut du contrat à 'TERMINE' si la date de fin est passée et que le paiement a été reçu.
-    Ce bloc de code ne sera exécuté que si un nouvel objet Contrat a été créé (et non mis à jour).
-    """
-
-    if created:
-        end_date = instance.end_date
-        today = datetime.now()
-
-        # Ajout de la condition pour vérifier si le paiement a été reçu
-        if end_date < today and instance.payment_received == True:
-            contrat = instance
-            contrat.status = 'TERMINE'
-            contrat.save()
@@ -0,0 +1,218 @@
+"""
+Profilage des commandes (option globale `crm --profile ...`).
+
+Pendant une commande profilée, chaque requête passant par `execute_sql` est chronométrée,
+lecture des lignes comprise (SQLite et les curseurs exécutent une partie du travail à la lecture).
+Les requêtes sont regroupées par texte normalisé (espaces, littéraux et listes IN réduits),
+avec leur nombre d'exécutions, leur durée cumulée et maximale et le nombre de lignes lues.
+Les caches (ex. crm.models.user_cache) y ajoutent leurs succès et échecs.
+
+Sans --profile, la base n'est pas instrumentée : aucun coût. Une fois instrumentée (premier
+profilage du processus, ex. dans le démon ou le shell), une requête non profilée ne coûte
+qu'une lecture de variable locale au fil d'exécution.
+"""
+import cProfile
+import json
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from crm.models.database import unwrap_database
+
+_active = threading.local()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Texte d'une requête sans ses valeurs : deux requêtes de même forme ont le même texte."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class StatementStats:
+    """Statistiques d'une forme de requête."""
+
+    __slots__ = ("sql", "count", "total_seconds", "max_seconds", "rows")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+class ProfiledCursor:
+    """Curseur qui ajoute la durée des lectures et le nombre de lignes lues à sa requête."""
+
+    def __init__(self, cursor, stats: StatementStats, profiler: "Profiler"):
+        self._cursor = cursor
+        self._stats = stats
+        self._profiler = profiler
+
+    def _timed(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        self._profiler.add_time(self._stats, time.perf_counter() - start)
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._stats.rows += 1
+            self._profiler.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed(self._cursor.fetchmany, *args)
+        self._stats.rows += len(rows)
+        self._profiler.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._stats.rows += len(rows)
+        self._profiler.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class Profiler:
+    """Mesures d'une commande : durée totale, requêtes SQL et, en option, profil cProfile."""
+
+    def __init__(self, command: str = "", top: int = 10, cprofile: bool = False):
+        self.command = command
+        self.top = top
+        self.statements: Dict[str, StatementStats] = {}
+        self.queries = 0
+        self.rows = 0
+        self.sql_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self._started = None
+
+    def start(self):
+        try:
+            install(unwrap_database(_database()))
+        except Exception:
+            # Base non configurée : la commande échouera d'elle-même si elle en a besoin.
+            pass
+        _active.profiler = self
+        self._started = time.perf_counter()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self.wall_seconds = time.perf_counter() - self._started
+        if getattr(_active, "profiler", None) is self:
+            _active.profiler = None
+
+    def statement(self, sql: str) -> StatementStats:
+        key = normalize_sql(sql)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats(key)
+        stats.count += 1
+        self.queries += 1
+        return stats
+
+    def add_time(self, stats: StatementStats, seconds: float):
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        self.sql_seconds += seconds
+
+    def cache_event(self, name: str, hit: bool):
+        counts = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def slowest(self) -> List[StatementStats]:
+        return sorted(self.statements.values(), key=lambda s: s.total_seconds, reverse=True)[:self.top]
+
+    def as_dict(self) -> dict:
+        return {
+            "command": self.command,
+            "wall_ms": round(self.wall_seconds * 1000, 3),
+            "queries": self.queries,
+            "sql_ms": round(self.sql_seconds * 1000, 3),
+            "rows": self.rows,
+            "caches": self.caches,
+            "slowest": [stats.as_dict() for stats in self.slowest()],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), ensure_ascii=False)
+
+    def to_text(self) -> str:
+        lines = [
+            f"Profil de « {self.command} » : {self.wall_seconds * 1000:.1f} ms, "
+            f"{self.queries} requête(s) SQL en {self.sql_seconds * 1000:.1f} ms, {self.rows} ligne(s) lue(s).",
+        ]
+        for name, counts in self.caches.items():
+            lines.append(f"Cache {name} : {counts['hits']} succès, {counts['misses']} échec(s).")
+        if self.statements:
+            lines.append(f"{'total (ms)':>11}{'max (ms)':>10}{'nb':>6}{'lignes':>8}  requête")
+            for stats in self.slowest():
+                lines.append(f"{stats.total_seconds * 1000:>11.2f}{stats.max_seconds * 1000:>10.2f}"
+                             f"{stats.count:>6}{stats.rows:>8}  {stats.sql}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Enregistre le profil cProfile (lisible avec `python -m pstats` ou snakeviz)."""
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(path)
+
+
+def _database():
+    from crm.models.models import db
+    return db
+
+
+def install(database):
+    """Instrumente `execute_sql` de la base (une seule fois par instance)."""
+    if getattr(database, "_crm_profiled", False):
+        return
+    execute_sql = database.execute_sql
+
+    def profiled_execute_sql(sql, params=None, *args, **kwargs):
+        profiler = getattr(_active, "profiler", None)
+        if profiler is None:
+            return execute_sql(sql, params, *args, **kwargs)
+        stats = profiler.statement(sql)
+        start = time.perf_counter()
+        try:
+            cursor = execute_sql(sql, params, *args, **kwargs)
+        finally:
+            profiler.add_time(stats, time.perf_counter() - start)
+        return ProfiledCursor(cursor, stats, profiler)
+
+    database.execute_sql = profiled_execute_sql
+    database._crm_profiled = True
+
+
+def current_profiler() -> Optional[Profiler]:
+    """Profileur de la commande en cours dans ce fil d'exécution, s'il y en a un."""
+    return getattr(_active, "profiler", None)
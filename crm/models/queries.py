@@ -0,0 +1,99 @@
+"""
+Requêtes de lecture partagées par les commandes de la CLI :
+périmètres par rôle ("mes clients", "mes contrats", "événements non assignés")
+et pagination par clé (keyset).
+"""
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from peewee import OP, SQL, DateTimeField, Expression, Field, Tuple
+
+from crm.models.models import Client, Contrat, Event
+
+
+def clients_of_commercial(commercial_id: int):
+    """Clients dont le commercial est le contact."""
+    return Client.select().where(Client.commercial_contact == commercial_id)
+
+
+def contrats_of_author(author_id: int):
+    """Contrats créés par un membre de l'administration."""
+    return Contrat.select().where(Contrat.contrat_author == author_id)
+
+
+def contrats_of_commercial(commercial_id: int):
+    """Contrats des clients d'un commercial."""
+    return Contrat.select().join(Client).where(Client.commercial_contact == commercial_id)
+
+
+def events_of_support(support_id: int):
+    """Événements assignés à un membre du support."""
+    return Event.select().where(Event.support_contact == support_id)
+
+
+def events_of_commercial(commercial_id: int):
+    """Événements des clients d'un commercial."""
+    return Event.select().join(Contrat).join(Client).where(Client.commercial_contact == commercial_id)
+
+
+def unassigned_events():
+    """Événements sans membre du support."""
+    # NULL littéral (et non paramètre) pour que l'index partiel event_unassigned_start_date
+    # (migration m0002) soit utilisable.
+    return Event.select().where(Expression(Event.support_contact, OP.IS, SQL("NULL")))
+
+
+def keyset_page(query, keys: Sequence[Field], after: Optional[Sequence] = None, limit: int = 50) -> List[tuple]:
+    """
+    Retourne une page de `limit` lignes (tuples) triées selon `keys`,
+    commençant strictement après la clé `after`.
+
+    La pagination par clé (WHERE (clé) > (dernière clé vue)) coûte le même prix
+    pour la page N que pour la première page, contrairement à OFFSET.
+    Les colonnes de `keys` doivent figurer en tête de la sélection de la requête.
+    """
+    if after is not None:
+        if len(keys) == 1:
+            query = query.where(keys[0] > after[0])
+        else:
+            query = query.where(Tuple(*keys) > Tuple(*after))
+    return list(query.order_by(*keys).limit(limit).tuples())
+
+
+class Page(list):
+    """Page de lignes ; `has_more` indique s'il reste des lignes après elle."""
+    has_more = False
+
+
+def iter_keyset_pages(query, keys: Sequence[Field], after: Optional[Sequence] = None, limit: int = 50) -> Iterator[Page]:
+    """
+    Parcourt toutes les pages d'une requête par pagination par clé. Chaque page est lue avec
+    une ligne de plus que `limit`, qui indique s'il existe une page suivante (`Page.has_more`)
+    sans requête supplémentaire.
+    """
+    while True:
+        rows = keyset_page(query, keys, after, limit + 1)
+        page = Page(rows[:limit])
+        page.has_more = len(rows) > limit
+        if not page:
+            return
+        yield page
+        if not page.has_more:
+            return
+        after = page[-1][:len(keys)]
+
+
+def encode_cursor(key: Sequence) -> str:
+    """Encode une clé de pagination en texte (ex. "2024-03-05T00:00:00,42")."""
+    return ",".join(value.isoformat() if isinstance(value, datetime) else str(value) for value in key)
+
+
+def decode_cursor(cursor: str, keys: Sequence[Field]) -> tuple:
+    """Décode une clé de pagination produite par `encode_cursor`."""
+    values = cursor.split(",")
+    if len(values) != len(keys):
+        raise ValueError("Curseur de pagination invalide.")
+    return tuple(
+        datetime.fromisoformat(value) if isinstance(key, DateTimeField) else int(value)
+        for key, value in zip(keys, values)
+    )
@@ -0,0 +1,254 @@
+"""
+Instantané local (SQLite) des données de la base centrale, pour travailler hors ligne
+et servir les commandes de lecture sans aller-retour vers PostgreSQL.
+
+`crm sync` ne rapatrie que les lignes modifiées depuis la dernière synchronisation :
+pour chaque table, les lignes dont (updated_at, id) dépasse le filigrane enregistré,
+par pages triées (pagination par clé), puis les suppressions (pierres tombales).
+Le filigrane repart de SYNC_OVERLAP secondes en arrière : une transaction validée après
+la synchronisation précédente avec une date plus ancienne (horloges des postes, transaction
+longue) est tout de même rapatriée ; les lignes relues sont simplement réécrites.
+
+L'instantané contient toutes les lignes que la CLI permet de lire (les listes et exports
+donnent accès à tous les clients, contrats et événements), sans les mots de passe.
+Il est propre à un utilisateur : une synchronisation par un autre utilisateur le recrée.
+
+Les commandes de lecture (list, export) le lisent tant qu'il est à jour : synchronisé depuis
+moins de SNAPSHOT_MAX_AGE secondes (300 par défaut, 0 pour ne jamais l'utiliser) et sans
+écriture faite depuis ce poste après la synchronisation.
+"""
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from peewee import CharField, Model, SqliteDatabase, TextField
+
+from crm.cli_commands.cli_session import env_seconds, session_dir
+from crm.models.models import Client, Contrat, Event, Tombstone, User, db
+from crm.models.queries import iter_keyset_pages
+
+SNAPSHOT_FILE = "snapshot.db"
+STALE_SUFFIX = ".stale"
+DEFAULT_MAX_AGE = 300
+DEFAULT_OVERLAP = 5
+PAGE_SIZE = 1000
+
+# Dans l'ordre des clés étrangères.
+MODELS = [User, Client, Contrat, Event]
+# Colonnes qui ne quittent pas la base centrale.
+EXCLUDED_FIELDS = {User: {"password"}}
+
+
+class SnapshotMeta(Model):
+    """Paramètres de l'instantané : utilisateur, date de synchronisation, filigranes."""
+    key = CharField(primary_key=True)
+    value = TextField()
+
+    class Meta:
+        table_name = "snapshot_meta"
+
+
+class SyncResult(NamedTuple):
+    pulled: Dict[str, int]
+    deleted: int
+    seconds: float
+
+
+def snapshot_path() -> Path:
+    """Fichier de l'instantané, dans le répertoire de session (CRM_SNAPSHOT pour le changer)."""
+    return Path(os.getenv("CRM_SNAPSHOT") or session_dir() / SNAPSHOT_FILE)
+
+
+def stale_marker(path: Path) -> Path:
+    return path.with_name(path.name + STALE_SUFFIX)
+
+
+def mark_stale():
+    """Note qu'une écriture a été faite depuis ce poste : l'instantané n'est plus servi avant `crm sync`."""
+    path = snapshot_path()
+    if path.exists():
+        stale_marker(path).touch()
+
+
+def open_snapshot(path: Path) -> SqliteDatabase:
+    """Ouvre (et crée au besoin) l'instantané. Pas de clés étrangères : les tables sont synchronisées l'une après l'autre."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    database = SqliteDatabase(str(path), pragmas={"journal_mode": "wal", "synchronous": "normal"})
+    with database.bind_ctx([SnapshotMeta]):
+        database.create_tables([SnapshotMeta], safe=True)
+    with db.using(database):
+        database.create_tables(MODELS, safe=True)
+    return database
+
+
+def read_meta(database: SqliteDatabase) -> Dict[str, str]:
+    with database.bind_ctx([SnapshotMeta]):
+        return {row.key: row.value for row in SnapshotMeta.select()}
+
+
+def write_meta(database: SqliteDatabase, values: Dict[str, str]):
+    with database.bind_ctx([SnapshotMeta]):
+        SnapshotMeta.replace_many([{"key": key, "value": value} for key, value in values.items()]).execute()
+
+
+def decode_watermark(value: Optional[str]):
+    if not value:
+        return None
+    stamp, row_id = value.rsplit("|", 1)
+    return datetime.fromisoformat(stamp), int(row_id)
+
+
+def encode_watermark(key) -> str:
+    return f"{key[0].isoformat()}|{key[1]}"
+
+
+def rewind(watermark, overlap: float):
+    """Point de reprise : `overlap` secondes avant le filigrane (le filigrane exact sans chevauchement)."""
+    if watermark is None or not overlap:
+        return watermark
+    return watermark[0] - timedelta(seconds=overlap), 0
+
+
+def pull_changes(model, snapshot: SqliteDatabase, watermark, overlap: float, page_size: int):
+    """Copie dans l'instantané les lignes de `model` modifiées après le filigrane ; retourne (lignes, filigrane)."""
+    excluded = EXCLUDED_FIELDS.get(model, set())
+    fields = [field for field in model._meta.sorted_fields if field.name not in excluded]
+    keys = [model.updated_at, model.id]
+    after = rewind(watermark, overlap)
+
+    pulled = 0
+    for page in iter_keyset_pages(model.select(*keys, *fields), keys, after, page_size):
+        rows = [{field.name: value for field, value in zip(fields, row[len(keys):])} for row in page]
+        if excluded:
+            for row in rows:
+                row.update({name: "" for name in excluded})
+        with db.using(snapshot):
+            model.replace_many(rows).execute()
+        pulled += len(rows)
+        key = page[-1][:len(keys)]
+        if watermark is None or key > watermark:
+            watermark = key
+    return pulled, watermark
+
+
+def pull_deletions(snapshot: SqliteDatabase, watermark, overlap: float, page_size: int):
+    """Supprime de l'instantané les lignes supprimées dans la base centrale ; retourne (lignes, filigrane)."""
+    tables = {model._meta.table_name: model for model in MODELS}
+    keys = [Tombstone.deleted_at, Tombstone.id]
+    after = rewind(watermark, overlap)
+
+    deleted = 0
+    query = Tombstone.select(*keys, Tombstone.source_table, Tombstone.row_id)
+    for page in iter_keyset_pages(query, keys, after, page_size):
+        by_table: Dict[str, list] = {}
+        for _, _, table, row_id in page:
+            by_table.setdefault(table, []).append(row_id)
+        with db.using(snapshot):
+            for table, ids in by_table.items():
+                if table in tables:
+                    deleted += tables[table].delete().where(tables[table].id.in_(ids)).execute()
+        key = page[-1][:len(keys)]
+        if watermark is None or key > watermark:
+            watermark = key
+    return deleted, watermark
+
+
+def sync(user_id: int, path: Optional[Path] = None, full: bool = False, page_size: int = PAGE_SIZE) -> SyncResult:
+    """Met l'instantané à jour à partir de la base centrale (`db`)."""
+    start = time.perf_counter()
+    path = path or snapshot_path()
+    overlap = env_seconds("SYNC_OVERLAP", DEFAULT_OVERLAP)
+
+    snapshot = open_snapshot(path)
+    meta = read_meta(snapshot)
+    if meta and (full or meta.get("user_id") != str(user_id)):
+        # Autre utilisateur ou rechargement demandé : l'instantané repart de zéro.
+        snapshot.close()
+        for leftover in (path, path.with_name(path.name + "-wal"), path.with_name(path.name + "-shm")):
+            if leftover.exists():
+                leftover.unlink()
+        snapshot = open_snapshot(path)
+        meta = {}
+
+    pulled, values = {}, {"user_id": str(user_id)}
+    try:
+        with snapshot.atomic():
+            for model in MODELS:
+                name = model._meta.table_name
+                count, watermark = pull_changes(model, snapshot, decode_watermark(meta.get(f"watermark:{name}")),
+                                                overlap, page_size)
+                pulled[name] = count
+                if watermark is not None:
+                    values[f"watermark:{name}"] = encode_watermark(watermark)
+
+            deleted, watermark = pull_deletions(snapshot, decode_watermark(meta.get("watermark:tombstone")),
+                                                overlap, page_size)
+            if watermark is not None:
+                values["watermark:tombstone"] = encode_watermark(watermark)
+            values["synced_at"] = datetime.now().isoformat()
+            write_meta(snapshot, values)
+    finally:
+        snapshot.close()
+
+    marker = stale_marker(path)
+    if marker.exists():
+        marker.unlink()
+    return SyncResult(pulled, deleted, time.perf_counter() - start)
+
+
+def synced_at(path: Optional[Path] = None) -> Optional[datetime]:
+    """Date de la dernière synchronisation, ou None sans instantané."""
+    path = path or snapshot_path()
+    if not path.exists():
+        return None
+    database = SqliteDatabase(str(path))
+    try:
+        value = read_meta(database).get("synced_at")
+    finally:
+        database.close()
+    return datetime.fromisoformat(value) if value else None
+
+
+def fresh_snapshot(user_id: Optional[int], path: Optional[Path] = None):
+    """(instantané, date de synchronisation) s'il peut servir les lectures de l'utilisateur, sinon None."""
+    max_age = env_seconds("SNAPSHOT_MAX_AGE", DEFAULT_MAX_AGE)
+    path = path or snapshot_path()
+    if user_id is None or max_age <= 0 or not path.exists() or stale_marker(path).exists():
+        return None
+    # Garde-fou sans ouvrir le fichier : chaque synchronisation réécrit l'instantané.
+    if time.time() - path.stat().st_mtime > max_age:
+        return None
+
+    database = SqliteDatabase(str(path), pragmas={"query_only": 1})
+    meta = read_meta(database)
+    last = datetime.fromisoformat(meta["synced_at"]) if meta.get("synced_at") else None
+    if meta.get("user_id") != str(user_id) or last is None or (datetime.now() - last).total_seconds() > max_age:
+        database.close()
+        return None
+    return database, last
+
+
+@contextmanager
+def reading_snapshot(user_id: Optional[int]):
+    """
+    Dirige les lectures du bloc vers l'instantané s'il est à jour ; donne la date de
+    synchronisation, ou None si les lectures vont à la base centrale.
+    """
+    fresh = fresh_snapshot(user_id)
+    if fresh is None:
+        yield None
+        return
+    snapshot, last = fresh
+    try:
+        with db.using(snapshot):
+            yield last
+    finally:
+        snapshot.close()
+
+
+def snapshot_notice(last: datetime) -> str:
+    """Mention affichée (sur la sortie d'erreur) par les commandes servies depuis l'instantané."""
+    return f"Données de l'instantané local du {last:%d/%m/%Y %H:%M:%S} (crm sync pour le mettre à jour)."
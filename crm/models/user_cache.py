@@ -0,0 +1,282 @@
+"""
+Cache des utilisateurs (lecture à travers le cache) par id, email et nom d'utilisateur.
+
+La table des utilisateurs est petite et change rarement, mais elle est lue sans cesse :
+connexion, unicité dans `user add-user`, et chaque déréférencement d'une clé étrangère
+(contrat.contrat_author, event.support_contact, client.commercial_contact).
+
+- Taille bornée (USER_CACHE_SIZE, 256 par défaut) avec éviction LRU, et durée de vie
+  (USER_CACHE_TTL secondes, 60 par défaut, 0 pour désactiver le cache).
+- L'annuaire (id, nom d'utilisateur, rôle de tous les utilisateurs, commande `users` du shell)
+  est chargé en une requête et suit la même durée de vie et les mêmes invalidations.
+- Invalidation par les signaux post_save / post_delete de peewee sur `User` ; les mises à jour
+  en masse (User.update) appellent `invalidate_user` elles-mêmes, les insertions en masse
+  (User.insert_many) `invalidate_user_directory`.
+- USER_CACHE_STORE=disk partage les entrées entre processus (commandes successives, démon,
+  shell) dans un fichier SQLite du répertoire de session.
+- Les mots de passe ne sont jamais mis en cache : la connexion (cli_auth.verify_user) lit
+  toujours la ligne dans la base, pour qu'un changement de mot de passe ou de rôle, ou une
+  suppression, faits par un autre processus prennent effet immédiatement.
+
+Chaque instance renvoyée est une copie neuve : la modifier ne modifie pas le cache.
+Les succès et échecs sont comptés dans le profil des commandes (`crm --profile`).
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from playhouse.signals import post_delete, post_save
+
+from crm.cli_commands.cli_session import env_seconds, session_dir
+from crm.models.models import User, db
+from crm.models.profiling import current_profiler
+
+DEFAULT_SIZE = 256
+DEFAULT_TTL = 60
+STORE_FILE = "user_cache.db"
+CACHE_NAME = "user"
+
+# Colonnes partagées entre processus.
+SHARED_FIELDS = ("id", "username", "email", "role")
+# Colonne jamais mise en cache.
+SECRET_FIELD = "password"
+
+
+class UserRef(NamedTuple):
+    id: int
+    username: str
+    role: str
+
+
+def load_directory() -> Dict[int, UserRef]:
+    """Annuaire des utilisateurs par id, en une requête."""
+    query = User.select(User.id, User.username, User.role).order_by(User.id).tuples()
+    return {user_id: UserRef(user_id, username, role.upper()) for user_id, username, role in query}
+
+
+class DiskStore:
+    """Entrées partagées entre processus, dans un fichier SQLite (une connexion par fil d'exécution)."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=wal")
+            connection.execute("CREATE TABLE IF NOT EXISTS user_cache (id INTEGER PRIMARY KEY, username TEXT UNIQUE,"
+                               " email TEXT UNIQUE, role TEXT, expires REAL)")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, value) -> Optional[dict]:
+        row = self._connection().execute(
+            f"SELECT id, username, email, role FROM user_cache WHERE {key} = ? AND expires > ?", (value, time.time())
+        ).fetchone()
+        return dict(zip(SHARED_FIELDS, row)) if row else None
+
+    def put(self, data: dict, expires: float):
+        connection = self._connection()
+        # Un email ou un nom repris par un autre utilisateur remplace l'ancienne entrée.
+        connection.execute("DELETE FROM user_cache WHERE id != ? AND (username = ? OR email = ?)",
+                           (data["id"], data["username"], data["email"]))
+        connection.execute("INSERT OR REPLACE INTO user_cache VALUES (?, ?, ?, ?, ?)",
+                           (*(data[name] for name in SHARED_FIELDS), expires))
+
+    def delete(self, user_id: Optional[int]):
+        if user_id is None:
+            self._connection().execute("DELETE FROM user_cache")
+        else:
+            self._connection().execute("DELETE FROM user_cache WHERE id = ?", (user_id,))
+
+
+class UserCache:
+    """Cache LRU à durée de vie des lignes `User`, indexé par id, email et nom d'utilisateur."""
+
+    def __init__(self, maxsize: int = DEFAULT_SIZE, ttl: float = DEFAULT_TTL, store: Optional[DiskStore] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.hits = self.misses = self.evictions = 0
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # id -> (expiration, données)
+        self._keys: Dict[tuple, int] = {}  # ("email", valeur) / ("username", valeur) -> id
+        self._directory: Optional[tuple] = None  # (expiration, annuaire)
+        # Incrémenté à chaque invalidation : un annuaire lu pendant une invalidation n'est pas gardé.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        profiler = current_profiler()
+        if profiler is not None:
+            profiler.cache_event(CACHE_NAME, hit)
+
+    def _lookup(self, key: str, value) -> Optional[dict]:
+        with self._lock:
+            user_id = value if key == "id" else self._keys.get((key, value))
+            entry = self._entries.get(user_id) if user_id is not None else None
+            if entry is not None:
+                expires, data = entry
+                if expires <= time.monotonic():
+                    self._discard(user_id)
+                else:
+                    self._entries.move_to_end(user_id)
+                    return data
+        if self.store is not None:
+            try:
+                data = self.store.get(key, value)
+            except sqlite3.Error:
+                data = None
+            if data is not None:
+                self._remember(data)
+                return data
+        return None
+
+    def _discard(self, user_id: int):
+        _, data = self._entries.pop(user_id)
+        for key in ("email", "username"):
+            if self._keys.get((key, data[key])) == user_id:
+                del self._keys[(key, data[key])]
+
+    def _remember(self, data: dict):
+        with self._lock:
+            if data["id"] in self._entries:
+                self._discard(data["id"])
+            self._entries[data["id"]] = (time.monotonic() + self.ttl, data)
+            self._keys[("email", data["email"])] = data["id"]
+            self._keys[("username", data["username"])] = data["id"]
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, key: str, value) -> Optional[User]:
+        """
+        Utilisateur dont la colonne `key` (id, email ou username) vaut `value`, ou None.
+        Le mot de passe n'est pas chargé : l'instance ne l'écrase pas si elle est sauvegardée.
+        """
+        if self.ttl <= 0 or db.is_overridden():
+            # Cache désactivé, ou lectures dirigées vers l'instantané local (mots de passe absents).
+            return User.get_or_none(getattr(User, key) == value)
+
+        data = self._lookup(key, value)
+        self._count(data is not None)
+        if data is None:
+            user = User.get_or_none(getattr(User, key) == value)
+            if user is None:
+                return None
+            data = {name: value for name, value in user.__data__.items() if name != SECRET_FIELD}
+            self._remember(data)
+            if self.store is not None:
+                try:
+                    self.store.put(data, time.time() + self.ttl)
+                except sqlite3.Error:
+                    pass
+
+        user = User(**data)
+        user._dirty.clear()
+        return user
+
+    def directory(self) -> Dict[int, UserRef]:
+        """Annuaire des utilisateurs par id : toute modification d'un utilisateur l'invalide."""
+        if self.ttl <= 0 or db.is_overridden():
+            return load_directory()
+
+        with self._lock:
+            entry, generation = self._directory, self._generation
+        if entry is not None and entry[0] > time.monotonic():
+            self._count(True)
+            return entry[1]
+        self._count(False)
+        users = load_directory()
+        with self._lock:
+            if generation == self._generation:
+                self._directory = (time.monotonic() + self.ttl, users)
+        return users
+
+    def invalidate_directory(self):
+        with self._lock:
+            self._directory = None
+            self._generation += 1
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Oublie un utilisateur (tous si `user_id` vaut None), dans ce processus et dans le fichier partagé."""
+        self.invalidate_directory()
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                self._keys.clear()
+            elif user_id in self._entries:
+                self._discard(user_id)
+        if self.store is not None:
+            try:
+                self.store.delete(user_id)
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_cache: Optional[UserCache] = None
+_cache_lock = threading.Lock()
+
+
+def user_cache() -> UserCache:
+    """Cache du processus, configuré par USER_CACHE_SIZE, USER_CACHE_TTL et USER_CACHE_STORE."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                store = DiskStore(session_dir() / STORE_FILE) if os.getenv("USER_CACHE_STORE") == "disk" else None
+                _cache = UserCache(env_seconds("USER_CACHE_SIZE", DEFAULT_SIZE),
+                                   env_seconds("USER_CACHE_TTL", DEFAULT_TTL), store)
+    return _cache
+
+
+def reset_user_cache():
+    """Oublie le cache du processus ; il sera recréé (et sa configuration relue) au prochain usage."""
+    global _cache
+    _cache = None
+
+
+def cached_user(user_id: Optional[int] = None, email: Optional[str] = None,
+                username: Optional[str] = None) -> Optional[User]:
+    """Utilisateur par id, email ou nom d'utilisateur, lu à travers le cache (sans mot de passe)."""
+    if user_id is not None:
+        return user_cache().get("id", user_id)
+    if email is not None:
+        return user_cache().get("email", email)
+    return user_cache().get("username", username)
+
+
+def user_directory() -> Dict[int, UserRef]:
+    """Annuaire des utilisateurs par id (id, nom d'utilisateur, rôle), lu à travers le cache."""
+    return user_cache().directory()
+
+
+def invalidate_user(user_id: Optional[int] = None):
+    user_cache().invalidate(user_id)
+
+
+def invalidate_user_directory():
+    """Oublie l'annuaire (nouveaux utilisateurs insérés sans passer par les signaux)."""
+    user_cache().invalidate_directory()
+
+
+@post_save(sender=User)
+def _user_saved(sender, instance, created):
+    invalidate_user(instance.id)
+
+
+@post_delete(sender=User)
+def _user_deleted(sender, instance):
+    invalidate_user(instance.id)
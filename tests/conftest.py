@@ -1,7 +1,10 @@
 # conftest.py
 import pytest
 from peewee import SqliteDatabase, Model
-from crm.models.models import User, Client, Contrat, Event
+from crm.cli_commands.cli_permissions import reset_session
+from crm.cli_commands.cli_session import save_session
+from crm.models.models import User, Client, Contrat, Event, Tombstone, db
+from crm.models.user_cache import reset_user_cache
 
 # Créer une instance de base de données en mémoire pour les tests
 test_database = SqliteDatabase(':memory:')
@@ -10,16 +13,52 @@ class TestModel(Model):
     class Meta:
         database = test_database
 
+# Jeton de session dans un répertoire temporaire, signé avec une clé de test
+@pytest.fixture(autouse=True)
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRM_SESSION_DIR", str(tmp_path / "session"))
+    monkeypatch.setenv("SESSION_SECRET", "test-secret")
+    # Pas de requête DNS dans les tests
+    monkeypatch.setenv("EMAIL_VALIDATION", "syntax")
+    return tmp_path / "session"
+
+
+# Coût argon2 minimal pour les tests qui hachent des mots de passe
+@pytest.fixture
+def fast_argon2(monkeypatch):
+    monkeypatch.setenv("ARGON2_TIME_COST", "1")
+    monkeypatch.setenv("ARGON2_MEMORY_COST", "8")
+    monkeypatch.setenv("ARGON2_PARALLELISM", "1")
+
+
 # Utiliser une fixture pour configurer la base de données avant chaque test
 @pytest.fixture(autouse=True)
 def setup_database():
     # Connecter la base de données de test
-    test_database.bind([User, Client, Contrat, Event], bind_refs=False, bind_backrefs=False)
+    test_database.bind([User, Client, Contrat, Event, Tombstone], bind_refs=False, bind_backrefs=False)
+    # Les commandes utilisent aussi `db` directement (ex. db.atomic())
+    db.initialize(test_database)
     test_database.connect()
-    test_database.create_tables([User, Client, Contrat, Event])
+    test_database.create_tables([User, Client, Contrat, Event, Tombstone])
+    reset_session()
+    # Les identifiants repartent de 1 à chaque test : le cache des utilisateurs aussi.
+    reset_user_cache()
 
     yield
 
     # Nettoyer la base de données après chaque test
-    test_database.drop_tables([User, Client, Contrat, Event])
+    test_database.drop_tables([User, Client, Contrat, Event, Tombstone])
     test_database.close()
+
+
+# Fixture pour simuler la connexion d'un utilisateur
+@pytest.fixture
+def login_as():
+    def _login_as(user):
+        save_session(user.id, user.username, user.email, user.role)
+        reset_session()
+        return user
+
+    yield _login_as
+
+    reset_session()
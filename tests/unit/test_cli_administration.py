@@ -0,0 +1,186 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Contrat, Event
+from datetime import datetime
+from playhouse.test_utils import count_queries
+import pytest
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def admin(login_as):
+    return login_as(User.create(username="admin", email="admin@example.com", role="ADMINISTRATION", password="x"))
+
+
+@pytest.fixture
+def client(admin):
+    commercial = User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x")
+    return Client.create(name="Client", email="client@example.com", commercial_contact=commercial)
+
+
+def create_contrat(client, author):
+    return Contrat.create(client=client, start_date=datetime(2030, 1, 1), end_date=datetime(2030, 12, 31),
+                          price=1000, contrat_author=author)
+
+
+def test_add_contrat_queries(admin, client):
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "add-contrat"],
+                               input=f"{client.id}\nOui\nNon\n2030-01-01\n2030-12-31\n1000\n")
+
+    assert "ajouté avec succès" in result.output
+    # Existence du client, contrat en cours, lecture du client + insertion
+    assert counter.count == 4
+
+
+def test_update_contrat_fetches_contrat_and_author_in_one_query(admin, client):
+    contrat = create_contrat(client, admin)
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "update-contrat"],
+                               input=f"{contrat.id}\nEN_COURS\n2030-01-01\n2030-06-30\n2000\nOui\nOui\n")
+
+    assert f"Contrat {contrat.id} mis à jour avec succès." in result.output
+    # Lecture contrôlée + BEGIN + mise à jour
+    assert counter.count == 3
+    assert Contrat.get_by_id(contrat.id).price == 2000
+
+
+def test_update_contrat_of_another_author_is_refused(admin, client):
+    other = User.create(username="other", email="other@example.com", role="ADMINISTRATION", password="x")
+    contrat = create_contrat(client, other)
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "update-contrat"], input=f"{contrat.id}\n")
+
+    assert "Accès refusé" in result.output
+    assert counter.count == 1
+
+
+def test_delete_contrat_queries(admin, client):
+    contrat = create_contrat(client, admin)
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "delete-contrat"], input=f"{contrat.id}\n")
+
+    assert f"Contrat {contrat.id} supprimé avec succès." in result.output
+    # Lecture contrôlée + BEGIN + pierre tombale (crm sync) + suppression
+    assert counter.count == 4
+
+
+def test_delete_missing_contrat(admin):
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "delete-contrat"], input="999\n")
+
+    assert "Contrat non trouvé." in result.output
+    assert counter.count == 1
+
+
+def test_sweep_contracts_terminates_expired_paid_contracts_in_batches(admin, client):
+    dates = {"start_date": datetime(2020, 1, 1), "end_date": datetime(2020, 12, 31)}
+    expired = []
+    for i in range(5):
+        other = Client.create(name=f"Client {i}", email=f"client{i}@example.com", commercial_contact=client.commercial_contact)
+        contrat = Contrat.create(client=other, price=1, contrat_author=admin, **dates)
+        expired.append(contrat.id)
+    Contrat.update(payment_received=True).where(Contrat.id.in_(expired)).execute()
+    unpaid = Contrat.create(client=client, price=1, contrat_author=admin, **dates)
+    running = create_contrat(client, admin)
+
+    result = runner.invoke(app, ["administration", "sweep-contracts", "--batch-size", "2"])
+
+    assert "5 contrat(s) passé(s) au statut TERMINE" in result.output
+    assert "(3 lot(s))" in result.output
+    statuses = {c.id: c.status for c in Contrat.select()}
+    assert all(statuses[contrat_id] == "TERMINE" for contrat_id in expired)
+    assert statuses[unpaid.id] == statuses[running.id] == "EN_COURS"
+
+    # Idempotente : une seconde exécution ne modifie rien
+    assert "0 contrat(s)" in runner.invoke(app, ["administration", "sweep-contracts"]).output
+
+
+def test_sweep_contracts_requires_an_administrator(login_as, client):
+    contrat = Contrat.create(client=client, price=1, contrat_author=client.commercial_contact,
+                             start_date=datetime(2020, 1, 1), end_date=datetime(2020, 12, 31))
+    Contrat.update(payment_received=True).execute()
+    login_as(client.commercial_contact)
+
+    result = runner.invoke(app, ["administration", "sweep-contracts"])
+
+    assert "Accès refusé" in result.output and result.exit_code == 1
+    assert Contrat.get_by_id(contrat.id).status == "EN_COURS"
+
+
+def test_expired_paid_contrat_is_created_terminated(admin, client):
+    contrat = Contrat.create(client=client, price=1, contrat_author=admin, payment_received=True,
+                             start_date="2020-01-01", end_date="2020-06-30")
+
+    assert Contrat.get_by_id(contrat.id).status == "TERMINE"
+
+
+def test_balance_support_spreads_events_without_overlap(admin, client):
+    contrat = create_contrat(client, admin)
+    alice = User.create(username="alice", email="alice@example.com", role="SUPPORT", password="x")
+    bob = User.create(username="bob", email="bob@example.com", role="SUPPORT", password="x")
+    Event.create(contrat=contrat, support_contact=alice, start_date=datetime(2030, 3, 1),
+                 end_date=datetime(2030, 3, 2), attendees=100)
+    # Deux événements le 2 mars (alice est déjà prise), deux autres plus tard
+    pending = [Event.create(contrat=contrat, start_date=datetime(2030, 3, day), end_date=datetime(2030, 3, day),
+                            attendees=attendees)
+               for day, attendees in ((2, 50), (2, 40), (10, 80), (20, 10))]
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "balance-support", "--dry-run"])
+
+    assert "Plan : 3 événement(s) sur 4" in result.output
+    assert "1 événement(s) sans membre du support disponible" in result.output
+    # Membres du support, événements non assignés, événements assignés
+    assert counter.count == 3
+    assert Event.select().where(Event.support_contact.is_null()).count() == 4
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["administration", "balance-support"])
+
+    assert "3 événement(s) assigné(s)." in result.output
+    # BEGIN + un UPDATE par membre du support
+    assert counter.count == 3 + 3
+    owners = [Event.get_by_id(event.id).support_contact_id for event in pending]
+    # Les plus grands d'abord, au membre le moins chargé parmi ceux qui sont libres.
+    assert owners == [bob.id, None, bob.id, alice.id]
+
+
+def test_apply_plan_skips_events_that_now_overlap(admin, client):
+    from crm.models.balancing import apply_plan, load_workload, plan_balance
+
+    contrat = create_contrat(client, admin)
+    alice = User.create(username="alice", email="alice@example.com", role="SUPPORT", password="x")
+    planned = Event.create(contrat=contrat, start_date=datetime(2030, 3, 2), end_date=datetime(2030, 3, 3),
+                           attendees=10)
+    plan = plan_balance(*load_workload())
+    # Assigné à alice (ex. support assign-support-to-event) après le calcul du plan
+    Event.create(contrat=contrat, support_contact=alice, start_date=datetime(2030, 3, 3),
+                 end_date=datetime(2030, 3, 4), attendees=5)
+
+    assert plan.assignments == {alice.id: [planned.id]}
+    assert apply_plan(plan) == 0
+    assert Event.get_by_id(planned.id).support_contact_id is None
+
+
+def test_apply_plan_updates_events_in_batches(admin, client, monkeypatch):
+    from crm.models import balancing
+
+    contrat = create_contrat(client, admin)
+    alice = User.create(username="alice", email="alice@example.com", role="SUPPORT", password="x")
+    pending = [Event.create(contrat=contrat, start_date=datetime(2030, 3, day), end_date=datetime(2030, 3, day),
+                            attendees=10)
+               for day in range(1, 6)]
+    plan = balancing.plan_balance(*balancing.load_workload())
+    monkeypatch.setattr(balancing, "APPLY_BATCH_SIZE", 2)
+
+    with count_queries() as counter:
+        assert balancing.apply_plan(plan) == 5
+
+    # BEGIN + trois lots de deux identifiants au plus
+    assert counter.count == 1 + 3
+    assert all(Event.get_by_id(event.id).support_contact_id == alice.id for event in pending)
@@ -1,30 +1,167 @@
 from typer.testing import CliRunner
-from unittest.mock import patch
 import crm.cli_commands.cli_auth as cli_auth
-import json
-import os
+from crm.cli_commands.cli_passwords import hash_password, verify_password
+from crm.cli_commands.cli_session import decode_token, load_session, save_session, session_path
+from crm.models.models import User
+from playhouse.test_utils import count_queries
+import bcrypt
+import jwt
 
 runner = CliRunner()
 
 def test_logout_user_logged_in():
-    # Prépare un fichier config.json pour simuler un utilisateur connecté
-    with open("config.json", "w") as f:
-        json.dump({"user_id": 1, "username": "testuser", "email": "test@example.com", "role": "admin"}, f)
+    # Enregistre un jeton pour simuler un utilisateur connecté
+    save_session(1, "testuser", "test@example.com", "admin")
 
     # Exécute la commande logout
     result = runner.invoke(cli_auth.app, ["logout"])
 
-    # Vérifie que le fichier config.json a été supprimé et que la sortie est correcte
-    assert not os.path.exists("config.json")
+    # Vérifie que le jeton a été supprimé et que la sortie est correcte
+    assert not session_path().exists()
     assert "Déconnexion réussie." in result.output
 
 def test_logout_no_user_logged_in():
-    # Si le fichier config.json n'existe pas
-    if os.path.exists("config.json"):
-        os.remove("config.json")
+    # Aucun jeton de session
+    assert not session_path().exists()
 
     # Exécute la commande logout
     result = runner.invoke(cli_auth.app, ["logout"])
 
     # Vérifie la sortie pour un utilisateur non connecté
     assert "Aucun utilisateur n'est actuellement connecté." in result.output
+
+def test_session_token_is_signed_and_private():
+    save_session(7, "testuser", "test@example.com", "SUPPORT")
+
+    session = load_session()
+    assert {key: session[key] for key in ("user_id", "username", "email", "role")} == \
+        {"user_id": 7, "username": "testuser", "email": "test@example.com", "role": "SUPPORT"}
+    assert session_path().stat().st_mode & 0o077 == 0
+
+    # Un jeton modifié (rôle falsifié) est refusé
+    claims = jwt.decode(session_path().read_text(), options={"verify_signature": False})
+    session_path().write_text(jwt.encode({**claims, "role": "ADMINISTRATION"}, "other-secret", algorithm="HS256"))
+    assert load_session() is None
+
+def test_expired_token_is_refused(monkeypatch):
+    monkeypatch.setenv("SESSION_TTL", "-1")
+    save_session(7, "testuser", "test@example.com", "SUPPORT")
+
+    assert load_session() is None
+
+def test_token_is_refreshed_near_expiry(monkeypatch):
+    monkeypatch.setenv("SESSION_TTL", "60")
+    save_session(7, "testuser", "test@example.com", "SUPPORT")
+    first = decode_token(session_path().read_text())
+
+    # Moins d'une heure avant l'expiration : le jeton est renouvelé avec une nouvelle échéance
+    monkeypatch.setenv("SESSION_TTL", "3600")
+    load_session()
+    refreshed = decode_token(session_path().read_text())
+
+    assert refreshed["exp"] > first["exp"]
+    assert refreshed["auth_time"] == first["auth_time"]
+
+def test_session_never_outlives_max_age(monkeypatch):
+    import time
+
+    monkeypatch.setenv("SESSION_MAX_AGE", "600")
+    auth_time = int(time.time()) - 500
+    save_session(7, "testuser", "test@example.com", "SUPPORT", auth_time)
+
+    # Renouvellement plafonné à auth_time + SESSION_MAX_AGE, au lieu de now + SESSION_TTL
+    assert decode_token(session_path().read_text())["exp"] == auth_time + 600
+    assert load_session() is not None
+
+    # Jeton émis avec une échéance plus longue : refusé une fois l'âge maximal atteint
+    claims = {"sub": "7", "iat": auth_time - 200, "auth_time": auth_time - 200, "exp": 2**31}
+    session_path().write_text(jwt.encode(claims, "test-secret", algorithm="HS256"))
+    assert load_session() is None
+
+def test_concurrent_first_runs_share_the_signing_key(monkeypatch):
+    from crm.cli_commands import cli_session
+
+    monkeypatch.delenv("SESSION_SECRET")
+    key_path = cli_session.session_dir() / cli_session.SECRET_FILE
+    read_key = cli_session.read_key
+
+    def created_meanwhile(path):
+        # Un autre processus crée la clé entre la lecture manquée et la création exclusive.
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("cle-de-l-autre-processus")
+            raise FileNotFoundError(path)
+        return read_key(path)
+
+    monkeypatch.setattr(cli_session, "read_key", created_meanwhile)
+    assert cli_session.signing_key() == "cle-de-l-autre-processus"
+    assert key_path.read_text() == "cle-de-l-autre-processus"
+
+def test_unsigned_token_is_refused():
+    token = jwt.encode({"sub": "7", "role": "ADMINISTRATION", "exp": 2**31}, None, algorithm="none")
+
+    assert decode_token(token) is None
+    assert decode_token("pas.un.jeton") is None
+    assert decode_token(jwt.encode({"sub": "7", "exp": 2**31}, "test-secret", algorithm="HS256"))["sub"] == "7"
+
+
+def test_tampered_or_non_canonical_tokens_are_refused():
+    token = jwt.encode({"sub": "7", "role": "SUPPORT", "exp": 2**31}, "test-secret", algorithm="HS256")
+    header, payload, signature = token.split(".")
+    forged = jwt.encode({"sub": "7", "role": "ADMINISTRATION", "exp": 2**31}, "test-secret", algorithm="HS256")
+
+    assert decode_token(token)["role"] == "SUPPORT"
+    # Données d'un autre jeton sous cette signature, signature complétée ou altérée
+    assert decode_token(f"{header}.{forged.split('.')[1]}.{signature}") is None
+    assert decode_token(f"{token}==") is None
+    assert decode_token(f"{header}.{payload}.{signature[:-2]}!{signature[-1]}") is None
+    # En-tête d'un autre type de jeton, jeton pas encore valable
+    assert decode_token(jwt.encode({"sub": "7", "exp": 2**31}, "test-secret", headers={"typ": "at+jwt"})) is None
+    assert decode_token(jwt.encode({"sub": "7", "exp": 2**31, "nbf": 2**31 - 1}, "test-secret")) is None
+
+def test_login_single_query(fast_argon2):
+    user = User.create(username="u", email="u@example.com", role="SUPPORT", password=hash_password("secret"))
+
+    with count_queries() as counter:
+        result = runner.invoke(cli_auth.app, ["authenticate", "--email", "u@example.com", "--password", "secret"])
+
+    assert "Authentification réussie." in result.output
+    assert counter.count == 1
+    assert load_session()["user_id"] == user.id
+
+def test_login_ignores_users_cached_before_a_password_change(fast_argon2):
+    from crm.models.user_cache import cached_user
+
+    user = User.create(username="u", email="u@example.com", role="SUPPORT", password=hash_password("secret"))
+    assert cached_user(email="u@example.com").id == user.id
+    # Changement fait par un autre processus : aucun signal ne parvient à ce cache.
+    User.update(password=hash_password("nouveau")).where(User.id == user.id).execute()
+
+    assert cli_auth.verify_user("u@example.com", "secret") is None
+    assert cli_auth.verify_user("u@example.com", "nouveau").id == user.id
+
+def test_login_wrong_password(fast_argon2):
+    User.create(username="u", email="u@example.com", role="SUPPORT", password=hash_password("secret"))
+
+    result = runner.invoke(cli_auth.app, ["authenticate", "--email", "u@example.com", "--password", "wrong"])
+
+    assert "Email ou mot de passe incorrecte !" in result.output
+    assert load_session() is None
+
+def test_login_upgrades_bcrypt_hash(fast_argon2):
+    legacy = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode('utf-8')
+    user = User.create(username="u", email="u@example.com", role="SUPPORT", password=legacy)
+
+    assert cli_auth.verify_user("u@example.com", "secret").id == user.id
+
+    upgraded = User.get_by_id(user.id).password
+    assert upgraded.startswith("$argon2id$")
+    assert verify_password("secret", upgraded) == (True, False)
+
+def test_out_of_policy_argon2_hash_is_rehashed(fast_argon2, monkeypatch):
+    check = verify_password("secret", hash_password("secret"))
+    assert check == (True, False)
+
+    old = hash_password("secret")
+    monkeypatch.setenv("ARGON2_TIME_COST", "2")
+    assert verify_password("secret", old) == (True, True)
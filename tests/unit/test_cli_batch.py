@@ -0,0 +1,95 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Contrat, Event
+from datetime import datetime
+import json
+import pytest
+
+runner = CliRunner(mix_stderr=False)
+
+
+def write_operations(path, operations):
+    path.write_text("".join(json.dumps(operation) + "\n" for operation in operations), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def commercial(login_as, mocker):
+    mocker.patch('crm.cli_commands.cli_schema.validate_emails', side_effect=lambda emails: ["@" in email for email in emails])
+    return login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+
+
+def test_batch_runs_operations_and_reports_each_result(commercial, tmp_path):
+    other = User.create(username="other", email="other@example.com", role="COMMERCIAL", password="x")
+    foreign = Client.create(name="Autre", email="autre@example.com", phone="0102030405", commercial_contact=other)
+    source = write_operations(tmp_path / "ops.jsonl", [
+        {"op": "add_client", "name": "ACME", "email": "acme@example.com", "phone": "0601020304"},
+        {"op": "add_client", "name": "ACME", "email": "acme2@example.com", "phone": "0601020304"},
+        {"op": "update_client", "id": foreign.id, "phone": "0699999999"},
+        {"op": "add_contrat", "client_id": foreign.id},
+        {"op": "inconnue"},
+    ])
+
+    result = runner.invoke(app, ["batch", str(source), "--transaction-size", "2"])
+
+    results = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["ok"] for r in results] == [True, False, False, False, False]
+    assert results[0]["id"] == Client.get(Client.name == "ACME").id
+    assert results[1]["error"] == "Ce nom de client existe déjà."
+    assert "Accès refusé" in results[2]["error"] and "Accès refusé" in results[3]["error"]
+    assert "5 opération(s) : 1 réussie(s), 4 en échec" in result.stderr
+    assert result.exit_code == 1
+    assert Client.get_by_id(foreign.id).phone == "0102030405"
+
+
+def test_batch_reports_malformed_and_crashing_operations_and_continues(commercial, tmp_path, monkeypatch):
+    from crm.cli_commands import cli_batch
+
+    def crash(session, fields):
+        raise ValueError("panne")
+
+    monkeypatch.setitem(cli_batch.OPERATIONS, "delete_client", cli_batch.Operation("COMMERCIAL", crash))
+    source = write_operations(tmp_path / "ops.jsonl", [
+        {"op": ["x"]},
+        {"op": "delete_client", "id": 1},
+        {"op": "add_client", "name": "ACME", "email": "acme@example.com", "phone": "0601020304"},
+    ])
+
+    result = runner.invoke(app, ["batch", str(source)])
+
+    results = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["ok"] for r in results] == [False, False, True]
+    assert results[0]["error"] == "Opération invalide : ['x'] (nom d'opération attendu)."
+    assert results[1]["error"] == "Erreur inattendue : panne"
+    assert Client.select().where(Client.name == "ACME").exists()
+
+
+def test_batch_failed_operation_does_not_roll_back_its_transaction(login_as, tmp_path):
+    support = login_as(User.create(username="support", email="support@example.com", role="SUPPORT", password="x"))
+    commercial = User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x")
+    client = Client.create(name="Client", email="client@example.com", commercial_contact=commercial)
+    contrat = Contrat.create(client=client, start_date=datetime(2030, 1, 1), end_date=datetime(2030, 12, 31),
+                             price=1000, contrat_author=commercial)
+    event = Event.create(contrat=contrat, start_date=datetime(2030, 2, 1), end_date=datetime(2030, 2, 2), attendees=10)
+    source = write_operations(tmp_path / "ops.jsonl", [
+        {"op": "assign_support_to_event", "id": event.id},
+        {"op": "update_event", "id": event.id, "attendees": 50, "notes": "Mis à jour"},
+        {"op": "update_event", "id": event.id, "start_date": "2031-01-01"},
+        {"op": "assign_support_to_event", "id": 999},
+    ])
+
+    result = runner.invoke(app, ["batch", str(source)])
+
+    assert [json.loads(line)["ok"] for line in result.stdout.splitlines()] == [True, True, False, False]
+    event = Event.get_by_id(event.id)
+    assert (event.support_contact_id, event.attendees, event.notes) == (support.id, 50, "Mis à jour")
+    assert event.start_date == datetime(2030, 2, 1)
+
+
+def test_batch_requires_authentication(tmp_path):
+    source = write_operations(tmp_path / "ops.jsonl", [{"op": "delete_event", "id": 1}])
+
+    result = runner.invoke(app, ["batch", str(source)])
+
+    assert result.exit_code == 1
+    assert "Accès refusé" in result.stderr
@@ -0,0 +1,124 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Contrat, Event
+from datetime import datetime
+from playhouse.test_utils import count_queries
+import json
+import pytest
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def commercial(mocker, login_as):
+    # Simule un commercial connecté et une validation d'email hors ligne
+    mocker.patch('crm.cli_commands.cli_commercial.is_valid_email', side_effect=lambda email: "@" in email)
+    return login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+
+
+def test_import_clients_inserts_valid_rows_and_rejects_the_others(commercial, tmp_path):
+    Client.create(name="Existant", email="existant@example.com", phone="0102030405", commercial_contact=commercial)
+    source = tmp_path / "clients.csv"
+    source.write_text(
+        "name,email,phone,company_name\n"
+        "Alice,alice@example.com,0601020304,ACME\n"
+        "Bob,pas-un-email,0601020304,\n"
+        "Existant,autre@example.com,0601020304,\n"
+        "Carole,alice@example.com,0601020304,\n"
+        "David,david@example.com,0601020304,\n",
+        encoding="utf-8"
+    )
+
+    result = runner.invoke(app, ["commercial", "import-clients", str(source), "--batch-size", "2"])
+
+    assert "2 client(s) importé(s), 3 ligne(s) rejetée(s)" in result.output
+    assert sorted(c.name for c in Client.select()) == ["Alice", "David", "Existant"]
+    assert Client.get(Client.name == "Alice").commercial_contact_id == commercial.id
+
+    rejected = [json.loads(line) for line in (tmp_path / "clients.csv.rejects.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [r["line"] for r in rejected] == [3, 4, 5]
+
+
+def test_import_clients_reads_jsonl(commercial, tmp_path):
+    source = tmp_path / "clients.jsonl"
+    source.write_text(
+        json.dumps({"name": "Alice", "email": "alice@example.com", "phone": "0601020304"}) + "\n"
+        "pas du json\n",
+        encoding="utf-8"
+    )
+
+    result = runner.invoke(app, ["commercial", "import-clients", str(source)])
+
+    assert "1 client(s) importé(s), 1 ligne(s) rejetée(s)" in result.output
+    assert Client.select().count() == 1
+
+
+@pytest.fixture
+def contrat(commercial):
+    client = Client.create(name="Client", email="client@example.com", phone="0102030405", commercial_contact=commercial)
+    return Contrat.create(client=client, start_date=datetime(2030, 1, 1), end_date=datetime(2030, 12, 31),
+                          price=1000, is_signed=True, payment_received=True, contrat_author=commercial)
+
+
+def test_add_client_queries(commercial, mocker):
+    mocker.patch('crm.cli_commands.cli_input_validators.is_valid_email', return_value=True)
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["commercial", "add-client"], input="Nouveau\nnouveau@example.com\n0601020304\nACME\n")
+
+    assert "Client Nouveau ajouté avec succès." in result.output
+    # Vérification du nom + insertion
+    assert counter.count == 2
+
+
+def test_update_client_fetches_client_and_ownership_in_one_query(contrat):
+    client_id = contrat.client_id
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["commercial", "update-client"],
+                               input=f"{client_id}\nRenommé\nclient@example.com\n0102030405\nACME\n")
+
+    assert "Client Renommé mis à jour avec succès." in result.output
+    # Lecture contrôlée + BEGIN + mise à jour
+    assert counter.count == 3
+
+
+def test_update_client_of_another_commercial_is_refused(contrat):
+    other = User.create(username="other", email="other@example.com", role="COMMERCIAL", password="x")
+    client = Client.create(name="Autre", email="autre@example.com", commercial_contact=other)
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["commercial", "update-client"], input=f"{client.id}\n")
+
+    assert "Accès refusé" in result.output
+    assert counter.count == 1
+
+
+def test_delete_client_queries(commercial):
+    client = Client.create(name="A supprimer", email="supprimer@example.com", commercial_contact=commercial)
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["commercial", "delete-client"], input=f"{client.id}\n")
+
+    assert f"Client {client.id} supprimé avec succès." in result.output
+    # Lecture contrôlée + BEGIN + pierre tombale (crm sync) + suppression
+    assert counter.count == 4
+
+
+def test_delete_missing_client(commercial):
+    with count_queries() as counter:
+        result = runner.invoke(app, ["commercial", "delete-client"], input="999\n")
+
+    assert "Client non trouvé." in result.output
+    assert counter.count == 1
+
+
+def test_add_event_fetches_contrat_and_client_in_one_query(contrat):
+    with count_queries() as counter:
+        result = runner.invoke(app, ["commercial", "add-event"],
+                               input=f"{contrat.id}\n2030-02-01\n2030-02-02\n100\nNotes\n")
+
+    assert "ajouté avec succès" in result.output
+    # Lecture contrôlée du contrat et du client + insertion de l'événement
+    assert counter.count == 2
+    assert Event.get().contrat_id == contrat.id
@@ -0,0 +1,125 @@
+from crm.cli_commands import cli_daemon
+from crm.cli_commands.cli_daemon import Daemon
+from crm.cli_commands.cli_daemon_client import forward, request
+from crm.models.models import User, Client, Contrat, Event, Tombstone, db
+from peewee import SqliteDatabase
+import io
+import sys
+import threading
+import time
+import pytest
+
+MODELS = [User, Client, Contrat, Event, Tombstone]
+
+
+@pytest.fixture
+def file_database(tmp_path):
+    # Le démon sert les requêtes dans d'autres fils : la base en mémoire des tests n'y est pas visible.
+    database = SqliteDatabase(str(tmp_path / "daemon.db"))
+    database.bind(MODELS)
+    db.initialize(database)
+    database.create_tables(MODELS)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch, file_database):
+    for name in ("stdout", "stderr", "stdin"):
+        monkeypatch.setattr(sys, name, getattr(sys, name))
+    for name in ("STDOUT", "STDERR", "STDIN"):
+        monkeypatch.setattr(cli_daemon, name, None)
+
+    path = tmp_path / "crm.sock"
+    server = Daemon(path, workers=2)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    while not path.exists():
+        time.sleep(0.01)
+    yield path
+    server.stop()
+    thread.join(5)
+
+
+@pytest.fixture
+def commercial(login_as, file_database, mocker):
+    mocker.patch('crm.cli_commands.cli_input_validators.is_valid_email', return_value=True)
+    return login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+
+
+def run(path, args, stdin=""):
+    # La capture de pytest remplace sys.stdout au début du test : on réinstalle les flux du démon.
+    sys.stdout, sys.stderr, sys.stdin = cli_daemon.STDOUT, cli_daemon.STDERR, cli_daemon.STDIN
+    out, err = io.StringIO(), io.StringIO()
+    code = forward(args, path, stdin=io.StringIO(stdin) if isinstance(stdin, str) else stdin, stdout=out, stderr=err)
+    return code, out.getvalue(), err.getvalue()
+
+
+def test_daemon_runs_commands_and_relays_prompts(daemon, commercial):
+    code, out, _ = run(daemon, ["commercial", "add-client"], "ACME\nacme@example.com\n0601020304\nCorp\n")
+
+    assert code == 0
+    assert "Client ACME ajouté avec succès." in out
+    assert Client.get(Client.name == "ACME").commercial_contact_id == commercial.id
+
+    code, out, _ = run(daemon, ["list", "clients"])
+    assert code == 0 and "ACME" in out
+    assert request({"type": "ping"}, daemon)["requests"] == 2
+
+
+def test_daemon_reports_exit_codes_and_usage_errors(daemon):
+    code, _, err = run(daemon, ["export", "clients"])
+    assert code == 1 and "Accès refusé" in err
+
+    code, _, err = run(daemon, ["support", "commande-inconnue"])
+    assert code == 2 and "No such command" in err
+
+
+def test_daemon_serves_requests_concurrently(daemon, commercial):
+    class WaitingInput(io.StringIO):
+        """Entrée qui bloque la première question tant que l'autre requête n'est pas terminée."""
+        released = threading.Event()
+
+        def readline(self, *args):
+            self.released.wait(5)
+            return super().readline(*args)
+
+    Client.create(name="Existant", email="existant@example.com", commercial_contact=commercial)
+    slow = threading.Thread(target=run, args=(daemon, ["commercial", "add-client"],
+                                              WaitingInput("Lent\nlent@example.com\n0601020304\nCorp\n")))
+    slow.start()
+
+    code, out, _ = run(daemon, ["list", "clients"])
+    assert code == 0 and "Existant" in out and "Lent" not in out
+
+    WaitingInput.released.set()
+    slow.join(5)
+    assert Client.select().where(Client.name == "Lent").exists()
+
+
+def test_client_falls_back_without_daemon_or_from_another_directory(daemon, tmp_path, monkeypatch):
+    assert forward(["list", "clients"], tmp_path / "absent.sock") is None
+    assert forward(["shell"], daemon) is None
+
+    monkeypatch.chdir(tmp_path)
+    assert forward(["list", "clients"], daemon) is None
+
+
+def test_sessions_are_kept_per_thread(commercial):
+    from crm.cli_commands.cli_permissions import Session, get_session, reset_session, use_session
+
+    session = get_session()
+    seen = []
+
+    def other_request():
+        # Une autre requête du démon change d'identité puis se déconnecte.
+        use_session(Session({"user_id": 99, "role": "SUPPORT"}))
+        seen.append(get_session().user_id)
+        reset_session()
+
+    thread = threading.Thread(target=other_request)
+    thread.start()
+    thread.join(5)
+
+    assert seen == [99]
+    assert get_session() is session and session.user_id == commercial.id
@@ -0,0 +1,53 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Contrat, Event
+from datetime import datetime
+import json
+import pytest
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def dataset(login_as):
+    alice = User.create(username="alice", email="alice@example.com", role="COMMERCIAL", password="x")
+    bob = User.create(username="bob", email="bob@example.com", role="COMMERCIAL", password="x")
+    client_a = Client.create(name="A", email="a@example.com", commercial_contact=alice)
+    client_b = Client.create(name="B", email="b@example.com", commercial_contact=bob)
+    contrat_a = Contrat.create(client=client_a, start_date=datetime(2024, 1, 1), end_date=datetime(2024, 6, 1),
+                               price=100, contrat_author=alice)
+    contrat_b = Contrat.create(client=client_b, status="TERMINE", start_date=datetime(2024, 3, 1),
+                               end_date=datetime(2024, 4, 1), price=200, contrat_author=bob)
+    Event.create(contrat=contrat_a, start_date=datetime(2024, 2, 1), end_date=datetime(2024, 2, 2), attendees=10)
+    Event.create(contrat=contrat_b, start_date=datetime(2024, 3, 5), end_date=datetime(2024, 3, 6), attendees=20)
+    login_as(alice)
+    return alice, bob
+
+
+def test_export_clients_csv_filtered_by_commercial(dataset):
+    alice, _ = dataset
+
+    result = runner.invoke(app, ["export", "clients", "--commercial", str(alice.id)])
+
+    lines = result.output.splitlines()
+    assert lines[0].startswith("id,name,email")
+    assert len(lines) == 2 and ",A,a@example.com," in lines[1]
+
+
+def test_export_events_ndjson_with_status_and_dates(dataset, tmp_path):
+    output = tmp_path / "events.ndjson"
+
+    result = runner.invoke(app, ["export", "events", "--format", "ndjson", "--status", "termine",
+                                 "--since", "2024-03-01", "--until", "2024-03-05", "-o", str(output)])
+
+    assert "1 ligne(s) exportée(s)" in result.output
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [row["attendees"] for row in rows] == [20]
+    assert rows[0]["start_date"].startswith("2024-03-05")
+
+
+def test_export_requires_authentication():
+    result = runner.invoke(app, ["export", "contrats"])
+
+    assert result.exit_code == 1
+    assert "Accès refusé" in result.output
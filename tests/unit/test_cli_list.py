@@ -0,0 +1,61 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Contrat, Event
+from crm.models.queries import keyset_page, unassigned_events
+from datetime import datetime
+import pytest
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def users():
+    commercial = User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x")
+    other = User.create(username="other", email="other@example.com", role="COMMERCIAL", password="x")
+    support = User.create(username="support", email="support@example.com", role="SUPPORT", password="x")
+    return commercial, other, support
+
+
+def test_list_clients_shows_only_own_clients_page_by_page(users, login_as):
+    commercial, other, _ = users
+    for i in range(5):
+        Client.create(name=f"Client {i}", email=f"client{i}@example.com", commercial_contact=commercial)
+    Client.create(name="Autre", email="autre@example.com", commercial_contact=other)
+    login_as(commercial)
+
+    first = runner.invoke(app, ["list", "clients", "--limit", "3"])
+    assert "Client 2" in first.output and "Client 3" not in first.output
+    assert "Page suivante : --after 3" in first.output
+
+    second = runner.invoke(app, ["list", "clients", "--limit", "3", "--after", "3"])
+    assert "Client 3" in second.output and "Client 4" in second.output
+    assert "Autre" not in second.output
+    # Dernière page : pas de curseur
+    assert "Page suivante" not in second.output
+    assert "Page suivante" not in runner.invoke(app, ["list", "clients", "--limit", "5"]).output
+
+
+def test_list_unassigned_events_in_start_date_order(users, login_as):
+    commercial, _, support = users
+    client = Client.create(name="Client", email="client@example.com", commercial_contact=commercial)
+    contrat = Contrat.create(client=client, start_date=datetime(2024, 1, 1), end_date=datetime(2024, 12, 31),
+                             price=100, contrat_author=commercial)
+    late = Event.create(contrat=contrat, start_date=datetime(2024, 6, 1), end_date=datetime(2024, 6, 2), attendees=1)
+    early = Event.create(contrat=contrat, start_date=datetime(2024, 2, 1), end_date=datetime(2024, 2, 2), attendees=2)
+    Event.create(contrat=contrat, support_contact=support, start_date=datetime(2024, 3, 1),
+                 end_date=datetime(2024, 3, 2), attendees=3)
+    login_as(support)
+
+    result = runner.invoke(app, ["list", "events", "--unassigned", "--all-pages"])
+
+    assert "2 ligne(s)." in result.output
+    assert result.output.index("2024-02-01") < result.output.index("2024-06-01")
+    assert "2024-03-01" not in result.output
+    assert [row[1] for row in keyset_page(unassigned_events().select(Event.start_date, Event.id),
+                                          [Event.start_date, Event.id], (early.start_date, early.id))] == [late.id]
+
+
+def test_list_requires_authentication():
+    result = runner.invoke(app, ["list", "contrats"])
+
+    assert "Accès refusé" in result.output
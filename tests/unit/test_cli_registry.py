@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules de la couche base de données qui ne doivent pas être importés
+# pour les commandes légères.
+HEAVY_MODULES = ["crm.models.models", "peewee", "psycopg2", "bcrypt", "argon2", "email_validator"]
+
+SCRIPT = """
+import sys
+from typer.testing import CliRunner
+from crm.__main__ import app
+CliRunner().invoke(app, {args!r})
+print(",".join(m for m in {modules!r} if m in sys.modules))
+"""
+
+
+def imported_heavy_modules(args):
+    # Un sous-processus est nécessaire : conftest.py importe déjà les modèles.
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(args=args, modules=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize("args", [["--help"], ["auth", "logout"], ["auth", "--help"]])
+def test_light_commands_do_not_import_database_layer(args):
+    assert imported_heavy_modules(args) == []
+
+
+def test_help_lists_all_subcommands():
+    from typer.testing import CliRunner
+    from crm.__main__ import app
+
+    result = CliRunner().invoke(app, ["--help"])
+
+    for name in ["user", "auth", "commercial", "administration", "support", "db", "list", "export", "batch", "shell", "daemon", "sync"]:
+        assert name in result.output
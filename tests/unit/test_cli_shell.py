@@ -0,0 +1,68 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.cli_commands import cli_permissions
+from crm.cli_commands.cli_shell import Shell
+from crm.models.models import User, Client
+import typer
+
+runner = CliRunner()
+
+
+def make_shell():
+    return Shell(typer.main.get_command(app))
+
+
+def test_shell_runs_commands_with_a_single_session_read(login_as, monkeypatch):
+    commercial = login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+    Client.create(name="ACME", email="acme@example.com", commercial_contact=commercial)
+
+    reads = []
+    read_session_file = cli_permissions.read_session_file
+    monkeypatch.setattr(cli_permissions, "read_session_file", lambda: reads.append(1) or read_session_file())
+
+    result = runner.invoke(app, ["shell"], input="list clients\nwhoami\nshell\nlist clients --limit 1\nexit\n")
+
+    assert result.output.count("ACME") == 2
+    assert "commercial (id" in result.output
+    assert "déjà dans le shell" in result.output
+    assert len(reads) == 1
+
+
+def test_shell_rereads_session_after_logout(login_as):
+    login_as(User.create(username="support", email="support@example.com", role="SUPPORT", password="x"))
+
+    result = runner.invoke(app, ["shell"], input="auth logout\nwhoami\n")
+
+    assert "Déconnexion réussie." in result.output
+    assert "Aucun utilisateur n'est actuellement connecté." in result.output
+
+
+def test_shell_users_lists_new_users_without_restarting(capsys):
+    User.create(username="admin", email="admin@example.com", role="ADMINISTRATION", password="x")
+    shell = make_shell()
+    shell.run_line("users")
+    # Ajouté après le chargement de l'annuaire : le signal post_save l'invalide, sans aide du shell
+    User.create(username="nouveau", email="nouveau@example.com", role="SUPPORT", password="x")
+    capsys.readouterr()
+
+    shell.run_line("users support")
+
+    output = capsys.readouterr().out
+    assert "nouveau" in output and "ADMINISTRATION" not in output
+
+
+def test_shell_keeps_running_after_usage_errors():
+    shell = make_shell()
+
+    assert shell.run_line("support commande-inconnue") is True
+    assert shell.run_line("'guillemet non fermé") is True
+    assert shell.run_line("quit") is False
+
+
+def test_shell_completion_candidates():
+    shell = make_shell()
+
+    assert "support" in shell.candidates([]) and "users" in shell.candidates([])
+    assert "shell" not in shell.candidates([])
+    assert "assign-support-to-event" in shell.candidates(["support"])
+    assert "--unassigned" in shell.candidates(["list", "events"])
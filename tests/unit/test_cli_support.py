@@ -0,0 +1,209 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Contrat, Event
+from datetime import datetime, timedelta
+from playhouse.test_utils import count_queries
+import pytest
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def support(login_as):
+    return login_as(User.create(username="support", email="support@example.com", role="SUPPORT", password="x"))
+
+
+@pytest.fixture
+def event(support):
+    commercial = User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x")
+    client = Client.create(name="Client", email="client@example.com", commercial_contact=commercial)
+    contrat = Contrat.create(client=client, start_date=datetime(2030, 1, 1), end_date=datetime(2030, 12, 31),
+                             price=1000, contrat_author=commercial)
+    return Event.create(contrat=contrat, start_date=datetime(2030, 2, 1), end_date=datetime(2030, 2, 2), attendees=10)
+
+
+def test_assign_support_to_event_queries(support, event):
+    with count_queries() as counter:
+        result = runner.invoke(app, ["support", "assign-support-to-event"], input=f"{event.id}\n")
+
+    assert "assigné à l'événement" in result.output
+    # Une seule mise à jour conditionnelle (événement non assigné)
+    assert counter.count == 1
+    assert Event.get_by_id(event.id).support_contact_id == support.id
+
+
+def test_assign_already_assigned_event(support, event):
+    other = User.create(username="other", email="other@example.com", role="SUPPORT", password="x")
+    Event.update(support_contact=other).execute()
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["support", "assign-support-to-event"], input=f"{event.id}\n")
+
+    assert "déjà assigné à un autre membre du support" in result.output
+    # Mise à jour sans effet + lecture du membre assigné
+    assert counter.count == 2
+
+
+def test_claim_next_hands_out_events_in_start_date_order(support, event):
+    later = Event.create(contrat=event.contrat, start_date=datetime(2030, 5, 1), end_date=datetime(2030, 5, 2),
+                         attendees=5)
+    other = User.create(username="other", email="other@example.com", role="SUPPORT", password="x")
+    Event.create(contrat=event.contrat, start_date=datetime(2030, 1, 15), end_date=datetime(2030, 1, 16),
+                 attendees=1, support_contact=other)
+
+    result = runner.invoke(app, ["support", "claim-next", "--count", "3"])
+
+    assert f"Événement {event.id} (contrat {event.contrat_id}, du 2030-02-01" in result.output
+    assert f"Événement {later.id} " in result.output
+    assert "Aucun événement non assigné." in result.output
+    assert Event.select().where(Event.support_contact == support.id).count() == 2
+
+
+def test_claim_next_skips_events_taken_meanwhile(support, event, monkeypatch):
+    from crm.models import claims
+
+    other = User.create(username="other", email="other@example.com", role="SUPPORT", password="x")
+    later = Event.create(contrat=event.contrat, start_date=datetime(2030, 5, 1), end_date=datetime(2030, 5, 2),
+                         attendees=5)
+    next_unassigned = claims.next_unassigned
+    reads = []
+
+    class StaleRead:
+        """Candidat lu, puis pris par un autre membre du support avant la mise à jour."""
+        def __init__(self, *args):
+            self.row = next_unassigned(*args).tuples().first()
+            reads.append(self.row[0])
+            if len(reads) == 1:
+                Event.update(support_contact=other).where(Event.id == self.row[0]).execute()
+
+        def tuples(self):
+            return self
+
+        def first(self):
+            return self.row
+
+    monkeypatch.setattr(claims, "next_unassigned", StaleRead)
+    assert claims.claim_with_conditional_update(support.id).event_id == later.id
+    assert reads == [event.id, later.id]
+    assert Event.get_by_id(event.id).support_contact_id == other.id
+    assert Event.get_by_id(later.id).support_contact_id == support.id
+
+
+def test_update_event_fetches_event_and_contrat_in_one_query(support, event):
+    Event.update(support_contact=support).execute()
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["support", "update-event"],
+                               input=f"{event.id}\n2030-03-01\n2030-03-02\n50\nNotes\n")
+
+    assert f"Événement ID {event.id} mis à jour avec succès." in result.output
+    # Lecture contrôlée (avec le contrat) + mise à jour conditionnelle (sans chevauchement)
+    assert counter.count == 2
+
+
+def test_overlapping_events_are_refused_on_assign_and_update(support, event):
+    Event.update(support_contact=support).execute()
+    overlapping = Event.create(contrat=event.contrat, start_date=datetime(2030, 2, 2), end_date=datetime(2030, 2, 5),
+                               attendees=5)
+    later = Event.create(contrat=event.contrat, start_date=datetime(2030, 3, 1), end_date=datetime(2030, 3, 1),
+                         attendees=5, support_contact=support)
+
+    result = runner.invoke(app, ["support", "assign-support-to-event"], input=f"{overlapping.id}\n")
+    assert f"Conflit de planning : l'événement chevauche vos événements {event.id}." in result.output
+    assert Event.get_by_id(overlapping.id).support_contact_id is None
+    # claim-next passe à l'événement suivant libre pour ce membre : il n'y en a pas
+    assert "Aucun événement non assigné." in runner.invoke(app, ["support", "claim-next"]).output
+
+    result = runner.invoke(app, ["support", "update-event"],
+                           input=f"{later.id}\n2030-02-01\n2030-02-01\n5\nNotes\n")
+    assert f"chevauche vos événements {event.id}." in result.output
+    assert Event.get_by_id(later.id).start_date == datetime(2030, 3, 1)
+
+
+def test_reschedule_refuses_an_overlap_created_after_the_check(support, event):
+    from crm.models.claims import CONFLICT, UPDATED, reschedule_event
+
+    Event.update(support_contact=support).execute()
+    later = Event.create(contrat=event.contrat, start_date=datetime(2030, 3, 1), end_date=datetime(2030, 3, 1),
+                         attendees=5, support_contact=support)
+    # Deux mises à jour préparées en même temps vers le même jour : la seconde est refusée.
+    assert reschedule_event(event.id, support.id, datetime(2030, 4, 1), datetime(2030, 4, 1)) == UPDATED
+    assert reschedule_event(later.id, support.id, datetime(2030, 4, 1), datetime(2030, 4, 2)) == CONFLICT
+    assert Event.get_by_id(later.id).start_date == datetime(2030, 3, 1)
+
+
+def test_conflicts_report_finds_overlapping_pairs(support, event):
+    other = User.create(username="other", email="other@example.com", role="SUPPORT", password="x")
+    Event.update(support_contact=support).execute()
+    # Chevauchements créés avant la détection (ex. données importées)
+    periods = [((2, 2), (2, 4), support), ((2, 3), (2, 3), support), ((2, 10), (2, 11), support),
+               ((2, 1), (2, 1), other)]
+    created = [Event.create(contrat=event.contrat, start_date=datetime(2030, *start), end_date=datetime(2030, *end),
+                            attendees=1, support_contact=owner)
+               for start, end, owner in periods]
+
+    result = runner.invoke(app, ["support", "conflicts"])
+
+    assert f"événements {event.id} et {created[0].id}, du 2030-02-02 au 2030-02-02." in result.output
+    assert f"événements {created[0].id} et {created[1].id}, du 2030-02-03 au 2030-02-03." in result.output
+    assert "2 conflit(s) de planning." in result.output
+    # L'événement de l'autre membre, le même jour, n'est pas un conflit
+    assert "2 conflit(s) de planning." in runner.invoke(app, ["support", "conflicts", "--all"]).output
+
+
+def test_interval_tree_matches_pairwise_comparison():
+    from crm.models.conflicts import IntervalTree
+    import random
+
+    rng = random.Random(7)
+    intervals = []
+    for key in range(500):
+        start = datetime(2030, 1, 1) + timedelta(days=rng.randrange(300))
+        intervals.append((start, start + timedelta(days=rng.randrange(5)), key))
+    tree = IntervalTree(intervals)
+
+    for _ in range(200):
+        start = datetime(2030, 1, 1) + timedelta(days=rng.randrange(300))
+        end = start + timedelta(days=rng.randrange(10))
+        expected = {key for low, high, key in intervals if low <= end and high >= start}
+        assert set(tree.overlapping(start, end)) == expected
+
+
+def test_update_event_not_assigned_is_refused(support, event):
+    with count_queries() as counter:
+        result = runner.invoke(app, ["support", "update-event"], input=f"{event.id}\n")
+
+    assert "Accès refusé" in result.output
+    assert counter.count == 1
+
+
+def test_delete_event_queries(support, event):
+    Event.update(support_contact=support).execute()
+
+    with count_queries() as counter:
+        result = runner.invoke(app, ["support", "delete-event"], input=f"{event.id}\n")
+
+    assert f"Événement {event.id} supprimé avec succès." in result.output
+    # Lecture contrôlée + BEGIN + pierre tombale (crm sync) + suppression
+    assert counter.count == 4
+
+
+def test_session_read_once_per_command(support, event, monkeypatch):
+    from crm.cli_commands import cli_permissions
+
+    reads = []
+    read_session_file = cli_permissions.read_session_file
+    monkeypatch.setattr(cli_permissions, "read_session_file", lambda: reads.append(1) or read_session_file())
+
+    runner.invoke(app, ["support", "assign-support-to-event"], input=f"{event.id}\n")
+    runner.invoke(app, ["support", "delete-event"], input=f"{event.id}\ny\n")
+
+    assert len(reads) == 2
+
+
+def test_wrong_role_is_refused(login_as, event):
+    login_as(User.create(username="admin", email="admin@example.com", role="ADMINISTRATION", password="x"))
+
+    result = runner.invoke(app, ["support", "update-event"], input=f"{event.id}\n")
+
+    assert "Seuls les membres du support" in result.output
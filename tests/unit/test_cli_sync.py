@@ -0,0 +1,93 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client, Tombstone, db
+from crm.models.snapshot import open_snapshot, snapshot_path, stale_marker
+import pytest
+
+runner = CliRunner(mix_stderr=False)
+
+
+@pytest.fixture(autouse=True)
+def through_proxy():
+    # L'instantané est lu via le proxy `db` (db.using), comme en production.
+    for model in (User, Client, Tombstone):
+        model.bind(db, bind_refs=False, bind_backrefs=False)
+
+
+@pytest.fixture
+def commercial(login_as):
+    return login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL",
+                                password="secret"))
+
+
+def snapshot_clients():
+    snapshot = open_snapshot(snapshot_path())
+    try:
+        with db.using(snapshot):
+            return sorted(name for (name,) in Client.select(Client.name).tuples())
+    finally:
+        snapshot.close()
+
+
+def test_sync_pulls_changes_then_only_new_ones(commercial, monkeypatch):
+    monkeypatch.setenv("SYNC_OVERLAP", "0")
+    for i in range(3):
+        Client.create(name=f"Client {i}", email=f"client{i}@example.com", commercial_contact=commercial)
+
+    first = runner.invoke(app, ["sync", "--page-size", "2"])
+    assert first.exit_code == 0
+    assert "3 client" in first.stdout
+    assert snapshot_clients() == ["Client 0", "Client 1", "Client 2"]
+
+    client = Client.get(Client.name == "Client 1")
+    client.name = "Client 1 bis"
+    client.save()
+    second = runner.invoke(app, ["sync"])
+    assert "1 client" in second.stdout and "0 user" in second.stdout
+    assert snapshot_clients() == ["Client 0", "Client 1 bis", "Client 2"]
+
+    # Les mots de passe restent dans la base centrale.
+    snapshot = open_snapshot(snapshot_path())
+    with db.using(snapshot):
+        assert User.get_by_id(commercial.id).password == ""
+    snapshot.close()
+
+
+def test_sync_applies_deletions(commercial):
+    client = Client.create(name="Supprimé", email="x@example.com", commercial_contact=commercial)
+    runner.invoke(app, ["sync"])
+
+    client.delete_instance()
+    result = runner.invoke(app, ["sync"])
+
+    assert "1 suppression(s)" in result.stdout
+    assert snapshot_clients() == []
+
+
+def test_list_reads_snapshot_until_local_write(commercial, monkeypatch):
+    Client.create(name="Synchronisé", email="s@example.com", commercial_contact=commercial)
+    runner.invoke(app, ["sync"])
+    # Ligne ajoutée par un autre poste : absente de l'instantané.
+    Client.insert(name="Ailleurs", email="a@example.com", commercial_contact=commercial).execute()
+
+    served = runner.invoke(app, ["list", "clients"])
+    assert "instantané local" in served.stderr
+    assert "Synchronisé" in served.stdout and "Ailleurs" not in served.stdout
+
+    # Une écriture depuis ce poste renvoie les lectures vers la base centrale.
+    Client.create(name="Local", email="l@example.com", commercial_contact=commercial)
+    assert stale_marker(snapshot_path()).exists()
+    central = runner.invoke(app, ["list", "clients"])
+    assert "instantané local" not in central.stderr
+    assert "Ailleurs" in central.stdout and "Local" in central.stdout
+
+    runner.invoke(app, ["sync"])
+    monkeypatch.setenv("SNAPSHOT_MAX_AGE", "0")
+    assert "instantané local" not in runner.invoke(app, ["list", "clients"]).stderr
+
+
+def test_sync_requires_authentication():
+    result = runner.invoke(app, ["sync"])
+
+    assert result.exit_code == 1
+    assert "Accès refusé" in result.stderr
@@ -19,4 +19,33 @@ def test_add_user_success(mock_user_functions):
     result = runner.invoke(app, ["user", "add-user"])
 
     # Vérifie que l'utilisateur a été ajouté avec succès
-    assert "Utilisateur new_user ajouté avec succès avec le rôle admin." in result.output
\ No newline at end of file
+    assert "Utilisateur new_user ajouté avec succès avec le rôle admin." in result.output
+
+def test_import_users(fast_argon2, tmp_path):
+    from crm.cli_commands.cli_passwords import verify_password
+    from crm.models.models import User
+
+    # Validation réelle des emails, limitée à la syntaxe (EMAIL_VALIDATION=syntax, voir conftest.py)
+    User.create(username="existant", email="existant@example.com", role="SUPPORT", password="x")
+    source = tmp_path / "users.csv"
+    source.write_text(
+        "username,email,password,role\n"
+        "alice,alice@example.com,motdepasse1,commercial\n"
+        "bob,bob@example.com,court,SUPPORT\n"
+        "existant,autre@example.com,motdepasse2,SUPPORT\n"
+        "carole,alice@example.com,motdepasse3,SUPPORT\n"
+        "david,david@example.com,motdepasse4,ADMINISTRATION\n"
+        "eve,eve@exemple@example.com,motdepasse5,SUPPORT\n",
+        encoding="utf-8"
+    )
+
+    result = runner.invoke(app, ["user", "import", str(source), "--workers", "2", "--batch-size", "2"])
+
+    assert "2 utilisateur(s) importé(s), 4 ligne(s) rejetée(s)" in result.output
+    assert not User.select().where(User.username == "eve").exists()
+    alice = User.get(User.username == "alice")
+    assert alice.role == "COMMERCIAL"
+    assert verify_password("motdepasse1", alice.password).valid
+
+    rejects = (tmp_path / "users.csv.rejects.jsonl").read_text(encoding="utf-8")
+    assert "motdepasse" not in rejects and "court" not in rejects
@@ -0,0 +1,62 @@
+import crm.cli_commands.cli_email as cli_email
+from crm.cli_commands.cli_email import domain_cache, validate_emails, validation_mode
+from crm.cli_commands.cli_input_validators import is_valid_email
+import pytest
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Résolveur DNS simulé : les domaines inexistant.fr n'existent pas, timeout.fr ne répond pas."""
+    resolved = []
+
+    def deliverable(domain, domain_i18n, resolver=None):
+        resolved.append(domain)
+        if domain == "timeout.fr":
+            return None
+        return domain != "inexistant.fr"
+
+    monkeypatch.setattr(cli_email, "domain_deliverable", deliverable)
+    monkeypatch.setattr(cli_email, "caching_resolver", lambda timeout: None)
+    monkeypatch.setenv("EMAIL_VALIDATION", "cached")
+    return resolved
+
+
+def test_batch_resolves_each_domain_once_and_persists_results(lookups, monkeypatch):
+    emails = ["a@acme.fr", "b@acme.fr", "c@inexistant.fr", "pas une adresse", "d@acme.fr"]
+
+    assert validate_emails(emails) == [True, True, False, False, True]
+    assert sorted(lookups) == ["acme.fr", "inexistant.fr"]
+
+    # Exécution suivante : le cache est relu depuis le fichier, sans requête DNS.
+    monkeypatch.setattr(cli_email, "_domains", None)
+    assert is_valid_email("e@acme.fr") and not is_valid_email("f@inexistant.fr")
+    assert len(lookups) == 2
+
+
+def test_negative_results_expire_sooner_and_unknown_ones_are_not_cached(lookups, monkeypatch):
+    validate_emails(["a@acme.fr", "b@inexistant.fr", "c@timeout.fr"])
+    cache = domain_cache()
+    assert cache.get("timeout.fr") is None
+
+    # Deux heures plus tard : le refus a expiré (1 heure), pas le domaine délivrable (7 jours).
+    later = cli_email.time.time() + 2 * 3600
+    monkeypatch.setattr(cli_email.time, "time", lambda: later)
+    assert cache.get("inexistant.fr") is None and cache.get("acme.fr") is True
+
+    assert validate_emails(["c@timeout.fr"]) == [True]
+    assert lookups.count("timeout.fr") == 2
+
+
+def test_syntax_and_full_modes(lookups, monkeypatch):
+    monkeypatch.setenv("EMAIL_VALIDATION", "syntax")
+    assert validate_emails(["a@inexistant.fr", "invalide"]) == [True, False]
+    assert lookups == []
+
+    monkeypatch.setenv("EMAIL_VALIDATION", "full")
+    validate_emails(["a@acme.fr"])
+    validate_emails(["b@acme.fr"])
+    assert lookups == ["acme.fr", "acme.fr"]
+
+    monkeypatch.setenv("EMAIL_VALIDATION", "dns")
+    with pytest.raises(EnvironmentError):
+        validation_mode()
@@ -0,0 +1,113 @@
+from datetime import datetime
+from peewee import IntegrityError, SqliteDatabase
+from crm.models.index_check import check_indexes
+from crm.models.migrations import MigrationError, applied_versions, load_migrations, migrate, rollback
+from crm.models.models import User, Client, Contrat
+import pytest
+
+
+@pytest.fixture
+def database():
+    # Base vierge, sans les tables créées par conftest.py
+    database = SqliteDatabase(":memory:")
+    yield database
+    database.close()
+
+
+def test_migrate_creates_schema_and_indexes(database):
+    applied = migrate(database)
+
+    assert [m.version for m in applied] == [m.version for m in load_migrations()]
+    assert applied_versions(database) == [m.version for m in applied]
+    assert {"user", "client", "contrat", "event", "tombstone", "schema_version"} <= set(database.get_tables())
+    assert "contrat_one_en_cours_per_client" in {index.name for index in database.get_indexes("contrat")}
+    assert "event_unassigned_start_date" in {index.name for index in database.get_indexes("event")}
+    # Une seconde exécution n'applique rien
+    assert migrate(database) == []
+
+
+def test_only_one_en_cours_contrat_per_client(database):
+    migrate(database)
+    with database.bind_ctx([User, Client, Contrat]):
+        user = User.create(username="admin", email="admin@example.com", role="ADMINISTRATION", password="x")
+        client = Client.create(name="Client", email="client@example.com", commercial_contact=user)
+        dates = {"start_date": datetime(2024, 1, 1), "end_date": datetime(2024, 2, 1)}
+        Contrat.create(client=client, price=1, contrat_author=user, status="TERMINE", **dates)
+        Contrat.create(client=client, price=1, contrat_author=user, **dates)
+
+        with pytest.raises(IntegrityError):
+            Contrat.create(client=client, price=1, contrat_author=user, **dates)
+
+
+def test_several_en_cours_contrats_stop_the_migration(database):
+    migrate(database, target=1)
+    # Schéma de la version 1 (sans updated_at) : modèles figés de la migration initiale
+    from crm.models.migrations.m0001_initial import User, Client, Contrat
+    with database.bind_ctx([User, Client, Contrat]):
+        user = User.create(username="admin", email="admin@example.com", role="ADMINISTRATION", password="x")
+        dates = {"start_date": datetime(2024, 1, 1), "end_date": datetime(2024, 2, 1)}
+        clients = [Client.create(name=f"Client {i}", email=f"client{i}@example.com", commercial_contact=user)
+                   for i in range(3)]
+        for client in (clients[0], clients[0], clients[2], clients[2], clients[1]):
+            Contrat.create(client=client, price=1, contrat_author=user, **dates)
+
+    with pytest.raises(MigrationError, match=f"client\\(s\\) {clients[0].id}, {clients[2].id} :"):
+        migrate(database)
+    # Rien n'est appliqué : la migration pourra être relancée après correction des données
+    assert applied_versions(database) == [1]
+    assert "client_name" not in {index.name for index in database.get_indexes("client")}
+
+
+def test_rollback_drops_indexes(database):
+    migrate(database)
+
+    rolled_back = rollback(database, steps=3)
+
+    assert [m.name for m in rolled_back] == ["event_periods", "updated_at", "indexes"]
+    assert "client_name" not in {index.name for index in database.get_indexes("client")}
+    assert "tombstone" not in database.get_tables()
+    assert applied_versions(database) == [1]
+
+
+def test_initial_migration_is_never_rolled_back(database):
+    migrate(database)
+
+    with pytest.raises(MigrationError, match="migration initiale"):
+        rollback(database, steps=len(load_migrations()))
+    # Rien n'est annulé
+    assert len(applied_versions(database)) == len(load_migrations())
+
+
+def test_check_indexes_reports_missing_indexes(database):
+    migrate(database, target=1)
+    assert not all(result.uses_index for result in check_indexes(database))
+
+    migrate(database)
+    assert [result.name for result in check_indexes(database) if not result.uses_index] == []
+
+
+def test_updated_at_is_added_to_existing_tables(database):
+    # m0001 crée les tables sans la colonne updated_at, quels que soient les modèles actuels.
+    migrate(database, target=2)
+    assert "updated_at" not in {column.name for column in database.get_columns("event")}
+
+    migrate(database)
+
+    for table in ("user", "client", "contrat", "event"):
+        assert "updated_at" in {column.name for column in database.get_columns(table)}
+        assert f"{table}_updated_at_id" in {index.name for index in database.get_indexes(table)}
+
+
+def test_schema_commands_require_an_administrator_and_a_confirmed_rollback(login_as):
+    from typer.testing import CliRunner
+    from crm.__main__ import app
+
+    runner = CliRunner()
+    result = runner.invoke(app, ["db", "rollback", "--yes"])
+    assert "Accès refusé" in result.output and result.exit_code == 1
+    login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+    assert "équipe d'administration" in runner.invoke(app, ["db", "migrate"]).output
+
+    login_as(User.create(username="admin", email="admin@example.com", role="ADMINISTRATION", password="x"))
+    result = runner.invoke(app, ["db", "rollback"], input="n\n")
+    assert "Annulation abandonnée." in result.output and result.exit_code == 1
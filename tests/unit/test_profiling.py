@@ -0,0 +1,48 @@
+from typer.testing import CliRunner
+from crm.__main__ import app
+from crm.models.models import User, Client
+from crm.models.profiling import current_profiler, normalize_sql
+import json
+
+runner = CliRunner(mix_stderr=False)
+
+
+def test_normalize_sql_groups_statements_of_the_same_shape():
+    first = normalize_sql('SELECT "t1"."id" FROM "client" AS "t1"\n  WHERE ("t1"."id" IN (?, ?, ?)) LIMIT 50')
+    second = normalize_sql("SELECT \"t1\".\"id\" FROM \"client\" AS \"t1\" WHERE (\"t1\".\"id\" IN (?, ?)) LIMIT 10")
+
+    assert first == second == 'SELECT "t1"."id" FROM "client" AS "t1" WHERE ("t1"."id" IN (?, ...)) LIMIT ?'
+    assert normalize_sql("UPDATE user SET name = 'O''Neil' WHERE id = 3") == "UPDATE user SET name = ? WHERE id = ?"
+
+
+def test_profile_reports_queries_and_rows_on_stderr(login_as):
+    commercial = User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x")
+    for i in range(3):
+        Client.create(name=f"Client {i}", email=f"client{i}@example.com", commercial_contact=commercial)
+    login_as(commercial)
+
+    result = runner.invoke(app, ["--profile", "--profile-format", "json", "list", "clients"])
+
+    assert result.exit_code == 0 and "Client 2" in result.stdout
+    report = json.loads(result.stderr)
+    assert report["command"] == "list"
+    assert report["queries"] >= 1 and report["rows"] == 3
+    assert report["slowest"][0]["sql"].startswith("SELECT")
+    assert current_profiler() is None
+
+
+def test_no_report_without_profile(login_as):
+    login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+
+    result = runner.invoke(app, ["list", "clients"])
+
+    assert result.exit_code == 0 and result.stderr == ""
+
+
+def test_profile_dump_writes_cprofile_stats(login_as, tmp_path):
+    login_as(User.create(username="commercial", email="commercial@example.com", role="COMMERCIAL", password="x"))
+
+    result = runner.invoke(app, ["--profile-dump", str(tmp_path / "crm.prof"), "list", "clients"])
+
+    assert result.exit_code == 0 and "Profil de « list »" in result.stderr
+    assert (tmp_path / "crm.prof").stat().st_size > 0
@@ -0,0 +1,49 @@
+from crm.cli_commands.cli_schema import (
+    CLIENT_SCHEMA, CONTRAT_SCHEMA, EVENT_SCHEMA, Context, contrat_window, parse_date
+)
+from crm.cli_commands.cli_input_validators import is_end_date_valid, valid_event_date_for_end
+from datetime import date, timedelta
+
+
+def test_validate_returns_converted_values_and_errors_per_field():
+    today = date.today()
+    result = CONTRAT_SCHEMA.validate({"start_date": str(today), "end_date": str(today - timedelta(days=1)),
+                                      "price": "-5", "is_signed": "Oui"})
+
+    assert result.data == {"status": "EN_COURS", "start_date": today, "payment_received": False, "is_signed": True}
+    assert set(result.errors) == {"end_date", "price"}
+    assert result.errors["price"] == "Le prix doit être un nombre entier positif."
+
+
+def test_validate_many_parses_each_date_and_email_once(mocker):
+    validate_emails = mocker.patch("crm.cli_commands.cli_schema.validate_emails",
+                                   side_effect=lambda emails: [not email.startswith("x") for email in emails])
+    records = [{"name": f"Client {i}", "email": "x@acme.fr" if i == 3 else "contact@acme.fr", "phone": "0601020304"}
+               for i in range(5)]
+
+    results = CLIENT_SCHEMA.validate_many(records)
+
+    assert [result.ok for result in results] == [True, True, True, False, True]
+    assert results[3].errors == {"email": "L'e-mail n'est pas valide."}
+    validate_emails.assert_called_once_with(["contact@acme.fr", "x@acme.fr"])
+
+    parse_date.cache_clear()
+    window = contrat_window("2030-01-01", "2030-12-31")
+    events = [{"start_date": "2030-03-01", "end_date": "2030-03-02", "attendees": i} for i in range(100)]
+    assert all(result.ok for result in EVENT_SCHEMA.validate_many(events, windows=lambda record: window))
+    assert parse_date.cache_info().misses == 4
+
+
+def test_event_dates_are_checked_against_the_contrat_window():
+    context = Context(date.today(), contrat_window("2030-01-01", "2030-01-31"))
+
+    outside = EVENT_SCHEMA.validate({"start_date": "2029-12-31", "end_date": "2030-02-01", "attendees": 3}, context)
+    assert set(outside.errors) == {"start_date", "end_date"}
+
+    # Mise à jour : seuls les champs présents sont validés.
+    assert EVENT_SCHEMA.validate({"id": 4, "attendees": "12"}, context, partial=True).data == {"attendees": 12}
+
+    # Les questions interactives s'appuient sur les mêmes règles.
+    assert valid_event_date_for_end("2030-01-10", "2030-01-05", "2030-01-31")
+    assert not valid_event_date_for_end("2030-01-04", "2030-01-05", "2030-01-31")
+    assert not is_end_date_valid("2030-13-01", "2030-01-01")
@@ -0,0 +1,104 @@
+from crm.models.models import User, Client
+from crm.models.profiling import Profiler
+from crm.models.user_cache import DiskStore, UserCache, cached_user, invalidate_user_directory, user_cache, user_directory
+from playhouse.test_utils import count_queries
+import pytest
+
+
+@pytest.fixture
+def users():
+    return [User.create(username=f"user{i}", email=f"user{i}@example.com", role="SUPPORT", password=f"hash{i}")
+            for i in range(3)]
+
+
+def test_lookups_by_id_email_and_username_share_one_entry(users):
+    with count_queries() as counter:
+        assert cached_user(users[0].id).username == "user0"
+        assert cached_user(email="user0@example.com").id == users[0].id
+        assert cached_user(username="user0").email == "user0@example.com"
+    assert counter.count == 1
+    assert user_cache().stats()["hits"] == 2
+
+
+def test_lru_eviction_and_ttl(users, monkeypatch):
+    cache = UserCache(maxsize=2, ttl=60)
+    for user in users:
+        cache.get("id", user.id)
+    assert cache.stats()["size"] == 2 and cache.stats()["evictions"] == 1
+
+    clock = [1000.0]
+    monkeypatch.setattr("crm.models.user_cache.time.monotonic", lambda: clock[0])
+    short = UserCache(ttl=5)
+    short.get("id", users[0].id)
+    clock[0] += 10
+    short.get("id", users[0].id)
+    assert short.stats()["misses"] == 2
+
+
+def test_save_and_delete_invalidate_the_cache(users):
+    cached_user(users[0].id)
+    users[0].username = "renamed"
+    users[0].save()
+    assert cached_user(users[0].id).username == "renamed"
+    assert cached_user(username="user0") is None
+
+    users[1].delete_instance()
+    assert cached_user(users[1].id) is None
+
+
+def test_directory_follows_saves_deletes_and_bulk_inserts(users):
+    with count_queries() as counter:
+        assert [user.username for user in user_directory().values()] == ["user0", "user1", "user2"]
+        user_directory()
+    assert counter.count == 1
+
+    users[0].role = "commercial"
+    users[0].save()
+    users[1].delete_instance()
+    assert [(user.username, user.role) for user in user_directory().values()] == [
+        ("user0", "COMMERCIAL"), ("user2", "SUPPORT")]
+
+    User.insert_many([{"username": "bulk", "email": "bulk@example.com", "role": "SUPPORT", "password": "h"}]).execute()
+    invalidate_user_directory()
+    assert "bulk" in {user.username for user in user_directory().values()}
+
+
+def test_foreign_keys_are_dereferenced_through_the_cache(users):
+    for i in range(3):
+        Client.create(name=f"Client {i}", email=f"c{i}@example.com", commercial_contact=users[0])
+
+    with count_queries() as counter:
+        names = {client.commercial_contact.username for client in Client.select()}
+    assert names == {"user0"}
+    # Une requête pour les clients, une seule pour l'utilisateur.
+    assert counter.count == 2
+
+
+def test_disk_store_is_shared_without_passwords(users, tmp_path):
+    first = UserCache(store=DiskStore(tmp_path / "cache.db"))
+    second = UserCache(store=DiskStore(tmp_path / "cache.db"))
+    assert first.get("email", "user1@example.com").password is None
+
+    with count_queries() as counter:
+        assert second.get("id", users[1].id).username == "user1"
+    assert counter.count == 0
+
+    # Une instance du cache sauvegardée n'écrase pas le mot de passe.
+    user = second.get("id", users[1].id)
+    user.role = "COMMERCIAL"
+    user.save()
+    assert User.get_by_id(users[1].id).password == "hash1"
+
+    first.invalidate(users[1].id)
+    assert DiskStore(tmp_path / "cache.db").get("id", users[1].id) is None
+
+
+def test_profile_reports_cache_hits(users):
+    profiler = Profiler("test")
+    profiler.start()
+    cached_user(users[0].id)
+    cached_user(email="user0@example.com")
+    profiler.stop()
+
+    assert profiler.as_dict()["caches"] == {"user": {"hits": 1, "misses": 1}}
+    assert "Cache user : 1 succès, 1 échec(s)." in profiler.to_text()